@@ -0,0 +1,67 @@
+"""Benchmark: inline agent-name formatting of the supervisor input, cached vs uncached.
+
+`with_agent_name(..., "inline")` formats every message of the history before each LLM
+call. Simulates a supervisor run over a history of `--messages` messages that grows by
+two messages per turn, and times the input formatting per turn with the per-message-ID
+cache disabled (`cache_size=0`, the previous behavior) and enabled. No LLM is called.
+
+Usage:
+    python -m benchmarks.agent_name_benchmark [--messages 1000] [--turns 50]
+"""
+
+import argparse
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from langgraph_supervisor.agent_name import with_agent_name
+
+
+def make_message(index: int):
+    kind = index % 3
+    if kind == 0:
+        return HumanMessage(content=f"question {index} " * 10, id=str(uuid.uuid4()))
+    if kind == 1:
+        return AIMessage(
+            content=f"answer {index} " * 30, name="analysis_agent", id=str(uuid.uuid4())
+        )
+    return ToolMessage(
+        content=f"result {index} " * 30, tool_call_id=str(index), id=str(uuid.uuid4())
+    )
+
+
+def run(history: list, turns: int, cache_size: int) -> float:
+    model = with_agent_name(
+        RunnableLambda(lambda messages: messages), "inline", cache_size=cache_size
+    )
+    format_input = model.first.func
+    messages = list(history)
+    elapsed = 0.0
+    for _turn in range(turns):
+        start = time.perf_counter()
+        format_input(messages)
+        elapsed += time.perf_counter() - start
+        messages.extend((make_message(len(messages)), make_message(len(messages) + 1)))
+    return elapsed / turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--messages", type=int, default=1_000)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    history = [make_message(index) for index in range(args.messages)]
+    print(f"{args.messages:,} messages, {args.turns} turns")
+    uncached = run(history, args.turns, cache_size=0)
+    cached = run(history, args.turns, cache_size=args.messages + 2 * args.turns)
+    print(f"uncached  {uncached * 1000:>8.3f} ms/turn")
+    print(f"cached    {cached * 1000:>8.3f} ms/turn  ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
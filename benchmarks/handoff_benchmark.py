@@ -0,0 +1,136 @@
+"""Benchmark: cost of a single handoff as the message history grows.
+
+Compares the previous handoff update (the whole history plus the handoff tool message,
+merged again by the `add_messages` reducer) with the delta update sent by
+`create_handoff_tool` (only the supervisor's current turn). Reports the time to build
+the handoff update, the time of the parent graph's reducer, and the size of the serialized
+update, which is what a checkpointer stores as the pending write of the handoff.
+The reducer time stays O(history) for both because `add_messages` indexes the existing
+list, but it no longer re-merges every message.
+
+For parallel handoffs it also reports the serialized size of the `Send` payloads of
+one fan-out, which a checkpointer stores as pending tasks: a full history copy per
+agent (`share_parent_history=False`) versus only the branch messages plus a reference
+to the parent history (`share_parent_history=True`, opt-in in `create_supervisor`).
+
+The tool body is called directly: `BaseTool.run` also stringifies the injected state
+for its callbacks, an O(history) cost of langchain-core that is the same for both.
+
+Usage:
+    python -m benchmarks.handoff_benchmark [--sizes 100 1000 10000] [--repeat 20] [--agents 4]
+"""
+
+import argparse
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph.message import add_messages
+
+from langgraph_supervisor.handoff import create_handoff_tool
+
+SUPERVISOR = "supervisor"
+AGENT = "linkbrain_agent"
+
+
+def make_history(size: int) -> list:
+    messages = [HumanMessage(content="question", id=str(uuid.uuid4()))]
+    while len(messages) < size:
+        messages.append(AIMessage(content="answer " * 20, name=AGENT, id=str(uuid.uuid4())))
+        messages.append(HumanMessage(content="follow-up question", id=str(uuid.uuid4())))
+    return messages[:size]
+
+
+def supervisor_turn(messages: list) -> dict:
+    ai_message = AIMessage(
+        content="",
+        name=SUPERVISOR,
+        id=str(uuid.uuid4()),
+        tool_calls=[{"name": f"transfer_to_{AGENT}", "args": {}, "id": "call-1"}],
+    )
+    return {"messages": messages + [ai_message]}
+
+
+def legacy_update(state: dict, tool_call_id: str) -> dict:
+    tool_message = ToolMessage(
+        content=f"Successfully transferred to {AGENT}",
+        tool_call_id=tool_call_id,
+    )
+    return {**state, "messages": state["messages"] + [tool_message]}
+
+
+def measure(
+    name: str, history: list, make_update, repeat: int, serializer: JsonPlusSerializer
+) -> None:
+    build = reduce = 0.0
+    for _ in range(repeat):
+        state = supervisor_turn(history)
+        start = time.perf_counter()
+        update = make_update(state, "call-1")
+        built = time.perf_counter()
+        add_messages(history, update["messages"])
+        build += built - start
+        reduce += time.perf_counter() - built
+    _, payload = serializer.dumps_typed(update["messages"])
+    print(
+        f"  {name:<8} update {build / repeat * 1000:>7.3f} ms  reducer {reduce / repeat * 1000:>7.3f} ms  "
+        f"{len(update['messages']):>6} messages sent  write {len(payload) / 1024:>8.1f} KiB"
+    )
+
+
+def fan_out_payload(
+    history: list, agents: int, share_parent_history: bool, serializer: JsonPlusSerializer
+) -> int:
+    names = [f"agent_{index}" for index in range(agents)]
+    tools = [
+        create_handoff_tool(agent_name=name, share_parent_history=share_parent_history)
+        for name in names
+    ]
+    ai_message = AIMessage(
+        content="",
+        name=SUPERVISOR,
+        id=str(uuid.uuid4()),
+        tool_calls=[
+            {"name": tool.name, "args": {}, "id": f"call-{index}"}
+            for index, tool in enumerate(tools)
+        ],
+    )
+    state = {"messages": history + [ai_message]}
+    size = 0
+    for index, tool in enumerate(tools):
+        for send in tool.func(state=state, tool_call_id=f"call-{index}").goto:
+            size += len(serializer.dumps_typed(send.arg)[1])
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=4)
+    args = parser.parse_args()
+
+    handoff_tool = create_handoff_tool(agent_name=AGENT)
+
+    def delta_update(state: dict, tool_call_id: str) -> dict:
+        return handoff_tool.func(state=state, tool_call_id=tool_call_id).update
+
+    serializer = JsonPlusSerializer()
+    for size in args.sizes:
+        history = make_history(size)
+        print(f"{size:,} messages in history")
+        measure("legacy", history, legacy_update, args.repeat, serializer)
+        measure("delta", history, delta_update, args.repeat, serializer)
+        copied = fan_out_payload(history, args.agents, False, serializer)
+        shared = fan_out_payload(history, args.agents, True, serializer)
+        print(
+            f"  fan-out to {args.agents} agents: Send payloads {copied / 1024:>8.1f} KiB copied"
+            f"  ->  {shared / 1024:>6.1f} KiB shared"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: Neo4jHttpTools client, queries/sec against a local stand-in API server.
+
+Compares the previous per-call `requests.post` (new TCP connection per query)
+with the pooled `requests.Session` client, the async `httpx` client and the
+batch API (`read_many`). Requests go to `tests.neo4j_api_stub`, which
+answers like the API server after an optional artificial latency, so no
+database is needed.
+
+Usage:
+    python -m benchmarks.http_client_benchmark [--requests 500] [--latency-ms 0] [--concurrency 10] [--batch-size 50]
+"""
+
+import argparse
+import asyncio
+import time
+
+import requests
+
+from langgraph_supervisor.neo4j_http_tools import Neo4jHttpTools
+from tests.neo4j_api_stub import StubNeo4jApiServer
+
+
+def legacy_post(url: str, count: int) -> None:
+    for _ in range(count):
+        response = requests.post(f"{url}/api/read", json={"query": "RETURN 1", "params": {}})
+        response.raise_for_status()
+        response.json()
+
+
+def pooled_sync(url: str, count: int) -> None:
+    with Neo4jHttpTools(url) as tools:
+        for _ in range(count):
+            tools.read_neo4j("RETURN 1")
+
+
+async def pooled_async(url: str, count: int, concurrency: int) -> None:
+    async with Neo4jHttpTools(url, pool_maxsize=concurrency) as tools:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one() -> None:
+            async with semaphore:
+                await tools.aread_neo4j("RETURN 1")
+
+        await asyncio.gather(*(one() for _ in range(count)))
+
+
+def batched(url: str, count: int, batch_size: int) -> None:
+    with Neo4jHttpTools(url, max_batch_size=batch_size) as tools:
+        tools.read_many(["RETURN 1"] * count)
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    print(
+        f"{name:<36} {count / elapsed:>10,.0f} queries/sec  ({elapsed * 1000 / count:.2f} ms/query)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    server = StubNeo4jApiServer(latency=args.latency_ms / 1000).start()
+    url = server.url
+    count = args.requests
+    print(f"{count} queries, {args.latency_ms:g} ms server latency per request")
+
+    for name, run in [
+        ("legacy requests.post per call", lambda: legacy_post(url, count)),
+        ("pooled requests.Session", lambda: pooled_sync(url, count)),
+        ("async httpx, sequential", lambda: asyncio.run(pooled_async(url, count, 1))),
+        (
+            f"async httpx, concurrency {args.concurrency}",
+            lambda: asyncio.run(pooled_async(url, count, args.concurrency)),
+        ),
+        (f"read_many, {args.batch_size} per request", lambda: batched(url, count, args.batch_size)),
+    ]:
+        start = time.perf_counter()
+        run()
+        report(name, count, time.perf_counter() - start)
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark: Neo4jDatabase result handling on large results, latency and peak memory.
+
+Compares the previous path (`await result.values()`, then `dict(zip(keys, values))`
+per row, then `json.dumps(default=str)` in the MCP layer) with the per-record JSON
+text streaming used by the MCP server (`execute_read_json`), as row objects and as
+columns plus row arrays.
+Records come from an in-memory stand-in for the driver result, so no database is
+needed and only the client-side cost is measured.
+
+Usage:
+    python -m benchmarks.neo4j_manager_benchmark [--rows 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from neo4j import Record
+from neo4j.graph import Graph, Node
+from neo4j.time import DateTime
+
+from langgraph_supervisor.neo4j_manager import _read_json_text
+
+KEYS = ["chunk", "entity", "score", "created", "tags"]
+
+
+class StandInResult:
+    """Minimal async driver result over pre-built records."""
+
+    def __init__(self, records: list[Record]):
+        self._records = records
+
+    def keys(self) -> list[str]:
+        return KEYS
+
+    async def values(self) -> list[list]:
+        return [list(record) for record in self._records]
+
+    def __aiter__(self):
+        self._iter = iter(self._records)
+        return self
+
+    async def __anext__(self) -> Record:
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class StandInTx:
+    def __init__(self, records: list[Record]):
+        self._records = records
+
+    async def run(self, query: str, params: dict) -> StandInResult:
+        return StandInResult(self._records)
+
+
+def make_records(count: int) -> list[Record]:
+    graph = Graph()
+    records = []
+    for i in range(count):
+        chunk = Node(graph, f"4:db:c{i}", i, ["Chunk"], {"text": f"chunk text {i}", "index": i})
+        entity = Node(graph, f"4:db:e{i}", i, ["Entity"], {"name": f"entity {i % 500}"})
+        values = [chunk, entity, i / count, DateTime(2024, 1, 1 + i % 28, 9, 30), ["ai", "graph"]]
+        records.append(Record(zip(KEYS, values, strict=True)))
+    return records
+
+
+async def legacy(tx: StandInTx) -> str:
+    result = await tx.run("MATCH ...", {})
+    records = await result.values()
+    rows = [dict(zip(result.keys(), record, strict=True)) for record in records]
+    return json.dumps({"results": rows, "success": True}, default=str)
+
+
+async def streaming_text(tx: StandInTx, columnar: bool) -> str:
+    results = await _read_json_text(tx, "MATCH ...", {}, columnar)
+    return f'{{"results":{results},"success":true}}'
+
+
+def measure(name: str, run, rows: int) -> None:
+    # timed without tracemalloc, which slows allocation-heavy code several times over
+    start = time.perf_counter()
+    payload = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    del payload
+    tracemalloc.start()
+    payload = asyncio.run(run())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<24} {elapsed * 1000:>8.0f} ms  {rows / elapsed:>10,.0f} rows/sec  "
+        f"peak {peak / 2**20:>7.1f} MiB  payload {len(payload) / 2**20:>6.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tx = StandInTx(make_records(args.rows))
+    print(f"{args.rows:,} rows (peak = memory allocated on top of the pre-built records)")
+    measure("legacy values()+zip", lambda: legacy(tx), args.rows)
+    measure("streamed JSON text", lambda: streaming_text(tx, False), args.rows)
+    measure("streamed columnar text", lambda: streaming_text(tx, True), args.rows)
+
+
+if __name__ == "__main__":
+    main()
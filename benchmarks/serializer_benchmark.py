@@ -0,0 +1,115 @@
+"""Benchmark: Neo4j result serialization, rows/sec.
+
+Compares the per-cell coercion previously used by the MCP servers against
+`langgraph_supervisor.neo4j_serializer` on synthetic records that mix graph,
+temporal and spatial values.
+
+Usage:
+    python -m benchmarks.serializer_benchmark [--rows 50000] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+
+from neo4j import Record
+from neo4j.graph import Graph, Node
+from neo4j.spatial import WGS84Point
+from neo4j.time import DateTime
+
+from langgraph_supervisor.neo4j_serializer import get_backend, orjson, record_to_dict
+
+
+def make_records(count: int) -> list[Record]:
+    graph = Graph()
+    has_entity = graph.relationship_type("HAS_ENTITY")
+    keys = ["l", "r", "e", "created", "location", "tags", "weight", "title"]
+    records = []
+    for i in range(count):
+        link = Node(
+            graph,
+            f"4:db:{i}",
+            i,
+            ["Link"],
+            {"url": f"https://example.com/{i}", "title": f"title {i}"},
+        )
+        entity = Node(graph, f"4:db:e{i}", i, ["Entity"], {"name": f"entity {i}"})
+        rel = has_entity(graph, f"5:db:{i}", i, {"weight": i / 10})
+        rel._start_node = link
+        rel._end_node = entity
+        values = [
+            link,
+            rel,
+            entity,
+            DateTime(2023, 1, 1 + i % 28, 12, 0, 0),
+            WGS84Point((127.0, 37.5)),
+            ["ai", "neo4j", str(i)],
+            i / 3,
+            f"제목 {i}",
+        ]
+        records.append(Record(zip(keys, values, strict=True)))
+    return records
+
+
+def legacy_neo4j_mcp_server(records: list[Record]) -> str:
+    """neo4j_mcp_server.Neo4jConnector.run_cypher: str() for every non-primitive value."""
+    rows = []
+    for record in records:
+        row = {}
+        for key, value in record.items():
+            if hasattr(value, "__str__") and not isinstance(
+                value, (str, int, float, bool, list, dict)
+            ):
+                row[key] = str(value)
+            else:
+                row[key] = value
+        rows.append(row)
+    return json.dumps(rows, default=str, ensure_ascii=False, indent=2)
+
+
+def legacy_mcp_server(records: list[Record]) -> str:
+    """mcp_server.Neo4jConnection.run_cypher: str() for every value, including ints."""
+    rows = [{key: str(value) for key, value in record.items()} for record in records]
+    return json.dumps(rows, ensure_ascii=False)
+
+
+def legacy_mcp_neo4j_cypher(records: list[Record]) -> str:
+    """mcp_neo4j_cypher._read: record.data() + json.dumps(default=str)."""
+    return json.dumps([record.data() for record in records], default=str)
+
+
+def make_serializer(backend_name: str):
+    backend = get_backend(backend_name)
+
+    def serialize(records: list[Record]) -> str:
+        return backend.dumps([record_to_dict(record) for record in records])
+
+    return serialize
+
+
+def run(name: str, fn, records: list[Record], repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(records)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<32} {len(records) / best:>12,.0f} rows/sec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    run("legacy neo4j_mcp_server", legacy_neo4j_mcp_server, records, args.repeat)
+    run("legacy mcp_server", legacy_mcp_server, records, args.repeat)
+    run("legacy mcp_neo4j_cypher", legacy_mcp_neo4j_cypher, records, args.repeat)
+    run("neo4j_serializer (json)", make_serializer("json"), records, args.repeat)
+    if orjson is not None:
+        run("neo4j_serializer (orjson)", make_serializer("orjson"), records, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
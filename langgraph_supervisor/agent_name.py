@@ -1,14 +1,74 @@
 import re
-from typing import Literal
+from typing import Any, AsyncIterator, Callable, Iterator, Literal, Optional
 
-from langchain_core.language_models import LanguageModelLike
-from langchain_core.messages import AIMessage, BaseMessage
-from langchain_core.runnables import RunnableLambda
+from langchain_core.callbacks import (
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    BaseCallbackManager,
+    CallbackManager,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelLike
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableBinding, RunnableConfig, RunnableLambda, ensure_config
+from pydantic import PrivateAttr
+
+try:
+    from langchain_core.tracers._streaming import _StreamingCallbackHandler
+except ImportError:  # pragma: no cover - older langchain-core
+    _StreamingCallbackHandler = None
 
 NAME_PATTERN = re.compile(r"<name>(.*?)</name>", re.DOTALL)
 CONTENT_PATTERN = re.compile(r"<content>(.*?)</content>", re.DOTALL)
 
-AgentNameMode = Literal["inline"]
+AgentNameMode = Literal["inline", "inline_streaming"]
+
+NAME_OPEN_TAG = "<name>"
+NAME_CLOSE_TAG = "</name>"
+CONTENT_OPEN_TAG = "<content>"
+CONTENT_CLOSE_TAG = "</content>"
+# Longest head (leading whitespace and `<name>...</name><content>`) buffered while waiting
+# to see whether a streamed message is tagged. Past it, the text is passed through as is.
+MAX_TAG_HEAD_CHARS = 256
+
+DEFAULT_NAME_CACHE_SIZE = 4096
+
+
+class _MessageCache:
+    """Bounded cache of processed messages, keyed by message ID.
+
+    An entry is only reused while the message still has the same name and the same content
+    object, so a message replaced under the same ID (e.g. by the `add_messages` reducer)
+    is processed again. The whole history is looked up on every call, so the oldest entry
+    is evicted first.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: dict[str, tuple[str | None, object, BaseMessage]] = {}
+
+    def __call__(
+        self, process: Callable[[BaseMessage], BaseMessage], message: BaseMessage
+    ) -> BaseMessage:
+        if not message.id or self.maxsize <= 0:
+            return process(message)
+
+        entry = self._entries.get(message.id)
+        # the entry keeps a reference to the original content, so `is` cannot be fooled
+        # by a new object at a recycled address
+        if entry is not None and entry[1] is message.content and entry[0] == message.name:
+            return entry[2]
+
+        processed = process(message)
+        self._entries[message.id] = (message.name, message.content, processed)
+        if len(self._entries) > self.maxsize:
+            try:
+                del self._entries[next(iter(self._entries))]
+            except (KeyError, RuntimeError, StopIteration):
+                # evicted concurrently by another run sharing this model
+                pass
+        return processed
 
 
 def _is_content_blocks_content(content: list[dict] | str) -> bool:
@@ -73,6 +133,10 @@ def remove_inline_agent_name(message: BaseMessage) -> BaseMessage:
     else:
         content = message.content
 
+    # cheap substring checks skip both regex scans for untagged messages
+    if "<name>" not in content or "<content>" not in content:
+        return message
+
     name_match: re.Match | None = NAME_PATTERN.search(content)
     content_match: re.Match | None = CONTENT_PATTERN.search(content)
     if not name_match or not content_match:
@@ -91,9 +155,266 @@ def remove_inline_agent_name(message: BaseMessage) -> BaseMessage:
     return parsed_message
 
 
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Length of the longest suffix of `text` that is a proper prefix of `tag`."""
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class InlineAgentNameStripper:
+    """Incrementally remove the `<name>...</name><content>...</content>` wrapper from streamed text.
+
+    Only the tag head (`<name>agent_name</name><content>`) is held back until it is complete, so
+    the first content token is emitted as soon as it arrives. A partial `</content>` at the end of
+    a piece is held back until the next piece shows whether it is the closing tag. Untagged text
+    is passed through unchanged as soon as it cannot be the start of a tag.
+
+    Example:
+        ```python
+        stripper = InlineAgentNameStripper()
+        pieces = ["<name>sup", "ervisor</name><con", "tent>Hel", "lo</cont", "ent>"]
+        "".join(stripper.feed(piece) for piece in pieces) + stripper.flush()  # "Hello"
+        ```
+    """
+
+    def __init__(self):
+        self._state = "head"  # head -> content -> done, or head -> passthrough
+        self._buffer = ""
+
+    def feed(self, text: str) -> str:
+        """Feed the next piece of text and return the part of it that can be emitted."""
+        if self._state == "passthrough":
+            return text
+        if self._state == "done":
+            return ""
+
+        self._buffer += text
+        if self._state == "head":
+            self._resolve_head()
+            if self._state == "head":
+                return ""
+            if self._state == "passthrough":
+                emitted, self._buffer = self._buffer, ""
+                return emitted
+
+        end = self._buffer.find(CONTENT_CLOSE_TAG)
+        if end != -1:
+            emitted = self._buffer[:end]
+            self._buffer = ""
+            self._state = "done"
+            return emitted
+        held = _partial_tag_length(self._buffer, CONTENT_CLOSE_TAG)
+        emitted = self._buffer[: len(self._buffer) - held]
+        self._buffer = self._buffer[len(emitted) :]
+        return emitted
+
+    def flush(self) -> str:
+        """Return any text still held back at the end of the stream."""
+        emitted, self._buffer = self._buffer, ""
+        return emitted
+
+    def _resolve_head(self) -> None:
+        head = self._buffer.lstrip()
+        if len(self._buffer) > MAX_TAG_HEAD_CHARS:
+            self._state = "passthrough"
+        elif not head.startswith(NAME_OPEN_TAG):
+            if not NAME_OPEN_TAG.startswith(head):
+                self._state = "passthrough"
+        elif (name_end := head.find(NAME_CLOSE_TAG, len(NAME_OPEN_TAG))) != -1:
+            rest = head[name_end + len(NAME_CLOSE_TAG) :]
+            if rest.startswith(CONTENT_OPEN_TAG):
+                self._buffer = rest[len(CONTENT_OPEN_TAG) :]
+                self._state = "content"
+            elif not CONTENT_OPEN_TAG.startswith(rest):
+                self._state = "passthrough"
+
+
+def _strip_chunk(stripper: InlineAgentNameStripper, chunk: AIMessageChunk) -> AIMessageChunk:
+    if isinstance(chunk.content, str):
+        return chunk.model_copy(update={"content": stripper.feed(chunk.content)})
+    content = [
+        {**block, "text": stripper.feed(block["text"])}
+        if isinstance(block, dict) and block.get("type") == "text"
+        else block
+        for block in chunk.content
+    ]
+    return chunk.model_copy(update={"content": content})
+
+
+def _flush_chunk(
+    stripper: InlineAgentNameStripper, last_chunk: Optional[AIMessageChunk]
+) -> Optional[AIMessageChunk]:
+    tail = stripper.flush()
+    if not tail:
+        return None
+    if last_chunk is not None and isinstance(last_chunk.content, list):
+        text_blocks = [
+            block
+            for block in last_chunk.content
+            if isinstance(block, dict) and block.get("type") == "text"
+        ]
+        index = text_blocks[-1].get("index", 0) if text_blocks else 0
+        return AIMessageChunk(content=[{"type": "text", "text": tail, "index": index}])
+    return AIMessageChunk(content=tail)
+
+
+def _without_streaming_handlers(
+    run_manager: CallbackManagerForLLMRun | AsyncCallbackManagerForLLMRun | None,
+    *,
+    is_async: bool,
+) -> RunnableConfig:
+    # the inner model stays traced, but token stream consumers (stream_mode="messages",
+    # astream_events) only see the wrapper's stripped tokens
+    if run_manager is not None:
+        inherited: BaseCallbackManager = run_manager
+        parent_run_id = run_manager.run_id
+    else:
+        # BaseChatModel streams `invoke` calls through `_stream` without a run manager,
+        # the inner model then inherits the callbacks of the calling runnable
+        callbacks = ensure_config().get("callbacks")
+        if callbacks is None:
+            return {}
+        if not isinstance(callbacks, BaseCallbackManager):
+            callbacks = CallbackManager(handlers=[], inheritable_handlers=list(callbacks))
+        inherited = callbacks
+        parent_run_id = callbacks.parent_run_id
+
+    manager_cls = AsyncCallbackManager if is_async else CallbackManager
+    child = manager_cls(handlers=[], parent_run_id=parent_run_id)
+    for handler in inherited.inheritable_handlers:
+        if _StreamingCallbackHandler is None or not isinstance(handler, _StreamingCallbackHandler):
+            child.add_handler(handler, inherit=True)
+    child.add_tags(inherited.inheritable_tags)
+    child.add_metadata(inherited.inheritable_metadata)
+    return {"callbacks": child}
+
+
+class StreamingInlineAgentNameChatModel(BaseChatModel):
+    """Chat model wrapper for the `"inline_streaming"` agent name mode.
+
+    Formats agent names inline in the input messages like the `"inline"` mode, and strips the
+    name tags from the output while it is being streamed, so token streaming
+    (`stream_mode="messages"`, `astream_events`) never delivers the tags to the client.
+    Use it through `with_agent_name(model, "inline_streaming")`.
+    """
+
+    model: BaseChatModel
+    """The wrapped chat model."""
+    cache_size: int = DEFAULT_NAME_CACHE_SIZE
+    """Maximum number of formatted input messages to keep, by message ID."""
+
+    _input_cache: _MessageCache = PrivateAttr()
+
+    def model_post_init(self, context: Any) -> None:
+        self._input_cache = _MessageCache(self.cache_size)
+
+    @property
+    def _llm_type(self) -> str:
+        return "inline-agent-name"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"model": self.model._llm_type}
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> RunnableBinding:
+        return self.bind(**self.model.bind_tools(tools, **kwargs).kwargs)
+
+    def _format_input(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        return [
+            self._input_cache(add_inline_agent_name, message)
+            if isinstance(message, AIMessage)
+            else message
+            for message in messages
+        ]
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self.model.invoke(
+            self._format_input(messages),
+            _without_streaming_handlers(run_manager, is_async=False),
+            stop=stop,
+            **kwargs,
+        )
+        return ChatResult(generations=[ChatGeneration(message=remove_inline_agent_name(message))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = await self.model.ainvoke(
+            self._format_input(messages),
+            _without_streaming_handlers(run_manager, is_async=True),
+            stop=stop,
+            **kwargs,
+        )
+        return ChatResult(generations=[ChatGeneration(message=remove_inline_agent_name(message))])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        stripper = InlineAgentNameStripper()
+        chunk = None
+        for chunk in self.model.stream(
+            self._format_input(messages),
+            _without_streaming_handlers(run_manager, is_async=False),
+            stop=stop,
+            **kwargs,
+        ):
+            yield ChatGenerationChunk(message=_strip_chunk(stripper, chunk))
+        if tail := _flush_chunk(stripper, chunk):
+            yield ChatGenerationChunk(message=tail)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        stripper = InlineAgentNameStripper()
+        chunk = None
+        async for chunk in self.model.astream(
+            self._format_input(messages),
+            _without_streaming_handlers(run_manager, is_async=True),
+            stop=stop,
+            **kwargs,
+        ):
+            yield ChatGenerationChunk(message=_strip_chunk(stripper, chunk))
+        if tail := _flush_chunk(stripper, chunk):
+            yield ChatGenerationChunk(message=tail)
+
+
+def _with_streaming_agent_name(model: LanguageModelLike, cache_size: int) -> LanguageModelLike:
+    if isinstance(model, BaseChatModel):
+        return StreamingInlineAgentNameChatModel(model=model, cache_size=cache_size)
+    if isinstance(model, RunnableBinding) and isinstance(model.bound, BaseChatModel):
+        # keep the bound tools on the outside, where create_react_agent looks for them
+        wrapper = StreamingInlineAgentNameChatModel(model=model.bound, cache_size=cache_size)
+        return RunnableBinding(bound=wrapper, kwargs=model.kwargs, config=model.config)
+    raise ValueError(
+        "The 'inline_streaming' agent name mode requires a chat model or a chat model with bound "
+        f"tools (e.g. model.bind_tools(...)), got {type(model)}"
+    )
+
+
 def with_agent_name(
     model: LanguageModelLike,
     agent_name_mode: AgentNameMode,
+    cache_size: int = DEFAULT_NAME_CACHE_SIZE,
 ) -> LanguageModelLike:
     """Attach formatted agent names to the messages passed to and from a language model.
 
@@ -108,8 +429,16 @@ def with_agent_name(
         agent_name_mode: Use to specify how to expose the agent name to the LLM.
             - "inline": Add the agent name directly into the content field of the AI message using XML-style tags.
                 Example: "How can I help you" -> "<name>agent_name</name><content>How can I help you?</content>".
+            - "inline_streaming": Same formatting as "inline", but the tags are stripped from the output
+                while it streams, so streamed tokens never contain them. Requires a chat model
+                (optionally with bound tools).
+        cache_size: Maximum number of formatted input messages to keep, by message ID.
+            The history is resent on every LLM call, so previously formatted messages are reused
+            instead of being copied and formatted again. Set to 0 to disable caching.
     """
-    if agent_name_mode == "inline":
+    if agent_name_mode == "inline_streaming":
+        return _with_streaming_agent_name(model, cache_size)
+    elif agent_name_mode == "inline":
         process_input_message = add_inline_agent_name
         process_output_message = remove_inline_agent_name
     else:
@@ -117,9 +446,18 @@ def with_agent_name(
             f"Invalid agent name mode: {agent_name_mode}. Needs to be one of: {AgentNameMode.__args__}"
         )
 
+    input_cache = _MessageCache(cache_size)
+
     def process_input_messages(messages: list[BaseMessage]) -> list[BaseMessage]:
-        return [process_input_message(message) for message in messages]
+        # only AI messages are ever formatted; the rest pass through without a cache lookup
+        return [
+            input_cache(process_input_message, message)
+            if isinstance(message, AIMessage)
+            else message
+            for message in messages
+        ]
 
+    # outputs are new messages on every call, so only the input side is cached
     model = (
         process_input_messages
         | model
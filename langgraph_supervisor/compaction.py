@@ -0,0 +1,419 @@
+"""Token-budgeted compaction of the message history passed between supervisor and agents.
+
+`HistoryCompactor` trims what the supervisor LLM sees on each turn, and
+`select_output_messages` picks which agent messages the `"token_budget"` output mode adds to
+the supervisor history. Token counts are estimated from message lengths
+(`estimate_message_tokens`) rather than with a tokenizer.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from langgraph_supervisor.handoff import (
+    METADATA_KEY_HANDOFF_DESTINATION,
+    METADATA_KEY_IS_HANDOFF_BACK,
+)
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+IMAGE_TOKENS = 85
+
+
+def _content_chars(content: str | list) -> tuple[int, int]:
+    """Return (character count, image count) of message content."""
+    if isinstance(content, str):
+        return len(content), 0
+    chars = images = 0
+    for block in content:
+        if isinstance(block, str):
+            chars += len(block)
+        elif block.get("type") == "text":
+            chars += len(block.get("text", ""))
+        elif block.get("type") in ("image", "image_url"):
+            images += 1
+        else:
+            chars += len(json.dumps(block, default=str))
+    return chars, images
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """Estimate the token count of a single message without running a tokenizer.
+
+    Uses ~4 characters per token plus a small per-message overhead, which is close enough
+    for budgeting and orders of magnitude faster than exact tokenization.
+    """
+    chars, images = _content_chars(message.content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        for tool_call in message.tool_calls:
+            chars += len(tool_call["name"]) + len(json.dumps(tool_call["args"], default=str))
+    if message.name:
+        chars += len(message.name)
+    return MESSAGE_OVERHEAD_TOKENS + -(-chars // CHARS_PER_TOKEN) + images * IMAGE_TOKENS
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Estimate the total token count of a list of messages. See `estimate_message_tokens`."""
+    return sum(estimate_message_tokens(message) for message in messages)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Keep the head of the text that fits in `max_tokens`, cut at a line break when possible.
+
+    Large tool outputs (e.g. Cypher result tables) are mostly rows, so keeping whole leading
+    lines preserves the header and the first rows.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    line_break = head.rfind("\n")
+    if line_break > max_chars // 2:
+        head = head[:line_break]
+    omitted = -(-(len(text) - len(head)) // CHARS_PER_TOKEN)
+    return f"{head}\n... [truncated ~{omitted} tokens]"
+
+
+@dataclass
+class CompactionStats:
+    """Metrics for one compaction of the supervisor message history."""
+
+    messages_before: int
+    messages_after: int
+    tokens_before: int
+    tokens_after: int
+    handoff_messages_dropped: int = 0
+    tool_outputs_truncated: int = 0
+    messages_outside_window: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _is_handoff_tool_message(message: BaseMessage) -> bool:
+    return isinstance(message, ToolMessage) and (
+        METADATA_KEY_HANDOFF_DESTINATION in message.response_metadata
+        or bool(message.response_metadata.get(METADATA_KEY_IS_HANDOFF_BACK))
+    )
+
+
+def _drop_handoff_messages(messages: list[BaseMessage]) -> list[BaseMessage]:
+    handoff_call_ids = {
+        message.tool_call_id for message in messages if _is_handoff_tool_message(message)
+    }
+    if not handoff_call_ids:
+        return messages
+
+    compacted = []
+    for message in messages:
+        if _is_handoff_tool_message(message):
+            continue
+        if isinstance(message, AIMessage) and any(
+            tool_call["id"] in handoff_call_ids for tool_call in message.tool_calls
+        ):
+            if message.response_metadata.get(METADATA_KEY_IS_HANDOFF_BACK):
+                continue
+            # keep the supervisor's other tool calls and any text it produced with the handoff
+            tool_calls = [
+                tool_call
+                for tool_call in message.tool_calls
+                if tool_call["id"] not in handoff_call_ids
+            ]
+            content = message.content
+            if isinstance(content, list):
+                content = [
+                    block
+                    for block in content
+                    if not (
+                        isinstance(block, dict)
+                        and block.get("type") == "tool_use"
+                        and block.get("id") in handoff_call_ids
+                    )
+                ]
+            if not content and not tool_calls:
+                continue
+            message = message.model_copy(update={"content": content, "tool_calls": tool_calls})
+        compacted.append(message)
+    return compacted
+
+
+class HistoryCompactor:
+    """Compact the message history the supervisor LLM sees on each turn.
+
+    Use it via `create_supervisor(..., history_compaction=HistoryCompactor(...))`. It runs as
+    the supervisor agent's `pre_model_hook` and only changes the LLM input: the graph state keeps
+    the full history (so tools like `forward_message` still find every worker message).
+
+    Compaction runs in three steps:
+
+    1. drop handoff bookkeeping messages (the `transfer_to_*` / `transfer_back_to_*` tool calls
+       and their tool messages),
+    2. truncate (or summarize) tool outputs larger than `max_tool_output_tokens`,
+    3. keep only the most recent messages that fit in `max_messages` / `max_tokens`.
+       The first human message (the original request) is always kept, and the window never
+       starts with tool messages cut off from their tool call.
+
+    Args:
+        drop_handoff_messages: Whether to drop handoff and handoff-back message pairs.
+        max_tool_output_tokens: Token budget per tool message. Larger outputs are truncated.
+            If None, tool outputs are left as they are.
+        summarize_tool_output: Optional function `(content, max_tokens) -> str` used instead of
+            truncation, e.g. to summarize a large result table with a cheap model.
+        max_messages: Maximum number of messages kept in the window. If None, no message limit.
+        max_tokens: Token budget of the window. If None, no token limit.
+            Both limits are soft when only tool results fit: the AI message that called
+            them is kept as well.
+        token_counter: Function estimating the token count of a single message.
+            Defaults to the fast character-based `estimate_message_tokens`.
+        on_compact: Optional callback receiving the `CompactionStats` of every turn.
+
+    Example:
+        ```python
+        compactor = HistoryCompactor(max_tool_output_tokens=500, max_tokens=8000)
+        workflow = create_supervisor(
+            [linkbrain_agent, analysis_agent],
+            model=model,
+            output_mode="full_history",
+            history_compaction=compactor,
+        )
+        ...
+        print(compactor.total_tokens_saved)
+        ```
+    """
+
+    def __init__(
+        self,
+        *,
+        drop_handoff_messages: bool = True,
+        max_tool_output_tokens: Optional[int] = 1000,
+        summarize_tool_output: Optional[Callable[[str, int], str]] = None,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        token_counter: Callable[[BaseMessage], int] = estimate_message_tokens,
+        on_compact: Optional[Callable[[CompactionStats], Any]] = None,
+    ):
+        self.drop_handoff_messages = drop_handoff_messages
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.summarize_tool_output = summarize_tool_output or truncate_text
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.on_compact = on_compact
+
+        self.last_stats: Optional[CompactionStats] = None
+        self.turns = 0
+        self.total_tokens_saved = 0
+
+    def _truncate_tool_outputs(self, messages: list[BaseMessage]) -> tuple[list[BaseMessage], int]:
+        if self.max_tool_output_tokens is None:
+            return messages, 0
+        compacted = []
+        truncated = 0
+        for message in messages:
+            if (
+                isinstance(message, ToolMessage)
+                and isinstance(message.content, str)
+                and self.token_counter(message) > self.max_tool_output_tokens
+            ):
+                content = self.summarize_tool_output(message.content, self.max_tool_output_tokens)
+                message = message.model_copy(update={"content": content})
+                truncated += 1
+            compacted.append(message)
+        return compacted, truncated
+
+    def _window(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        if self.max_messages is None and self.max_tokens is None:
+            return messages
+
+        first_human = next((m for m in messages if isinstance(m, HumanMessage)), None)
+        budget = self.max_tokens
+        limit = self.max_messages
+        if first_human is not None:
+            if budget is not None:
+                # a first request larger than the whole budget leaves no room, not a negative one
+                budget = max(0, budget - self.token_counter(first_human))
+            if limit is not None:
+                limit -= 1
+
+        start = len(messages)
+        kept = tokens = 0
+        while start > 0:
+            candidate = messages[start - 1]
+            if candidate is not first_human:
+                tokens += self.token_counter(candidate)
+                kept += 1
+                if (budget is not None and tokens > budget) or (limit is not None and kept > limit):
+                    break
+            start -= 1
+
+        # never start the window with tool messages whose tool call was cut off
+        end = start
+        while end < len(messages) and isinstance(messages[end], ToolMessage):
+            end += 1
+        if end < len(messages) or start == len(messages):
+            start = end
+        else:
+            # only tool results fit: keep the AI message that called them instead
+            while start > 0 and isinstance(messages[start], ToolMessage):
+                start -= 1
+
+        window = messages[start:]
+        if first_human is not None and not any(m is first_human for m in window):
+            window = [first_human, *window]
+        return window
+
+    def compact(self, messages: Sequence[BaseMessage]) -> tuple[list[BaseMessage], CompactionStats]:
+        """Compact a message history and return it with the metrics of this compaction."""
+        messages = list(messages)
+        tokens_before = sum(self.token_counter(m) for m in messages)
+
+        compacted = messages
+        handoff_dropped = 0
+        if self.drop_handoff_messages:
+            compacted = _drop_handoff_messages(compacted)
+            handoff_dropped = len(messages) - len(compacted)
+
+        compacted, truncated = self._truncate_tool_outputs(compacted)
+
+        before_window = len(compacted)
+        compacted = self._window(compacted)
+
+        stats = CompactionStats(
+            messages_before=len(messages),
+            messages_after=len(compacted),
+            tokens_before=tokens_before,
+            tokens_after=sum(self.token_counter(m) for m in compacted),
+            handoff_messages_dropped=handoff_dropped,
+            tool_outputs_truncated=truncated,
+            messages_outside_window=before_window - len(compacted),
+        )
+        return compacted, stats
+
+    def __call__(self, state: dict) -> dict:
+        """Pre-model hook: return the compacted history as the LLM input."""
+        messages = state["messages"] if isinstance(state, dict) else state.messages
+        compacted, stats = self.compact(messages)
+
+        self.last_stats = stats
+        self.turns += 1
+        self.total_tokens_saved += stats.tokens_saved
+        logger.debug(
+            f"Compacted supervisor history: {stats.messages_before} -> {stats.messages_after} messages, "
+            f"~{stats.tokens_before} -> ~{stats.tokens_after} tokens ({stats.tokens_saved} saved)"
+        )
+        if self.on_compact is not None:
+            self.on_compact(stats)
+        return {"llm_input_messages": compacted}
+
+
+@dataclass
+class OutputBudget:
+    """Token budget for the `"token_budget"` agent output mode.
+
+    Attributes:
+        max_tokens: Total token budget of the messages added to the supervisor history
+            per agent call (excluding handoff-back messages).
+        max_tool_results: Maximum number of the agent's most recent tool results to keep.
+        max_tool_result_tokens: Token budget per kept tool result; larger results are truncated.
+    """
+
+    max_tokens: int = 2000
+    max_tool_results: int = 3
+    max_tool_result_tokens: int = 500
+
+
+def _with_tool_calls(message: AIMessage, tool_call_ids: set[str]) -> AIMessage:
+    """Copy of an AI message keeping only the given tool calls (and their tool_use blocks)."""
+    content = message.content
+    if isinstance(content, list):
+        content = [
+            block
+            for block in content
+            if not (
+                isinstance(block, dict)
+                and block.get("type") == "tool_use"
+                and block.get("id") not in tool_call_ids
+            )
+        ]
+    tool_calls = [tool_call for tool_call in message.tool_calls if tool_call["id"] in tool_call_ids]
+    return message.model_copy(update={"content": content, "tool_calls": tool_calls})
+
+
+def select_output_messages(
+    messages: Sequence[BaseMessage],
+    budget: OutputBudget,
+    token_counter: Callable[[BaseMessage], int] = estimate_message_tokens,
+) -> list[BaseMessage]:
+    """Select an agent's final answer plus its most recent tool results within a token budget.
+
+    Tool results are taken newest first, truncated to `budget.max_tool_result_tokens`, and kept
+    while they fit in `budget.max_tokens` together with the final answer. Each kept tool result
+    is preceded by the AI message that called it (reduced to the kept tool calls), so the
+    selected messages always form a valid history in their original order.
+
+    Args:
+        messages: Messages produced by the agent during this call.
+        budget: Token budget to select messages with.
+        token_counter: Function estimating the token count of a single message.
+    """
+    if not messages:
+        return []
+
+    final = messages[-1]
+    if isinstance(final.content, str) and token_counter(final) > budget.max_tokens:
+        final = final.model_copy(
+            update={"content": truncate_text(final.content, budget.max_tokens)}
+        )
+    remaining = max(0, budget.max_tokens - token_counter(final))
+
+    callers: dict[str, int] = {}
+    for index, message in enumerate(messages[:-1]):
+        if isinstance(message, AIMessage):
+            for tool_call in message.tool_calls:
+                callers[tool_call["id"]] = index
+
+    kept_results: dict[int, BaseMessage] = {}
+    kept_calls: dict[int, set[str]] = {}
+    for index in range(len(messages) - 2, -1, -1):
+        if len(kept_results) >= budget.max_tool_results:
+            break
+        message = messages[index]
+        if not isinstance(message, ToolMessage) or message.tool_call_id not in callers:
+            continue
+        if isinstance(message.content, str):
+            message = message.model_copy(
+                update={"content": truncate_text(message.content, budget.max_tool_result_tokens)}
+            )
+        caller = callers[message.tool_call_id]
+        call_ids = kept_calls.get(caller, set()) | {message.tool_call_id}
+        # the caller's cost is re-estimated as it grows by one more kept tool call
+        previous_cost = (
+            token_counter(_with_tool_calls(messages[caller], kept_calls[caller]))
+            if caller in kept_calls
+            else 0
+        )
+        cost = (
+            token_counter(message)
+            + token_counter(_with_tool_calls(messages[caller], call_ids))
+            - previous_cost
+        )
+        if cost > remaining:
+            continue
+        remaining -= cost
+        kept_results[index] = message
+        kept_calls[caller] = call_ids
+
+    selected: list[BaseMessage] = []
+    for index, message in enumerate(messages[:-1]):
+        if index in kept_calls:
+            selected.append(_with_tool_calls(message, kept_calls[index]))
+        elif index in kept_results:
+            selected.append(kept_results[index])
+    selected.append(final)
+    return selected
@@ -2,15 +2,20 @@ import re
 import uuid
 from typing import cast
 
-from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.messages import AIMessage, BaseMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool, InjectedToolCallId, tool
 from langgraph.prebuilt import InjectedState
+from langgraph.pregel.read import ChannelRead
 from langgraph.types import Command, Send
 from typing_extensions import Annotated
 
 WHITESPACE_RE = re.compile(r"\s+")
 METADATA_KEY_HANDOFF_DESTINATION = "__handoff_destination"
 METADATA_KEY_IS_HANDOFF_BACK = "__is_handoff_back"
+# State key of a parallel handoff payload that holds only the branch's own messages:
+# the ID of the last parent graph message that precedes them
+STATE_KEY_HANDOFF_PREFIX_ID = "__handoff_prefix_id"
 
 
 def _normalize_agent_name(agent_name: str) -> str:
@@ -47,12 +52,39 @@ def _remove_non_handoff_tool_calls(
     return last_ai_message
 
 
+def _get_turn_messages(messages: list[BaseMessage]) -> list[BaseMessage] | None:
+    """Get the messages the calling agent added in its current turn, ending with its last AI message.
+
+    These are the trailing AI messages named after the agent calling the handoff tool and
+    the tool messages answering them. Everything before them is already in the parent graph
+    state, so only this delta has to be sent back with the handoff.
+    Returns None if the caller cannot be identified (unnamed AI message).
+    """
+    agent_name = messages[-1].name
+    if not agent_name:
+        return None
+
+    start = len(messages) - 1
+    while start > 0:
+        message = messages[start - 1]
+        if not isinstance(message, ToolMessage) and not (
+            isinstance(message, AIMessage) and message.name == agent_name
+        ):
+            break
+        start -= 1
+    # tool messages answering an earlier agent (e.g. a handoff back) are not part of the turn
+    while isinstance(messages[start], ToolMessage):
+        start += 1
+    return messages[start:]
+
+
 def create_handoff_tool(
     *,
     agent_name: str,
     name: str | None = None,
     description: str | None = None,
     add_handoff_messages: bool = True,
+    share_parent_history: bool = False,
 ) -> BaseTool:
     """Create a tool that can handoff control to the requested agent.
 
@@ -69,6 +101,11 @@ def create_handoff_tool(
             If not provided, the description will be `Ask agent <agent_name> for help`.
         add_handoff_messages: Whether to add handoff messages to the message history.
             If False, the handoff messages will be omitted from the message history.
+        share_parent_history: Whether parallel handoffs send each agent only its own branch messages
+            plus a reference to the parent graph's message history, instead of a full copy of the
+            history per agent. The receiving node must restore the full state with
+            `resolve_handoff_state` before the state reaches a typed (e.g. Pydantic) schema,
+            which `create_supervisor(..., share_parent_history=True)` does for its managed agents.
     """
     if name is None:
         name = f"transfer_to_{_normalize_agent_name(agent_name)}"
@@ -90,7 +127,19 @@ def create_handoff_tool(
         last_ai_message = cast(AIMessage, state["messages"][-1])
         # Handle parallel handoffs
         if len(last_ai_message.tool_calls) > 1:
-            handoff_messages = state["messages"][:-1]
+            turn_messages = _get_turn_messages(state["messages"]) if share_parent_history else None
+            if turn_messages is None:
+                branch_state = state
+                handoff_messages = state["messages"][:-1]
+            else:
+                # the parent graph already has the history before this turn: every branch
+                # references it by the ID of its last message instead of carrying a copy
+                prefix = state["messages"][: len(state["messages"]) - len(turn_messages)]
+                branch_state = {
+                    **state,
+                    STATE_KEY_HANDOFF_PREFIX_ID: prefix[-1].id if prefix else None,
+                }
+                handoff_messages = turn_messages[:-1]
             if add_handoff_messages:
                 handoff_messages.extend(
                     (
@@ -102,14 +151,19 @@ def create_handoff_tool(
                 graph=Command.PARENT,
                 # NOTE: we are using Send here to allow the ToolNode in langgraph.prebuilt
                 # to handle parallel handoffs by combining all Send commands into a single command
-                goto=[Send(agent_name, {**state, "messages": handoff_messages})],
+                goto=[Send(agent_name, {**branch_state, "messages": handoff_messages})],
             )
         # Handle single handoff
         else:
+            # The parent graph state already has everything but the current turn, and the
+            # add_messages reducer appends, so only the turn's messages are sent back
+            turn_messages = _get_turn_messages(state["messages"])
+            if turn_messages is None:
+                turn_messages = state["messages"]
             if add_handoff_messages:
-                handoff_messages = state["messages"] + [tool_message]
+                handoff_messages = turn_messages + [tool_message]
             else:
-                handoff_messages = state["messages"][:-1]
+                handoff_messages = turn_messages[:-1]
             return Command(
                 goto=agent_name,
                 graph=Command.PARENT,
@@ -120,6 +174,52 @@ def create_handoff_tool(
     return handoff_to_agent
 
 
+def _read_parent_messages(config: RunnableConfig) -> list[BaseMessage]:
+    """Read the parent graph's current messages from inside one of its nodes.
+
+    LangGraph has no public API for reading channels from a running node, so this goes through
+    the same channel reader the graph uses for node inputs. It is confined here so a LangGraph
+    change fails loudly instead of silently dropping the shared history.
+    """
+    try:
+        return ChannelRead.do_read(config, select="messages")
+    except (KeyError, AttributeError, TypeError) as e:
+        raise RuntimeError(
+            "Could not read the parent graph's messages to restore a shared-history handoff. "
+            "resolve_handoff_state must run inside a node of the graph that sent the handoff; "
+            "otherwise create the handoff tools with share_parent_history=False."
+        ) from e
+
+
+def resolve_handoff_state(state: dict, config: RunnableConfig) -> dict:
+    """Restore the full input state of an agent reached by a shared-history parallel handoff.
+
+    Prepends the parent graph's messages up to the referenced message to the branch messages
+    and removes the reference key, so it never reaches the agent's own state schema.
+    States without a history reference are returned unchanged.
+
+    Args:
+        state: Input state of the agent node.
+        config: Config of the agent node, used to read the parent graph's messages.
+    """
+    if not isinstance(state, dict) or STATE_KEY_HANDOFF_PREFIX_ID not in state:
+        return state
+
+    prefix_id = state[STATE_KEY_HANDOFF_PREFIX_ID]
+    state = {key: value for key, value in state.items() if key != STATE_KEY_HANDOFF_PREFIX_ID}
+    if prefix_id is None:
+        return state
+
+    parent_messages = _read_parent_messages(config)
+    # the prefix normally ends at the last parent message, so search from the end
+    for index in range(len(parent_messages) - 1, -1, -1):
+        if parent_messages[index].id == prefix_id:
+            return {**state, "messages": parent_messages[: index + 1] + state["messages"]}
+    raise ValueError(
+        f"Message '{prefix_id}' referenced by the handoff was not found in the graph state."
+    )
+
+
 def create_handoff_back_messages(
     agent_name: str, supervisor_name: str
 ) -> tuple[AIMessage, ToolMessage]:
@@ -0,0 +1,284 @@
+"""Background health monitoring and circuit breaking for Neo4j drivers.
+
+Query paths report the outcome of the queries they already run
+(`record_success` / `record_failure`), so health is tracked without an extra
+database round-trip per query. A background task only probes the database when
+there has been no recent traffic or while the circuit is open, backing off
+exponentially (with full jitter) between failed probes. `Neo4jHealthMonitor.call`
+runs a query attempt behind the circuit breaker, reports its outcome and retries
+connectivity errors.
+
+Circuit states:
+
+- `closed`: requests flow normally.
+- `open`: the database is considered down and requests fail fast with
+  `CircuitOpenError` until the next probe is due.
+- `half_open`: the retry delay has elapsed; a single trial request (or probe)
+  is let through and its outcome closes or re-opens the circuit.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from neo4j.exceptions import AuthError, Neo4jError, ServiceUnavailable, SessionExpired
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the database is known to be down."""
+
+    def __init__(self, retry_in: float, last_error: Optional[str] = None):
+        self.retry_in = retry_in
+        self.last_error = last_error
+        message = f"Neo4j is unavailable, retrying in {retry_in:.1f}s"
+        if last_error:
+            message += f" (last error: {last_error})"
+        super().__init__(message)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter: a random delay in `[0, min(maximum, base * 2**attempt)]`."""
+    return random.uniform(0, min(maximum, base * (2**attempt)))
+
+
+class Neo4jHealthMonitor:
+    """Tracks driver liveness and guards requests with a circuit breaker.
+
+    Args:
+        probe: Coroutine function checking connectivity, e.g.
+            `lambda: connector.get_driver().verify_connectivity()`. It should raise on failure.
+        interval: Seconds without successful traffic after which the background task probes.
+        failure_threshold: Consecutive failures that open the circuit.
+        backoff_base: Base delay in seconds of the exponential backoff between failed attempts.
+        backoff_max: Upper bound in seconds of a single backoff delay.
+        on_open: Optional coroutine function called when the circuit opens, e.g. to discard
+            a broken driver so the next probe builds a fresh one.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[Any]],
+        interval: float = 30.0,
+        failure_threshold: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        on_open: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self._probe = probe
+        self.interval = interval
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._on_open = on_open
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.opened_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._trial: Optional[object] = None  # token of the half-open trial in flight
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # strong references to spawned callbacks, the event loop only keeps weak ones
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @property
+    def healthy(self) -> bool:
+        return self.state == CLOSED
+
+    def before_request(self) -> Optional[object]:
+        """Fail fast while the circuit is open.
+
+        Returns:
+            A token if this request is the half-open trial, to pass to `release_trial`, else None.
+
+        Raises:
+            CircuitOpenError: If the database is known to be down and no retry is due yet.
+        """
+        if self.state == CLOSED:
+            return None
+        now = time.monotonic()
+        if self.state == OPEN and now >= self._retry_at:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and self._trial is None:
+            # let exactly one trial request through; its outcome decides the next state
+            self._trial = object()
+            return self._trial
+        raise CircuitOpenError(max(0.0, self._retry_at - now), self.last_error)
+
+    def release_trial(self, trial: Optional[object]) -> None:
+        """End a request without reporting an outcome, e.g. when it was cancelled.
+
+        Call it in a `finally` with the token returned by `before_request`: if the request was the
+        half-open trial and its outcome was not recorded, the next request can be the trial.
+        """
+        if trial is not None and self._trial is trial:
+            self._trial = None
+
+    def record_success(self) -> None:
+        """Report a successful query or probe."""
+        self.last_success = time.monotonic()
+        self.consecutive_failures = 0
+        self._trial = None
+        if self.state != CLOSED:
+            logger.info("Neo4j is reachable again, closing circuit")
+            self.state = CLOSED
+            self.opened_at = None
+
+    def record_failure(self, error: BaseException) -> None:
+        """Report a connectivity failure (not a query error such as a syntax error)."""
+        now = time.monotonic()
+        self.last_failure = now
+        self.last_error = str(error) or type(error).__name__
+        self.consecutive_failures += 1
+        self._trial = None
+        self._retry_at = now + backoff_delay(
+            self.consecutive_failures - 1, self.backoff_base, self.backoff_max
+        )
+        if self.state != CLOSED:
+            self.state = OPEN
+        elif self.consecutive_failures >= self.failure_threshold:
+            logger.warning(
+                f"Neo4j unavailable after {self.consecutive_failures} failures, opening circuit"
+            )
+            self.state = OPEN
+            self.opened_at = now
+            if self._on_open is not None:
+                self._spawn(self._on_open())
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def call(self, attempt: Callable[[], Awaitable[Any]], max_retry: int = 3) -> Any:
+        """Run `attempt()` behind the circuit breaker and report its outcome.
+
+        Connectivity errors (`ServiceUnavailable`, `SessionExpired`) are retried up to `max_retry`
+        attempts in total, backing off exponentially (with full jitter) in between. An `AuthError`
+        is recorded as a failure but not retried, and any other `Neo4jError` proves the server
+        answered, so it counts as a success and is re-raised.
+
+        Args:
+            attempt: Coroutine function running one attempt, e.g. opening a session and
+                running a query in it.
+            max_retry: Maximum number of attempts.
+
+        Returns:
+            The value returned by the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If the database is known to be down and no retry is due yet.
+        """
+        for retry in range(max(1, max_retry)):
+            trial = self.before_request()
+            try:
+                value = await attempt()
+            except (ServiceUnavailable, SessionExpired) as e:
+                logger.warning(f"Neo4j unavailable (attempt {retry + 1}/{max_retry}): {e}")
+                self.record_failure(e)
+                if retry + 1 >= max_retry:
+                    raise
+                await asyncio.sleep(backoff_delay(retry, self.backoff_base, self.backoff_max))
+            except AuthError as e:
+                # wrong credentials fail the same way on every attempt
+                self.record_failure(e)
+                raise
+            except Neo4jError:
+                self.record_success()
+                raise
+            else:
+                self.record_success()
+                return value
+            finally:
+                # attempts ending without an outcome (cancelled, DriverError) release the trial too
+                self.release_trial(trial)
+
+    async def check(self) -> bool:
+        """Probe the database now and update the state. Returns whether it is reachable."""
+        try:
+            await self._probe()
+        except Exception as e:
+            self.record_failure(e)
+            return False
+        self.record_success()
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current health state, without touching the database."""
+        now = time.monotonic()
+
+        def ago(timestamp: Optional[float]) -> Optional[float]:
+            return None if timestamp is None else round(now - timestamp, 3)
+
+        return {
+            "state": self.state,
+            "healthy": self.healthy,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "seconds_since_success": ago(self.last_success),
+            "seconds_since_failure": ago(self.last_failure),
+            "open_for": ago(self.opened_at),
+            "retry_in": round(max(0.0, self._retry_at - now), 3) if self.state != CLOSED else None,
+            "monitoring": self._task is not None and not self._task.done(),
+        }
+
+    def _next_probe_delay(self) -> float:
+        if self.consecutive_failures:
+            # back off between failed probes, whether or not the circuit has opened yet
+            return max(0.0, self._retry_at - time.monotonic())
+        if self.last_success is None:
+            return 0.0
+        return max(0.0, self.last_success + self.interval - time.monotonic())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_probe_delay())
+                continue  # state changed; recompute the delay
+            except asyncio.TimeoutError:
+                pass
+            if self._next_probe_delay() > 0:
+                # traffic refreshed liveness (or a failure pushed the retry back) while sleeping
+                continue
+            if self.state != CLOSED:
+                self.state = HALF_OPEN
+                self._trial = object()
+            await self.check()
+
+    def _spawn(self, coroutine: Awaitable[Any]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coroutine.close()
+            return
+        task = loop.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def start(self) -> None:
+        """Start the background monitor on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background monitor."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -1,71 +1,401 @@
-import requests
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import random
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
+
+import httpx
+import requests
+from langchain_core.tools import StructuredTool
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 logger = logging.getLogger(__name__)
 
+# 연결 타임아웃 3초, 응답 대기 타임아웃 30초
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.0, 30.0)
+# 재시도할 HTTP 상태 코드 (API 서버 재시작/과부하)
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+
+def _is_connect_error(error: Exception) -> bool:
+    """요청이 서버로 전송되기 전에 실패했는지 (쓰기 쿼리도 안전하게 재시도 가능)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+# 서버에 배치 엔드포인트가 없음을 나타내는 값
+_UNSUPPORTED = object()
+
+
+def _batch_item(query: Any) -> Dict[str, Any]:
+    if isinstance(query, str):
+        return {"query": query, "params": {}}
+    return {"query": query["query"], "params": query.get("params") or {}}
+
+
+def _single_to_batch_result(body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if body is None:
+        return {"success": False, "results": [], "error": "HTTP request failed"}
+    return {"success": bool(body.get("success", False)), "results": body.get("results", []), "error": body.get("error")}
+
+
+def _split_batch_response(body: Optional[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """배치 응답을 쿼리별 결과로 나눕니다. 요청 자체가 실패하면 모든 쿼리를 실패로 표시합니다."""
+    if body is None or not body.get("success", False) or len(body.get("results", [])) != count:
+        error = (body or {}).get("error") or "HTTP batch request failed"
+        return [{"success": False, "results": [], "error": error} for _ in range(count)]
+    return [_single_to_batch_result(item) for item in body["results"]]
+
+
+class RetryBudget:
+    """클라이언트 전체에서 공유하는 재시도 예산
+
+    요청마다 `ratio`만큼 토큰이 쌓이고 재시도할 때마다 토큰 1개를 씁니다.
+    API 서버가 다운되었을 때 모든 요청이 재시도를 반복해 부하를 키우지 않도록
+    재시도 횟수를 전체 요청 수의 일정 비율로 제한합니다.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, max_tokens)
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
 class Neo4jHttpTools:
-    """HTTP를 통해 Neo4j API 서버와 통신하는 도구"""
-    
-    def __init__(self, api_base_url: str = "http://localhost:8000"):
-        self.api_base_url = api_base_url
+    """HTTP를 통해 Neo4j API 서버와 통신하는 도구
+
+    커넥션 풀(keep-alive)을 유지하는 `requests.Session`을 재사용하고,
+    비동기 LangGraph 노드에서는 `httpx.AsyncClient` 기반의 `aread_neo4j`/`awrite_neo4j`를 사용합니다.
+    연결 실패는 항상, 응답 타임아웃과 5xx 응답은 읽기 쿼리에서만 재시도합니다
+    (쓰기 쿼리는 서버에서 이미 반영되었을 수 있으므로 재시도하지 않음).
+
+    Args:
+        api_base_url: Neo4j API 서버 주소
+        timeout: 초 단위 타임아웃. 숫자 하나 또는 (연결, 응답 대기) 튜플
+        max_retries: 요청 하나당 최대 재시도 횟수
+        backoff_factor: 재시도 대기 시간의 기준값 (지수 백오프 + 지터)
+        pool_maxsize: 호스트당 유지할 최대 연결 수
+        max_batch_size: `read_many`/`write_many`가 요청 하나에 담을 최대 쿼리 수
+        retry_budget: 여러 클라이언트가 공유할 재시도 예산 (기본: 클라이언트별 예산)
+    """
+
+    def __init__(
+        self,
+        api_base_url: str = "http://localhost:8000",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = 2,
+        backoff_factor: float = 0.2,
+        pool_maxsize: int = 10,
+        max_batch_size: int = 100,
+        retry_budget: Optional[RetryBudget] = None,
+    ):
+        self.api_base_url = api_base_url.rstrip("/")
+        self.timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.max_batch_size = max_batch_size
+        self._batch_supported = True
+        self.retry_budget = retry_budget or RetryBudget()
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # 이벤트 루프별 (비동기 클라이언트, 루프 종료 시 클라이언트를 닫는 제너레이터)
+        self._async_clients: Dict[
+            asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]
+        ] = {}
         logger.info(f"Neo4j HTTP Tools initialized with API URL: {api_base_url}")
-    
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_factor * (2**attempt))
+
+    def _should_retry(self, attempt: int, idempotent: bool, connect_error: bool) -> bool:
+        if attempt >= self.max_retries or not (connect_error or idempotent):
+            return False
+        return self.retry_budget.withdraw()
+
+    @staticmethod
+    def _parse_result(result: Optional[Dict[str, Any]], kind: str) -> List[Dict[str, Any]]:
+        if result is None:
+            return []
+        if not result.get("success", False):
+            logger.error(f"Neo4j {kind} query failed: {result.get('error')}")
+            return []
+        return result.get("results", [])
+
+    def _post(self, path: str, payload: Dict[str, Any], kind: str, missing_ok: bool = False) -> Any:
+        """JSON 요청을 보내고 응답 본문을 반환합니다. 실패하면 None을 반환합니다.
+
+        `missing_ok`이면 엔드포인트가 없을 때(404/405) `_UNSUPPORTED`를 반환합니다.
+        """
+        endpoint = f"{self.api_base_url}{path}"
+        idempotent = kind == "read"
+        self.retry_budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(endpoint, json=payload, timeout=self.timeout)
+                if missing_ok and response.status_code in (404, 405):
+                    return _UNSUPPORTED
+                if response.status_code in RETRY_STATUS_CODES and self._should_retry(attempt, idempotent, False):
+                    logger.warning(f"Neo4j API returned {response.status_code}")
+                else:
+                    response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
+                    return response.json()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not self._should_retry(attempt, idempotent, _is_connect_error(e)):
+                    logger.error(f"Error executing Neo4j {kind} query via HTTP: {e}")
+                    return None
+            except Exception as e:
+                logger.error(f"Error executing Neo4j {kind} query via HTTP: {e}")
+                return None
+            attempt += 1
+            logger.warning(f"Retrying Neo4j {kind} query via HTTP (attempt {attempt}/{self.max_retries})")
+            time.sleep(self._backoff(attempt - 1))
+
     def read_neo4j(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Neo4j 읽기 쿼리 실행"""
-        if params is None:
-            params = {}
-        
-        endpoint = f"{self.api_base_url}/api/read"
-        payload = {"query": query, "params": params}
-        
-        try:
-            response = requests.post(endpoint, json=payload)
-            response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-            
-            result = response.json()
-            if not result.get("success", False):
-                logger.error(f"Neo4j read query failed: {result.get('error')}")
-                return []
-            
-            return result.get("results", [])
-        except Exception as e:
-            logger.error(f"Error executing Neo4j read query via HTTP: {e}")
-            return []
-    
+        return self._parse_result(self._post("/api/read", {"query": query, "params": params or {}}, "read"), "read")
+
     def write_neo4j(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Neo4j 쓰기 쿼리 실행"""
-        if params is None:
-            params = {}
-        
-        endpoint = f"{self.api_base_url}/api/write"
-        payload = {"query": query, "params": params}
-        
+        return self._parse_result(self._post("/api/write", {"query": query, "params": params or {}}, "write"), "write")
+
+    def _batches(self, queries: List[Any]) -> List[List[Dict[str, Any]]]:
+        items = [_batch_item(query) for query in queries]
+        size = max(1, self.max_batch_size)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _post_many(self, kind: str, queries: List[Any]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for batch in self._batches(queries):
+            body = None
+            if self._batch_supported:
+                body = self._post(f"/api/{kind}_many", {"queries": batch}, kind, missing_ok=True)
+                if body is _UNSUPPORTED:
+                    logger.warning("Neo4j API server has no batch endpoint, sending queries one by one")
+                    self._batch_supported = False
+            if not self._batch_supported:
+                results.extend(
+                    _single_to_batch_result(self._post(f"/api/{kind}", item, kind))
+                    for item in batch
+                )
+                continue
+            results.extend(_split_batch_response(body, len(batch)))
+        return results
+
+    def read_many(self, queries: List[Any]) -> List[Dict[str, Any]]:
+        """여러 읽기 쿼리를 한 번의 요청으로 실행합니다.
+
+        Args:
+            queries: 쿼리 문자열 또는 {"query": ..., "params": {...}} 딕셔너리 목록.
+                `max_batch_size`보다 많으면 여러 요청으로 나누어 보냅니다.
+
+        Returns:
+            입력 순서대로 {"success": bool, "results": [...], "error": str | None} 목록.
+            서버에 배치 엔드포인트가 없으면 쿼리별 요청으로 대신 처리합니다.
+        """
+        return self._post_many("read", queries)
+
+    def write_many(self, queries: List[Any]) -> List[Dict[str, Any]]:
+        """여러 쓰기 쿼리를 한 번의 요청으로 실행합니다. 형식은 `read_many`와 같습니다.
+
+        쿼리들이 하나의 트랜잭션으로 묶이는지는 API 서버 구현에 따릅니다.
+        """
+        return self._post_many("write", queries)
+
+    async def _close_with_loop(
+        self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient
+    ) -> AsyncGenerator[None, None]:
+        """루프가 끝날 때 `client`를 닫는 비동기 제너레이터
+
+        닫힌 루프에서는 `AsyncClient.aclose()`를 호출할 수 없습니다. `asyncio.run`은 루프를 닫기 전에
+        살아 있는 비동기 제너레이터를 정리(`shutdown_asyncgens`)하므로, 이 제너레이터의 finally에서
+        아직 살아 있는 루프 위에서 클라이언트의 연결을 닫습니다.
+        """
         try:
-            response = requests.post(endpoint, json=payload)
-            response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-            
-            result = response.json()
-            if not result.get("success", False):
-                logger.error(f"Neo4j write query failed: {result.get('error')}")
-                return []
-            
-            return result.get("results", [])
-        except Exception as e:
-            logger.error(f"Error executing Neo4j write query via HTTP: {e}")
-            return []
+            yield
+        finally:
+            entry = self._async_clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._async_clients[loop]
+            await client.aclose()
+
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # 연결은 이벤트 루프에 묶이므로 루프마다(asyncio.run을 여러 번 호출한 경우 등) 클라이언트를 따로 사용
+        entry = self._async_clients.get(loop)
+        if entry is not None and not entry[0].is_closed:
+            return entry[0]
+        connect_timeout, read_timeout = self.timeout
+        client = httpx.AsyncClient(
+            base_url=self.api_base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize,
+            ),
+        )
+        closer = self._close_with_loop(loop, client)
+        await closer.__anext__()
+        self._async_clients[loop] = (client, closer)
+        return client
+
+    async def _apost(self, path: str, payload: Dict[str, Any], kind: str, missing_ok: bool = False) -> Any:
+        """`_post`의 비동기 버전"""
+        client = await self._get_async_client()
+        idempotent = kind == "read"
+        self.retry_budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                response = await client.post(path, json=payload)
+                if missing_ok and response.status_code in (404, 405):
+                    return _UNSUPPORTED
+                if response.status_code in RETRY_STATUS_CODES and self._should_retry(attempt, idempotent, False):
+                    logger.warning(f"Neo4j API returned {response.status_code}")
+                else:
+                    response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
+                    return response.json()
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # 요청이 전송되지 않았으므로 쓰기 쿼리도 재시도 가능
+                if not self._should_retry(attempt, idempotent, True):
+                    logger.error(f"Error executing Neo4j {kind} query via HTTP: {e}")
+                    return None
+            except httpx.TransportError as e:
+                if not self._should_retry(attempt, idempotent, False):
+                    logger.error(f"Error executing Neo4j {kind} query via HTTP: {e}")
+                    return None
+            except Exception as e:
+                logger.error(f"Error executing Neo4j {kind} query via HTTP: {e}")
+                return None
+            attempt += 1
+            logger.warning(f"Retrying Neo4j {kind} query via HTTP (attempt {attempt}/{self.max_retries})")
+            await asyncio.sleep(self._backoff(attempt - 1))
+
+    async def aread_neo4j(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Neo4j 읽기 쿼리 비동기 실행"""
+        return self._parse_result(await self._apost("/api/read", {"query": query, "params": params or {}}, "read"), "read")
+
+    async def awrite_neo4j(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Neo4j 쓰기 쿼리 비동기 실행"""
+        return self._parse_result(await self._apost("/api/write", {"query": query, "params": params or {}}, "write"), "write")
+
+    async def _apost_many(self, kind: str, queries: List[Any]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for batch in self._batches(queries):
+            body = None
+            if self._batch_supported:
+                body = await self._apost(f"/api/{kind}_many", {"queries": batch}, kind, missing_ok=True)
+                if body is _UNSUPPORTED:
+                    logger.warning("Neo4j API server has no batch endpoint, sending queries one by one")
+                    self._batch_supported = False
+            if not self._batch_supported:
+                # 배치 엔드포인트가 없으면 같은 커넥션 풀에서 동시에 요청
+                bodies = await asyncio.gather(*(self._apost(f"/api/{kind}", item, kind) for item in batch))
+                results.extend(_single_to_batch_result(body) for body in bodies)
+                continue
+            results.extend(_split_batch_response(body, len(batch)))
+        return results
+
+    async def aread_many(self, queries: List[Any]) -> List[Dict[str, Any]]:
+        """`read_many`의 비동기 버전"""
+        return await self._apost_many("read", queries)
+
+    async def awrite_many(self, queries: List[Any]) -> List[Dict[str, Any]]:
+        """`write_many`의 비동기 버전"""
+        return await self._apost_many("write", queries)
+
+    def close(self) -> None:
+        """동기 세션의 커넥션 풀을 닫습니다."""
+        self._session.close()
+
+    async def aclose(self) -> None:
+        """동기 세션과 현재 이벤트 루프의 비동기 클라이언트 커넥션 풀을 닫습니다.
+
+        다른 루프의 클라이언트는 그 루프가 `asyncio.run` 등으로 종료될 때 닫힙니다.
+        """
+        self.close()
+        entry = self._async_clients.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    def __enter__(self) -> "Neo4jHttpTools":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "Neo4jHttpTools":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+def create_neo4j_http_tools(
+    api_base_url: str = "http://localhost:8000",
+    async_tools: bool = False,
+    **client_kwargs: Any,
+):
+    """Neo4j HTTP 도구 생성
+
+    Args:
+        api_base_url: Neo4j API 서버 주소
+        async_tools: True이면 동기 래퍼 대신 `read_neo4j`/`write_neo4j` LangChain 도구를 반환합니다.
+            두 도구 모두 동기 구현과 비동기 구현을 함께 가지므로 `invoke`에서는 커넥션 풀을 쓰는
+            `requests.Session`을, `ainvoke`(예: `app.ainvoke`)에서는 이벤트 루프를 막지 않는
+            `httpx.AsyncClient`를 사용합니다. 모든 도구가 하나의 `Neo4jHttpTools`를 공유하므로
+            병렬 에이전트 분기의 요청이 같은 커넥션 풀에서 동시에 처리됩니다.
+        client_kwargs: `Neo4jHttpTools`에 그대로 전달됩니다 (timeout, max_retries 등).
+
+    Returns:
+        (도구 목록, Neo4jHttpTools 인스턴스)
+    """
+    tools = Neo4jHttpTools(api_base_url, **client_kwargs)
+
+    if async_tools:
+        read_tool = StructuredTool.from_function(
+            func=tools.read_neo4j,
+            coroutine=tools.aread_neo4j,
+            name="read_neo4j",
+            description="읽기 전용 Neo4j Cypher 쿼리 실행",
+        )
+        write_tool = StructuredTool.from_function(
+            func=tools.write_neo4j,
+            coroutine=tools.awrite_neo4j,
+            name="write_neo4j",
+            description="쓰기 Neo4j Cypher 쿼리 실행",
+        )
+        return [read_tool, write_tool], tools
 
-def create_neo4j_http_tools(api_base_url: str = "http://localhost:8000"):
-    """Neo4j HTTP 도구 생성"""
-    tools = Neo4jHttpTools(api_base_url)
-    
     # 동기 함수 래퍼 (LangGraph용)
     def read_neo4j_sync(query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """읽기 전용 Neo4j Cypher 쿼리 실행"""
         return tools.read_neo4j(query, params or {})
-    
+
     def write_neo4j_sync(query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """쓰기 Neo4j Cypher 쿼리 실행"""
         return tools.write_neo4j(query, params or {})
-    
-    return [read_neo4j_sync, write_neo4j_sync], tools 
\ No newline at end of file
+
+    return [read_neo4j_sync, write_neo4j_sync], tools
@@ -1,107 +1,274 @@
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
-
-from neo4j import AsyncGraphDatabase, AsyncDriver
-from neo4j.exceptions import Neo4jError
+import time
+from typing import Any, Dict, List, Optional, Sequence
 
 # Import the Server and types from mcp.server module
-from mcp.server import Server
 import mcp.types as types
+from mcp.server import Server
+from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncManagedTransaction
+from neo4j.exceptions import DriverError, Neo4jError, TransientError
+
+from langgraph_supervisor.neo4j_health import backoff_delay
+from langgraph_supervisor.neo4j_serializer import dumps, record_to_dict, to_jsonable
 
 logger = logging.getLogger(__name__)
 
+# Summary counters aggregated over the batches of a bulk write
+_BULK_COUNTERS = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+)
+
+async def _read_records(tx: AsyncManagedTransaction, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Results must be consumed inside the transaction function, which the driver may retry.
+    # Records are streamed once, without an intermediate values() copy.
+    result = await tx.run(query, params)
+    keys = result.keys()
+    return [dict(zip(keys, record, strict=True)) async for record in result]
+
+
+async def _read_json_text(tx: AsyncManagedTransaction, query: str, params: Dict[str, Any], columnar: bool) -> str:
+    # Each record is serialized as soon as it arrives, so only compact JSON fragments are
+    # kept instead of a tree of converted dicts (less memory and garbage-collector work).
+    result = await tx.run(query, params)
+    if columnar:
+        rows = [dumps([to_jsonable(value) for value in record]) async for record in result]
+        return f'{{"columns":{dumps(result.keys())},"rows":[{",".join(rows)}]}}'
+    rows = [dumps(record_to_dict(record)) async for record in result]
+    return f'[{",".join(rows)}]'
+
+
+async def _write_batch(tx: AsyncManagedTransaction, statement: str, rows: Sequence[Any]) -> Dict[str, int]:
+    result = await tx.run(statement, {"rows": rows})
+    summary = await result.consume()
+    return {name: getattr(summary.counters, name) for name in _BULK_COUNTERS}
+
+
+def bulk_statement(statement: str) -> str:
+    """Wrap a per-row statement in `UNWIND $rows AS row` unless it already uses `$rows`."""
+    if "$rows" in statement:
+        return statement
+    return f"UNWIND $rows AS row\n{statement}"
+
+
 class Neo4jDatabase:
-    def __init__(self, uri: str, username: str, password: str):
+    """Neo4j access through a single pooled driver shared by all callers.
+
+    Queries run as managed transaction functions (`session.execute_read` /
+    `session.execute_write`), so the driver routes reads to cluster readers and
+    retries transient failures (leader switches, deadlocks, dropped connections)
+    for up to `max_transaction_retry_time` seconds. A failing query never resets
+    the driver: broken connections are dropped from the pool by the driver itself.
+
+    Args:
+        uri: Neo4j URI. Use the `neo4j://` scheme for routing in a cluster.
+        username: Database user.
+        password: Database password.
+        database: Target database, or `None` for the server default.
+        max_connection_pool_size: Maximum connections kept per server.
+        connection_acquisition_timeout: Seconds to wait for a free pooled connection.
+        max_transaction_retry_time: Seconds the driver keeps retrying a transaction function.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        username: str,
+        password: str,
+        database: Optional[str] = None,
+        max_connection_pool_size: int = 100,
+        connection_acquisition_timeout: float = 60.0,
+        max_transaction_retry_time: float = 30.0,
+    ):
         self.uri = uri
         self.username = username
         self.password = password
+        self.database = database
+        self.max_connection_pool_size = max_connection_pool_size
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.max_transaction_retry_time = max_transaction_retry_time
         self.driver: Optional[AsyncDriver] = None
-    
+        self._connect_lock = asyncio.Lock()
+
     async def __aenter__(self):
         """Async context manager enter method."""
         await self.connect()
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit method."""
         await self.close()
-        
+
     async def connect(self):
-        """Connect to the Neo4j database."""
-        if self.driver is None:
-            self.driver = AsyncGraphDatabase.driver(
-                self.uri, auth=(self.username, self.password)
-            )
-            # Verify connection
-            try:
-                await self.driver.verify_connectivity()
-                logger.info("Successfully connected to Neo4j database")
-            except Neo4jError as e:
-                logger.error(f"Failed to connect to Neo4j: {e}")
-                raise
+        """Connect to the Neo4j database.
+
+        Creates the shared driver once; concurrent callers wait for the same driver.
+        """
+        if self.driver is not None:
+            return self.driver
+        async with self._connect_lock:
+            if self.driver is None:
+                driver = AsyncGraphDatabase.driver(
+                    self.uri,
+                    auth=(self.username, self.password),
+                    max_connection_pool_size=self.max_connection_pool_size,
+                    connection_acquisition_timeout=self.connection_acquisition_timeout,
+                    max_transaction_retry_time=self.max_transaction_retry_time,
+                )
+                # Verify connection
+                try:
+                    await driver.verify_connectivity()
+                    logger.info("Successfully connected to Neo4j database")
+                except (Neo4jError, DriverError) as e:
+                    logger.error(f"Failed to connect to Neo4j: {e}")
+                    await driver.close()
+                    raise
+                self.driver = driver
         return self.driver
-    
+
     async def close(self):
         """Close the database connection."""
         if self.driver:
             await self.driver.close()
             self.driver = None
             logger.info("Neo4j connection closed")
-    
+
+    def _session(self):
+        return self.driver.session(database=self.database)
+
     async def execute_read(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Execute a read-only Cypher query."""
-        if not self.driver:
-            await self.connect()
-        
-        try:    
-            async with self.driver.session() as session:
-                result = await session.run(query, params or {})
-                records = await result.values()
-                return [dict(zip(result.keys(), record)) for record in records]
+        """Execute a read-only Cypher query in a managed read transaction (routed to readers)."""
+        await self.connect()
+        try:
+            async with self._session() as session:
+                return await session.execute_read(_read_records, query, params or {})
+        except Exception as e:
+            logger.error(f"Error executing read query: {e}")
+            raise
+
+    async def execute_read_json(
+        self, query: str, params: Optional[Dict[str, Any]] = None, columnar: bool = False
+    ) -> str:
+        """Execute a read-only Cypher query and return its result directly as JSON text.
+
+        The text is a list of row objects, or `{"columns", "rows"}` when `columnar`.
+        Used by the MCP server so results are streamed and serialized once.
+        """
+        await self.connect()
+        try:
+            async with self._session() as session:
+                return await session.execute_read(_read_json_text, query, params or {}, columnar)
         except Exception as e:
             logger.error(f"Error executing read query: {e}")
-            # Try reconnecting once on error
-            await self.close()
-            await self.connect()
-            async with self.driver.session() as session:
-                result = await session.run(query, params or {})
-                records = await result.values()
-                return [dict(zip(result.keys(), record)) for record in records]
-    
+            raise
+
     async def execute_write(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Execute a write Cypher query."""
-        if not self.driver:
-            await self.connect()
-        
+        """Execute a write Cypher query in a managed write transaction (routed to the leader)."""
+        await self.connect()
         try:
-            async with self.driver.session() as session:
-                result = await session.run(query, params or {})
-                records = await result.values()
-                return [dict(zip(result.keys(), record)) for record in records]
+            async with self._session() as session:
+                return await session.execute_write(_read_records, query, params or {})
         except Exception as e:
             logger.error(f"Error executing write query: {e}")
-            # Try reconnecting once on error
-            await self.close()
-            await self.connect()
-            async with self.driver.session() as session:
-                result = await session.run(query, params or {})
-                records = await result.values()
-                return [dict(zip(result.keys(), record)) for record in records]
+            raise
+
+    async def execute_bulk_write(
+        self,
+        statement: str,
+        rows: Sequence[Any],
+        batch_size: int = 1000,
+        concurrency: int = 4,
+        max_retries: int = 5,
+    ) -> Dict[str, Any]:
+        """Write many rows with one parameterized statement, in concurrent `UNWIND $rows` batches.
+
+        Each batch runs in its own managed write transaction. Deadlocks and other transient
+        errors are retried by the driver and, once its retry time is used up, up to
+        `max_retries` more times here with exponential backoff and jitter. Batches that
+        still fail are reported without stopping the remaining ones.
+
+        Args:
+            statement: Statement run once per row as `row`, e.g.
+                `MERGE (l:Link {url: row.url}) SET l += row`. It is wrapped in
+                `UNWIND $rows AS row` unless it already references `$rows`.
+            rows: Parameter maps (or values) to write.
+            batch_size: Rows per transaction.
+            concurrency: Transactions in flight at once. Keep it low when batches touch
+                the same nodes, as lock contention causes deadlock retries.
+            max_retries: Extra attempts per batch after the driver gives up on a transient error.
+
+        Returns:
+            A report with `rows`, `rows_written`, `batches`, `failed_batches`, `retries`,
+            `errors`, `elapsed`, `rows_per_sec` and the summed summary counters.
+        """
+        await self.connect()
+        statement = bulk_statement(statement)
+        batch_size = max(1, batch_size)
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        counters = dict.fromkeys(_BULK_COUNTERS, 0)
+        report: Dict[str, Any] = {"rows_written": 0, "failed_batches": 0, "retries": 0, "errors": []}
+
+        async def write(index: int, batch: Sequence[Any]) -> None:
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    try:
+                        async with self._session() as session:
+                            batch_counters = await session.execute_write(_write_batch, statement, batch)
+                    except TransientError as e:
+                        if attempt < max_retries:
+                            report["retries"] += 1
+                            logger.warning(f"Bulk write batch {index} hit {e.code}, retrying")
+                            await asyncio.sleep(backoff_delay(attempt, 0.1, 5.0))
+                            continue
+                        error = e
+                    except Exception as e:
+                        error = e
+                    else:
+                        report["rows_written"] += len(batch)
+                        for name, value in batch_counters.items():
+                            counters[name] += value
+                        return
+                    logger.error(f"Bulk write batch {index} failed: {error}")
+                    report["failed_batches"] += 1
+                    report["errors"].append({"batch": index, "rows": len(batch), "error": str(error)})
+                    return
+
+        start = time.perf_counter()
+        await asyncio.gather(*(write(index, batch) for index, batch in enumerate(batches)))
+        elapsed = time.perf_counter() - start
+        report.update(
+            rows=len(rows),
+            batches=len(batches),
+            elapsed=round(elapsed, 3),
+            rows_per_sec=round(report["rows_written"] / elapsed, 1) if elapsed > 0 else None,
+            counters=counters,
+        )
+        logger.info(
+            f"Bulk write: {report['rows_written']}/{len(rows)} rows in {len(batches)} batches, "
+            f"{report['rows_per_sec']} rows/sec"
+        )
+        return report
 
 async def setup_neo4j_server(neo4j_url: str, neo4j_username: str, neo4j_password: str):
     """Set up a Neo4j MCP server with async handlers."""
     logger.info(f"Connecting to Neo4j MCP Server with DB URL: {neo4j_url}")
-    
+
     db = Neo4jDatabase(neo4j_url, neo4j_username, neo4j_password)
     await db.connect()  # Ensure connection is established
-    
+
     # Create an MCP server
     server = Server("neo4j-manager")
-    
+
     # Register handlers
     logger.debug("Registering handlers")
-    
+
     @server.list_tools()
     async def handle_list_tools() -> list[types.Tool]:
         """List available tools"""
@@ -113,53 +280,83 @@ async def setup_neo4j_server(neo4j_url: str, neo4j_username: str, neo4j_password
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "Cypher read query to execute"},
-                        "params": {"type": "object", "description": "Parameters for the query"}
+                        "params": {"type": "object", "description": "Parameters for the query"},
+                        "format": {
+                            "type": "string",
+                            "enum": ["json", "columnar"],
+                            "description": "Result layout: a list of row objects, or column names plus row arrays (smaller for wide results)",
+                            "default": "json",
+                        },
                     },
                     "required": ["query"],
                 },
             ),
             types.Tool(
                 name="write-neo4j-cypher",
-                description="Execute a write Cypher query on the neo4j database",
+                description=(
+                    "Execute a write Cypher query on the neo4j database. "
+                    "For bulk ingestion pass `rows`: the query then runs once per row as `row` "
+                    "(e.g. `MERGE (l:Link {url: row.url}) SET l += row`) in concurrent "
+                    "`UNWIND $rows` batches, and a throughput report is returned."
+                ),
                 inputSchema={
                     "type": "object",
                     "properties": {
                         "query": {"type": "string", "description": "Cypher write query to execute"},
-                        "params": {"type": "object", "description": "Parameters for the query"}
+                        "params": {"type": "object", "description": "Parameters for the query"},
+                        "rows": {"type": "array", "description": "Rows for bulk write mode"},
+                        "batch_size": {"type": "integer", "description": "Rows per transaction in bulk write mode", "default": 1000},
+                        "concurrency": {"type": "integer", "description": "Concurrent transactions in bulk write mode", "default": 4},
                     },
                     "required": ["query"],
                 },
             ),
         ]
-    
+
+    async def read_cypher(arguments: Dict[str, Any]) -> str:
+        # Rows are streamed straight to JSON text instead of being built as Python objects first
+        try:
+            results = await db.execute_read_json(
+                arguments.get("query"),
+                arguments.get("params", {}),
+                columnar=arguments.get("format") == "columnar",
+            )
+            return f'{{"results":{results},"success":true}}'
+        except Exception as e:
+            logger.error(f"Error executing read query: {e}")
+            return dumps({"error": str(e), "success": False})
+
+    async def write_cypher(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        query = arguments.get("query")
+        params = arguments.get("params", {})
+
+        try:
+            if arguments.get("rows") is not None:
+                report = await db.execute_bulk_write(
+                    query,
+                    arguments["rows"],
+                    batch_size=arguments.get("batch_size", 1000),
+                    concurrency=arguments.get("concurrency", 4),
+                )
+                return {"results": report, "success": report["failed_batches"] == 0}
+            results = [record_to_dict(row) for row in await db.execute_write(query, params)]
+            return {"results": results, "success": True}
+        except Exception as e:
+            logger.error(f"Error executing write query: {e}")
+            return {"error": str(e), "success": False}
+
     @server.call_tool()
-    async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> list[types.TextContent]:
         """Handle tool calls to execute Cypher queries."""
         if name == "read-neo4j-cypher":
-            query = arguments.get("query")
-            params = arguments.get("params", {})
-            
-            try:
-                results = await db.execute_read(query, params)
-                return {"results": results, "success": True}
-            except Exception as e:
-                logger.error(f"Error executing read query: {e}")
-                return {"error": str(e), "success": False}
-        
+            text = await read_cypher(arguments)
         elif name == "write-neo4j-cypher":
-            query = arguments.get("query")
-            params = arguments.get("params", {})
-            
-            try:
-                results = await db.execute_write(query, params)
-                return {"results": results, "success": True}
-            except Exception as e:
-                logger.error(f"Error executing write query: {e}")
-                return {"error": str(e), "success": False}
-        
-        return {"error": f"Unknown tool: {name}", "success": False}
-    
-    # Instead of using on_shutdown decorator, we'll ensure the db connection is 
+            text = dumps(await write_cypher(arguments))
+        else:
+            text = dumps({"error": f"Unknown tool: {name}", "success": False})
+        return [types.TextContent(type="text", text=text)]
+
+    # Instead of using on_shutdown decorator, we'll ensure the db connection is
     # properly closed in the mcp_example function in neo4j_supervisor_example.py
-    
-    return server, db 
\ No newline at end of file
+
+    return server, db
@@ -0,0 +1,223 @@
+"""Type-aware serialization of Neo4j query results.
+
+Converts driver values (graph, temporal and spatial types) into compact JSON-ready
+Python values in a single pass and dumps them with the fastest available backend.
+
+Representation:
+
+- Node: `{"_id": element_id, "_labels": [...], **properties}`
+- Relationship: `{"_id": element_id, "_type": type, "_start": element_id, "_end": element_id, **properties}`
+- Path: `{"nodes": [...], "relationships": [...]}`
+- Date / Time / DateTime: ISO 8601 string
+- Duration: ISO 8601 duration string (e.g. `"P1DT2H"`)
+- Point: `{"srid": srid, "x": x, "y": y}` (plus `"z"` for 3D points)
+- bytes: base64 string
+"""
+
+import base64
+import datetime
+import json
+import os
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from neo4j.graph import Node, Path, Relationship
+from neo4j.spatial import Point
+from neo4j.time import Date, DateTime, Duration, Time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional backend
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional backend
+    msgpack = None
+
+_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+# Exact primitive types are passed through inline, skipping a function call per cell
+_PLAIN_TYPES = frozenset(_PRIMITIVE_TYPES)
+
+
+def _convert_node(node: Node) -> dict[str, Any]:
+    return {
+        "_id": node.element_id,
+        "_labels": sorted(node.labels),
+        **_convert_mapping(node),
+    }
+
+
+def _convert_relationship(relationship: Relationship) -> dict[str, Any]:
+    return {
+        "_id": relationship.element_id,
+        "_type": relationship.type,
+        "_start": relationship.start_node.element_id if relationship.start_node else None,
+        "_end": relationship.end_node.element_id if relationship.end_node else None,
+        **_convert_mapping(relationship),
+    }
+
+
+def _convert_path(path: Path) -> dict[str, Any]:
+    return {
+        "nodes": [_convert_node(node) for node in path.nodes],
+        "relationships": [_convert_relationship(rel) for rel in path.relationships],
+    }
+
+
+def _convert_point(point: Point) -> dict[str, Any]:
+    converted = {"srid": point.srid, "x": point[0], "y": point[1]}
+    if len(point) > 2:
+        converted["z"] = point[2]
+    return converted
+
+
+def _convert_mapping(mapping: Any) -> dict[str, Any]:
+    return {
+        str(key): value if type(value) in _PLAIN_TYPES else to_jsonable(value)
+        for key, value in mapping.items()
+    }
+
+
+def _convert_sequence(values: Iterable) -> list[Any]:
+    return [value if type(value) in _PLAIN_TYPES else to_jsonable(value) for value in values]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+# Converters by base class, checked in order for types not yet in the dispatch table.
+# Point must come before tuple since points are tuples.
+_BASE_CONVERTERS: list[tuple[type, Callable[[Any], Any]]] = [
+    (Node, _convert_node),
+    (Relationship, _convert_relationship),
+    (Path, _convert_path),
+    (Point, _convert_point),
+    (Duration, lambda value: value.iso_format()),
+    ((Date, DateTime, Time), lambda value: value.iso_format()),
+    ((datetime.date, datetime.time), lambda value: value.isoformat()),
+    (datetime.timedelta, lambda value: value.total_seconds()),
+    ((bytes, bytearray), lambda value: base64.b64encode(value).decode("ascii")),
+    (Mapping, _convert_mapping),
+    ((list, tuple, set, frozenset), _convert_sequence),
+    (_PRIMITIVE_TYPES, _identity),
+]
+
+# Exact type -> converter. Filled lazily so that each concrete type (including the
+# per-relationship-type subclasses the driver creates) is resolved only once.
+_DISPATCH: dict[type, Callable[[Any], Any]] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+    list: _convert_sequence,
+    dict: _convert_mapping,
+}
+
+
+def _resolve_converter(value_type: type) -> Callable[[Any], Any]:
+    converter = next(
+        (converter for base, converter in _BASE_CONVERTERS if issubclass(value_type, base)), str
+    )
+    _DISPATCH[value_type] = converter
+    return converter
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert a Neo4j driver value into a JSON-ready Python value."""
+    converter = _DISPATCH.get(type(value))
+    if converter is None:
+        converter = _resolve_converter(type(value))
+    return converter(value)
+
+
+def record_to_dict(record: Any) -> dict[str, Any]:
+    """Convert a driver record (or any mapping) into a dict of JSON-ready values."""
+    if isinstance(record, tuple):
+        # driver records are tuples: zipping with keys avoids the slower Record.items()
+        pairs = zip(record.keys(), record, strict=True)
+    else:
+        pairs = record.items()
+    return {
+        key: value if type(value) in _PLAIN_TYPES else to_jsonable(value) for key, value in pairs
+    }
+
+
+class JsonBackend:
+    """Standard library `json` backend."""
+
+    name = "json"
+    binary = False
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=indent, default=str)
+
+
+class OrjsonBackend:
+    """`orjson` backend. Only 2-space indentation is supported."""
+
+    name = "orjson"
+    binary = False
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+
+
+class MsgpackBackend:
+    """`msgpack` backend producing bytes, for transports that accept binary payloads."""
+
+    name = "msgpack"
+    binary = True
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> bytes:
+        return msgpack.packb(obj, default=str, use_bin_type=True)
+
+
+_BACKENDS: dict[str, Callable[[], Any]] = {
+    "json": JsonBackend,
+    "orjson": OrjsonBackend,
+    "msgpack": MsgpackBackend,
+}
+
+
+def get_backend(name: str = "auto") -> Any:
+    """Get a serialization backend by name.
+
+    Args:
+        name: One of `"auto"`, `"json"`, `"orjson"` or `"msgpack"`.
+            `"auto"` picks `orjson` when installed and falls back to `json`.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"Invalid serializer backend: {name}. Needs to be one of {list(_BACKENDS)}"
+        )
+    if name == "orjson" and orjson is None:
+        raise ImportError("orjson is not installed. Install it with `pip install orjson`.")
+    if name == "msgpack" and msgpack is None:
+        raise ImportError("msgpack is not installed. Install it with `pip install msgpack`.")
+    return _BACKENDS[name]()
+
+
+def _default_text_backend() -> Any:
+    backend = get_backend(os.environ.get("NEO4J_SERIALIZER_BACKEND", "auto"))
+    # Tool responses are text, so a binary backend cannot be the default
+    return JsonBackend() if backend.binary else backend
+
+
+_default_backend = _default_text_backend()
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Dump JSON-ready values to a JSON string with the default text backend."""
+    return _default_backend.dumps(obj, indent=indent)
+
+
+def dumps_records(records: Iterable[Any], indent: Optional[int] = None) -> str:
+    """Convert driver records and dump them as a JSON array in one pass."""
+    return dumps([record_to_dict(record) for record in records], indent=indent)
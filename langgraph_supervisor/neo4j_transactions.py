@@ -0,0 +1,49 @@
+"""Server-side termination of Neo4j transactions started by cancelled requests.
+
+Queries are tagged with a request id in their transaction metadata
+(`Query(..., metadata={QUERY_ID_METADATA_KEY: query_id})`), so the transaction
+of a cancelled request can be found and terminated from another session.
+"""
+
+from typing import Any
+
+from neo4j.exceptions import ClientError
+
+QUERY_ID_METADATA_KEY = "mcp_query_id"
+
+
+async def terminate_transactions(session: Any, query_id: str) -> list[str]:
+    """Terminate the running transactions tagged with `query_id`.
+
+    Uses `SHOW TRANSACTIONS` / `TERMINATE TRANSACTIONS` and falls back to the
+    `dbms.listTransactions` / `dbms.killTransaction` procedures on Neo4j 4.x.
+
+    Args:
+        session: An open async Neo4j session.
+        query_id: The request id stored in the transaction metadata.
+
+    Returns:
+        The ids of the terminated transactions.
+    """
+    try:
+        result = await session.run(
+            "SHOW TRANSACTIONS YIELD transactionId, metaData "
+            f"WHERE metaData.{QUERY_ID_METADATA_KEY} = $query_id "
+            "RETURN collect(transactionId) AS ids",
+            {"query_id": query_id},
+        )
+        record = await result.single()
+        ids = record["ids"] if record else []
+        if ids:
+            await (await session.run("TERMINATE TRANSACTIONS $ids", {"ids": ids})).consume()
+    except ClientError:
+        result = await session.run(
+            "CALL dbms.listTransactions() YIELD transactionId, metaData "
+            f"WHERE metaData.{QUERY_ID_METADATA_KEY} = $query_id "
+            "CALL dbms.killTransaction(transactionId) YIELD message "
+            "RETURN collect(transactionId) AS ids",
+            {"query_id": query_id},
+        )
+        record = await result.single()
+        ids = record["ids"] if record else []
+    return ids
@@ -1,4 +1,7 @@
+import asyncio
 import inspect
+import threading
+import weakref
 from typing import Any, Callable, Literal, Optional, Type, Union
 
 from langchain_core.language_models import BaseChatModel, LanguageModelLike
@@ -16,18 +19,21 @@ from langgraph.pregel import Pregel
 from langgraph.utils.runnable import RunnableCallable
 
 from langgraph_supervisor.agent_name import AgentNameMode, with_agent_name
+from langgraph_supervisor.compaction import HistoryCompactor, OutputBudget, select_output_messages
 from langgraph_supervisor.handoff import (
     METADATA_KEY_HANDOFF_DESTINATION,
     _normalize_agent_name,
     create_handoff_back_messages,
     create_handoff_tool,
+    resolve_handoff_state,
 )
 
-OutputMode = Literal["full_history", "last_message"]
+OutputMode = Literal["full_history", "last_message", "token_budget"]
 """Mode for adding agent outputs to the message history in the multi-agent workflow
 
 - `full_history`: add the entire agent message history
 - `last_message`: add only the last message
+- `token_budget`: add the last message plus the most recent tool results that fit in a token budget
 """
 
 
@@ -50,23 +56,60 @@ def _supports_disable_parallel_tool_calls(model: LanguageModelLike) -> bool:
     return True
 
 
+class _ConcurrencyLimiter:
+    """Caps how many worker agents run at the same time during a fan-out.
+
+    Parallel handoffs run as separate tasks of the same graph step: in threads for
+    `invoke` / `stream` and in asyncio tasks for `ainvoke` / `astream`. A thread
+    semaphore covers the former, one asyncio semaphore per event loop the latter.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError(f"Fan-out concurrency must be at least 1, got {limit}")
+        self.limit = limit
+        self._thread_semaphore = threading.BoundedSemaphore(limit)
+        self._loop_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def sync(self) -> threading.BoundedSemaphore:
+        return self._thread_semaphore
+
+    def async_(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._loop_semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+
 def _make_call_agent(
     agent: Pregel,
     output_mode: OutputMode,
     add_handoff_back_messages: bool,
     supervisor_name: str,
+    limiter: _ConcurrencyLimiter | None = None,
+    output_budget: OutputBudget | None = None,
 ) -> Callable[[dict], dict] | RunnableCallable:
     if output_mode not in OutputMode.__args__:
         raise ValueError(
             f"Invalid agent output mode: {output_mode}. Needs to be one of {OutputMode.__args__}"
         )
+    if output_budget is None:
+        output_budget = OutputBudget()
 
-    def _process_output(output: dict) -> dict:
+    def _process_output(output: dict, state: dict) -> dict:
         messages = output["messages"]
         if output_mode == "full_history":
             pass
         elif output_mode == "last_message":
             messages = messages[-1:]
+        elif output_mode == "token_budget":
+            # the agent's result starts with its input messages, followed by what it added;
+            # an agent that trimmed or rewrote its history still hands back its last message
+            new_messages = messages[len(state["messages"]) :]
+            messages = select_output_messages(new_messages or messages[-1:], output_budget)
 
         else:
             raise ValueError(
@@ -83,12 +126,22 @@ def _make_call_agent(
         }
 
     def call_agent(state: dict, config: RunnableConfig) -> dict:
-        output = agent.invoke(state, config)
-        return _process_output(output)
+        state = resolve_handoff_state(state, config)
+        if limiter is None:
+            output = agent.invoke(state, config)
+        else:
+            with limiter.sync():
+                output = agent.invoke(state, config)
+        return _process_output(output, state)
 
     async def acall_agent(state: dict, config: RunnableConfig) -> dict:
-        output = await agent.ainvoke(state, config)
-        return _process_output(output)
+        state = resolve_handoff_state(state, config)
+        if limiter is None:
+            output = await agent.ainvoke(state, config)
+        else:
+            async with limiter.async_():
+                output = await agent.ainvoke(state, config)
+        return _process_output(output, state)
 
     return RunnableCallable(call_agent, acall_agent)
 
@@ -122,11 +175,16 @@ def create_supervisor(
     state_schema: StateSchemaType = AgentState,
     config_schema: Type[Any] | None = None,
     output_mode: OutputMode = "last_message",
+    output_budget: OutputBudget | None = None,
     add_handoff_messages: bool = True,
     handoff_tool_prefix: Optional[str] = None,
     add_handoff_back_messages: Optional[bool] = None,
     supervisor_name: str = "supervisor",
     include_agent_name: AgentNameMode | None = None,
+    fan_out: bool = False,
+    max_concurrency: Optional[int] = None,
+    history_compaction: HistoryCompactor | None = None,
+    share_parent_history: bool = False,
 ) -> StateGraph:
     """Create a multi-agent supervisor.
 
@@ -178,6 +236,11 @@ def create_supervisor(
 
             - `full_history`: add the entire agent message history
             - `last_message`: add only the last message (default)
+            - `token_budget`: add the last message plus the agent's most recent tool results,
+                truncated and selected to fit in `output_budget`
+        output_budget: Token budget used by the `token_budget` output mode.
+            Defaults to `OutputBudget()`: at most 3 tool results of up to 500 tokens each,
+            2000 tokens in total. Token counts are a fast character-based estimate.
         add_handoff_messages: Whether to add a pair of (AIMessage, ToolMessage) to the message history
             when a handoff occurs.
         handoff_tool_prefix: Optional prefix for the handoff tools (e.g., "delegate_to_" or "transfer_to_")
@@ -191,6 +254,30 @@ def create_supervisor(
             - None: Relies on the LLM provider using the name attribute on the AI message. Currently, only OpenAI supports this.
             - `"inline"`: Add the agent name directly into the content field of the AI message using XML-style tags.
                 Example: `"How can I help you"` -> `"<name>agent_name</name><content>How can I help you?</content>"`
+            - `"inline_streaming"`: Same as `"inline"`, but the tags are stripped from the supervisor's output
+                while it streams, so tokens streamed with `stream_mode="messages"` or `astream_events` never
+                contain them. Requires `model` to be a chat model.
+        fan_out: Whether the supervisor can dispatch several independent handoffs at once.
+            If True, parallel tool calls are enabled for the supervisor LLM and every handoff
+            in a single supervisor turn runs as a separate branch in the same graph step,
+            so the turn takes as long as its slowest branch rather than the sum of all of them.
+            The supervisor runs again once all branches have finished, and their outputs are
+            merged into the message history in the order of the supervisor's tool calls,
+            regardless of which branch finishes first.
+        max_concurrency: Maximum number of managed agents running at the same time during a fan-out.
+            Handoffs above the limit wait for a running branch to finish. If not provided,
+            all branches of a fan-out run at once. Can also be used without `fan_out`
+            to cap agents that are run in parallel via `parallel_tool_calls=True`.
+        history_compaction: Optional `HistoryCompactor` applied to the message history before every
+            supervisor LLM call. It drops handoff bookkeeping messages, truncates large tool outputs
+            and keeps a bounded window, which keeps the supervisor's token count and latency flat
+            on long runs. The graph state itself keeps the full history.
+        share_parent_history: Whether parallel handoffs send each agent only the supervisor's
+            current turn plus a reference to the message history already in the graph state,
+            instead of a full copy of the history per agent. This keeps checkpointed `Send`
+            payloads small on long runs. The reference is resolved and removed before the
+            agent runs. Requires a dict-based `state_schema` (e.g. a `TypedDict`), since the
+            reference travels as an extra key of the handoff payload.
 
     Example:
         ```python
@@ -241,6 +328,16 @@ def create_supervisor(
     """
     if add_handoff_back_messages is None:
         add_handoff_back_messages = add_handoff_messages
+    if fan_out:
+        parallel_tool_calls = True
+    if share_parent_history and not (
+        isinstance(state_schema, type) and issubclass(state_schema, dict)
+    ):
+        raise ValueError(
+            "share_parent_history=True requires a dict-based state schema (e.g. a TypedDict), "
+            f"got {state_schema}"
+        )
+    limiter = _ConcurrencyLimiter(max_concurrency) if max_concurrency is not None else None
     agent_names = set()
     for agent in agents:
         if agent.name is None or agent.name == "LangGraph":
@@ -276,6 +373,7 @@ def create_supervisor(
                     else f"{handoff_tool_prefix}{_normalize_agent_name(agent.name)}"
                 ),
                 add_handoff_messages=add_handoff_messages,
+                share_parent_history=share_parent_history,
             )
             for agent in agents
         ]
@@ -296,6 +394,7 @@ def create_supervisor(
         prompt=prompt,
         state_schema=state_schema,
         response_format=response_format,
+        pre_model_hook=history_compaction,
     )
 
     builder = StateGraph(state_schema, config_schema=config_schema)
@@ -309,6 +408,8 @@ def create_supervisor(
                 output_mode,
                 add_handoff_back_messages=add_handoff_back_messages,
                 supervisor_name=supervisor_name,
+                limiter=limiter,
+                output_budget=output_budget,
             ),
         )
         builder.add_edge(agent.name, supervisor_agent.name)
@@ -1,5 +1,6 @@
 from langchain_openai import ChatOpenAI
 from langgraph_supervisor import create_supervisor
+from linkbrain_runner import run_questions
 from langgraph.prebuilt import create_react_agent
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_mcp_adapters.tools import load_mcp_tools
@@ -414,8 +415,6 @@ Linkbrain Agent가 제공하는 데이터를 바탕으로만 Reasoning/계산 
         "링크들을 저장 날짜 기준으로 월별로 몇 개씩 저장되었는지 알려주세요."
     ]
         
-        results = []
-        
         # 🎯 프롬프트를 실행 시작할 때 한 번만 저장
         # 환경 변수로 CSV 저장 제어
         save_csv = os.getenv('LINKBRAIN_SAVE_CSV', 'true').lower() == 'true'
@@ -425,20 +424,38 @@ Linkbrain Agent가 제공하는 데이터를 바탕으로만 Reasoning/계산 
             save_prompts_to_csv(CURRENT_PROMPTS, version_info)
             print(f"✅ 프롬프트가 linkbrain_prompts.csv 파일에 저장되었습니다.")
         
-        for i, question in enumerate(questions, 1):  # 1부터 시작하는 질문 번호
+        def save_outcome(outcome):
+            # 최적화된 CSV 저장 (프롬프트 제외, 질문 번호 포함)
+            # 질문 순서대로 끝나는 즉시 저장하므로 중간에 중단되어도 완료된 결과는 남음
+            result = outcome['result']
+            if not save_csv or result is None:
+                return
+            agents_used = extract_agents_used(result["messages"])
+            try:
+                save_to_csv_optimized(outcome['question_num'], outcome['question'], result, agents_used, version_info)
+            except OSError as e:
+                print(f"⚠️ 질문 {outcome['question_num']} 결과를 CSV에 저장하지 못했습니다: {e}")
+        
+        # 질문들을 동시에 실행 (동시 실행 수, 타임아웃, 재시도는 환경 변수로 조절)
+        outcomes = await run_questions(
+            app,
+            questions,
+            max_concurrency=int(os.getenv('LINKBRAIN_MAX_CONCURRENCY', '4')),
+            timeout=float(os.getenv('LINKBRAIN_TIMEOUT', '300')) or None,
+            retries=int(os.getenv('LINKBRAIN_RETRIES', '1')),
+            on_result=save_outcome,
+        )
+        if save_csv:
+            print("✅ 결과가 linkbrain_results.csv 파일에 저장되었습니다.")
+        
+        # 결과는 완료 순서와 관계없이 질문 순서대로 출력
+        for outcome in outcomes:
+            i, question, result = outcome['question_num'], outcome['question'], outcome['result']
             print(f"\n\n=== 질문 {i}: {question} ===")
-            result = await app.ainvoke({
-                "messages": [{"role": "user", "content": question}]
-            })
+            if result is None:
+                print(f"❌ 실패 ({outcome['attempts']}회 시도): {outcome['error']!r}")
+                continue
             print_messages(result["messages"])
-            
-            # 최적화된 CSV 저장 (프롬프트 제외, 질문 번호 포함)
-            if save_csv:
-                agents_used = extract_agents_used(result["messages"])
-                save_to_csv_optimized(i, question, result, agents_used, version_info)
-                print(f"✅ 결과가 linkbrain_results.csv 파일에 저장되었습니다.")
-            
-            results.append(result)
         
         return app
 
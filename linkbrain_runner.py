@@ -0,0 +1,76 @@
+"""linkbrain.py의 테스트 질문들을 동시에 실행하는 배치 실행기
+
+그래프 생성이나 외부 연결 없이 가져올 수 있도록 linkbrain.py와 분리되어 있습니다.
+"""
+
+import asyncio
+import random
+import time
+
+
+async def run_questions(
+    app, questions, max_concurrency=4, timeout=None, retries=1, retry_delay=1.0, on_result=None
+):
+    """질문들을 동시에 실행하고 질문 순서대로 결과를 반환합니다.
+
+    - max_concurrency: 동시에 실행되는 질문 수 (asyncio.Semaphore)
+    - timeout: 질문 1회 시도당 제한 시간(초), None이면 제한 없음
+    - retries: 실패(타임아웃 포함) 시 추가 시도 횟수, 지수 백오프 후 재시도
+    - on_result: 결과 dict로 호출되는 함수 (예: CSV 저장). 질문 순서대로, 앞선 질문들이
+      모두 끝나는 즉시 호출되므로 CSV 행도 질문 순서대로 바로바로 저장됩니다.
+    - 각 질문이 끝날 때마다 진행 상황을 출력합니다.
+
+    반환값: 질문별 dict 리스트 (question_num, question, result, error, attempts, elapsed).
+    실패한 질문은 result가 None이고 error에 마지막 예외가 담깁니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    total = len(questions)
+    completed = 0
+    finished = {}  # on_result에 아직 넘기지 않은 결과 (앞선 질문이 끝나기를 기다리는 중)
+    next_to_report = 1
+    started = time.perf_counter()
+
+    async def run_one(question_num, question):
+        nonlocal completed, next_to_report
+        async with semaphore:
+            question_started = time.perf_counter()
+            error = None
+            for attempt in range(max(0, retries) + 1):
+                if attempt:
+                    # 지수 백오프 + 지터 (최대 30초)
+                    await asyncio.sleep(
+                        random.uniform(0, min(30.0, retry_delay * 2 ** (attempt - 1)))
+                    )
+                    print(f"🔁 질문 {question_num} 재시도 ({attempt}/{retries}): {error!r}")
+                try:
+                    result = await asyncio.wait_for(
+                        app.ainvoke({"messages": [{"role": "user", "content": question}]}),
+                        timeout,
+                    )
+                    break
+                except Exception as e:  # asyncio.TimeoutError 포함
+                    result, error = None, e
+            elapsed = time.perf_counter() - question_started
+        completed += 1
+        status = "완료" if result is not None else "실패"
+        print(
+            f"[{completed}/{total}] 질문 {question_num} {status} "
+            f"({elapsed:.1f}s, 전체 {time.perf_counter() - started:.1f}s)"
+        )
+        outcome = {
+            "question_num": question_num,
+            "question": question,
+            "result": result,
+            "error": None if result is not None else error,
+            "attempts": attempt + 1,
+            "elapsed": elapsed,
+        }
+        if on_result is not None:
+            finished[question_num] = outcome
+            while next_to_report in finished:
+                on_result(finished.pop(next_to_report))
+                next_to_report += 1
+        return outcome
+
+    # gather는 완료 순서와 관계없이 입력 순서대로 결과를 돌려줌
+    return await asyncio.gather(*(run_one(i, question) for i, question in enumerate(questions, 1)))
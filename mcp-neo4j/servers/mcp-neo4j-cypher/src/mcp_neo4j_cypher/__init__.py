@@ -12,6 +12,24 @@ def main():
     parser.add_argument("--username", default=None, help="Neo4j username")
     parser.add_argument("--password", default=None, help="Neo4j password")
     parser.add_argument("--database", default=None, help="Neo4j database name")
+    parser.add_argument(
+        "--query-timeout",
+        type=float,
+        default=None,
+        help="Transaction timeout in seconds (0 disables)",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=None,
+        help="Maximum rows returned by a read query (0 disables)",
+    )
+    parser.add_argument(
+        "--max-result-bytes",
+        type=int,
+        default=None,
+        help="Maximum serialized result size (0 disables)",
+    )
 
     args = parser.parse_args()
     asyncio.run(
@@ -20,6 +38,15 @@ def main():
             args.username or os.getenv("NEO4J_USERNAME", "neo4j"),
             args.password or os.getenv("NEO4J_PASSWORD", "password"),
             args.database or os.getenv("NEO4J_DATABASE", "neo4j"),
+            args.query_timeout
+            if args.query_timeout is not None
+            else float(os.getenv("NEO4J_QUERY_TIMEOUT", "30")),
+            args.max_rows
+            if args.max_rows is not None
+            else int(os.getenv("NEO4J_MAX_ROWS", "10000")),
+            args.max_result_bytes
+            if args.max_result_bytes is not None
+            else int(os.getenv("NEO4J_MAX_RESULT_BYTES", str(8 * 1024 * 1024))),
         )
     )
 
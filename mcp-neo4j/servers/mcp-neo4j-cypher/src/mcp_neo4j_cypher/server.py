@@ -1,9 +1,12 @@
+import asyncio
 import json
 import logging
 import re
 import sys
 import time
-from typing import Any, Optional
+import uuid
+from collections import OrderedDict
+from typing import Annotated, Any, Optional
 
 import mcp.types as types
 from mcp.server.fastmcp import FastMCP
@@ -13,12 +16,43 @@ from neo4j import (
     AsyncResult,
     AsyncTransaction,
     GraphDatabase,
+    unit_of_work,
 )
-from neo4j.exceptions import DatabaseError
+from neo4j.exceptions import ClientError, DatabaseError
 from pydantic import Field
 
+try:
+    # shared with the other Neo4j servers of this repository
+    from langgraph_supervisor.neo4j_serializer import dumps, record_to_dict
+except ImportError:  # installed on its own: plain driver values and json
+
+    def record_to_dict(record: Any) -> dict[str, Any]:
+        return record.data()
+
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+
+
 logger = logging.getLogger("mcp_neo4j_cypher")
 
+# matches backtick identifiers, comments and pattern bounds (kept as-is) and string/number
+# literals (replaced). Variable-length bounds (`-[:T*2..5]`), QPP quantifiers (`{1,3}`),
+# SHORTEST k and IN TRANSACTIONS OF n ROWS change the plan, so they stay in the shape.
+_QUERY_TOKEN_RE = re.compile(
+    r"(?P<ident>`[^`]*`)"
+    r"|(?P<comment>//[^\n]*|/\*.*?\*/)"
+    r"|(?P<keep>-\s*\[(?:[^\[\]'\"`]|`[^`]*`)*\*\s*\d*(?:\s*\.\.\s*\d*)?"
+    r"|\{\s*\d*\s*,\s*\d*\s*\}|\{\s*\d+\s*\}"
+    r"|\b(?:SHORTEST|ANY|OF)\s+\d+)"
+    r"|(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")"
+    r"|(?P<number>(?<![\w$.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.]))",
+    re.DOTALL,
+)
+_UNKNOWN_TOKEN_NOTIFICATIONS = (
+    "Neo.ClientNotification.Statement.UnknownLabelWarning",
+    "Neo.ClientNotification.Statement.UnknownRelationshipTypeWarning",
+)
+
 
 def healthcheck(db_url: str, username: str, password: str, database: str) -> None:
     """
@@ -59,11 +93,68 @@ def healthcheck(db_url: str, username: str, password: str, database: str) -> Non
         raise ex
 
 
-async def _read(tx: AsyncTransaction, query: str, params: dict[str, Any]) -> str:
+async def _read(
+    tx: AsyncTransaction,
+    query: str,
+    params: dict[str, Any],
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> str:
+    """Read records one by one and stop as soon as the row or byte budget is exceeded."""
     raw_results = await tx.run(query, params)
-    eager_results = await raw_results.to_eager_result()
 
-    return json.dumps([r.data() for r in eager_results.records], default=str)
+    rows: list[str] = []
+    size = 0
+    truncated_reason = None
+    async for record in raw_results:
+        if max_rows is not None and len(rows) >= max_rows:
+            truncated_reason = f"Result truncated after {max_rows} rows"
+            break
+        row = dumps(record_to_dict(record))
+        size += len(row) + 1
+        if max_bytes is not None and size > max_bytes:
+            truncated_reason = f"Result truncated at {max_bytes} bytes"
+            break
+        rows.append(row)
+
+    results_json_str = "[" + ",".join(rows) + "]"
+    if truncated_reason is None:
+        return results_json_str
+    return (
+        '{"records": '
+        + results_json_str
+        + f', "truncated": true, "reason": {json.dumps(truncated_reason)}}}'
+    )
+
+
+async def _explain(tx: AsyncTransaction, query: str, params: dict[str, Any]) -> Any:
+    raw_results = await tx.run(f"EXPLAIN {query}", params)
+    return await raw_results.consume()
+
+
+def _query_shape(query: str) -> str:
+    """Normalize a query so that queries differing only in literal values share a key."""
+
+    def replace(match: re.Match) -> str:
+        if match.group("string") is not None or match.group("number") is not None:
+            return "?"
+        return match.group(0)
+
+    return " ".join(_QUERY_TOKEN_RE.sub(replace, query).split()).rstrip(";")
+
+
+def _plan_estimates(plan: Optional[dict[str, Any]]) -> tuple[float, float]:
+    """Return the estimated result rows and the largest per-operator row estimate."""
+    if not plan:
+        return 0.0, 0.0
+    root_rows = float(plan.get("args", {}).get("EstimatedRows", 0.0))
+    peak_rows = root_rows
+    stack = list(plan.get("children", []))
+    while stack:
+        operator = stack.pop()
+        peak_rows = max(peak_rows, float(operator.get("args", {}).get("EstimatedRows", 0.0)))
+        stack.extend(operator.get("children", []))
+    return root_rows, peak_rows
 
 
 async def _write(
@@ -72,6 +163,28 @@ async def _write(
     return await tx.run(query, params)
 
 
+async def _terminate_transactions(
+    neo4j_driver: AsyncDriver, database: str, query_id: str
+) -> None:
+    """Terminate server-side transactions tagged with the given query id."""
+    try:
+        async with neo4j_driver.session(database=database) as session:
+            result = await session.run(
+                "SHOW TRANSACTIONS YIELD transactionId, metaData "
+                "WHERE metaData.mcp_query_id = $query_id "
+                "RETURN collect(transactionId) AS ids",
+                {"query_id": query_id},
+            )
+            record = await result.single()
+            if record and record["ids"]:
+                await (
+                    await session.run("TERMINATE TRANSACTIONS $ids", {"ids": record["ids"]})
+                ).consume()
+                logger.info(f"Terminated cancelled transactions {record['ids']}")
+    except Exception as e:
+        logger.error(f"Failed to terminate cancelled transaction {query_id}: {e}")
+
+
 def _is_write_query(query: str) -> bool:
     """Check if the query is a write query."""
     return (
@@ -80,9 +193,116 @@ def _is_write_query(query: str) -> bool:
     )
 
 
-def create_mcp_server(neo4j_driver: AsyncDriver, database: str = "neo4j") -> FastMCP:
+def create_mcp_server(
+    neo4j_driver: AsyncDriver,
+    database: str = "neo4j",
+    max_estimated_rows: float = 10_000_000,
+    plan_cache_size: int = 1024,
+    query_timeout: Optional[float] = 30,
+    max_rows: Optional[int] = 10_000,
+    max_result_bytes: Optional[int] = 8 * 1024 * 1024,
+) -> FastMCP:
     mcp: FastMCP = FastMCP("mcp-neo4j-cypher", dependencies=["neo4j", "pydantic"])
 
+    # keep references to background termination tasks until they finish
+    background_tasks: set[asyncio.Task] = set()
+
+    async def _run_budgeted(
+        access_mode: str, transaction_function: Any, *args: Any
+    ) -> Any:
+        """Run a transaction function with the query timeout applied by the database.
+
+        If the MCP request is cancelled, the running transaction is terminated on the
+        server instead of being left to run to completion.
+        """
+        query_id = uuid.uuid4().hex
+        work = unit_of_work(
+            timeout=query_timeout or None, metadata={"mcp_query_id": query_id}
+        )(transaction_function)
+        try:
+            async with neo4j_driver.session(database=database) as session:
+                if access_mode == "read":
+                    return await session.execute_read(work, *args)
+                return await session.execute_write(work, *args)
+        except asyncio.CancelledError:
+            task = asyncio.get_running_loop().create_task(
+                _terminate_transactions(neo4j_driver, database, query_id)
+            )
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+            raise
+
+    # EXPLAIN verdicts keyed by query shape
+    plan_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    async def _explain_query(
+        query: str, params: Optional[dict[str, Any]], write: bool = False
+    ) -> dict[str, Any]:
+        """Validate a query with EXPLAIN without touching any data.
+
+        Verdicts are cached by query shape, so repeated queries that only differ in
+        literal values are validated once. Verdicts reporting unknown labels or
+        relationship types are not cached: the tokens can be created by writes that
+        do not go through this server. Write queries are explained in a write
+        transaction so that a cluster routes them like the query itself.
+        """
+        shape = _query_shape(query)
+        if shape in plan_cache:
+            plan_cache.move_to_end(shape)
+            return plan_cache[shape]
+
+        try:
+            async with neo4j_driver.session(database=database) as session:
+                if write:
+                    summary = await session.execute_write(_explain, query, params or {})
+                else:
+                    summary = await session.execute_read(_explain, query, params or {})
+        except ClientError as e:
+            verdict: dict[str, Any] = {
+                "valid": False,
+                "error": e.message or str(e),
+                "unknown_tokens": False,
+                "estimated_rows": None,
+                "max_estimated_rows": None,
+            }
+        else:
+            estimated_rows, max_estimated_rows = _plan_estimates(summary.plan)
+            unknown = [
+                n.get("description") or n.get("title")
+                for n in summary.notifications or []
+                if n.get("code") in _UNKNOWN_TOKEN_NOTIFICATIONS
+            ]
+            verdict = {
+                "valid": not unknown,
+                "error": "; ".join(unknown) if unknown else None,
+                "unknown_tokens": bool(unknown),
+                "estimated_rows": estimated_rows,
+                "max_estimated_rows": max_estimated_rows,
+            }
+
+        if plan_cache_size > 0 and not verdict["unknown_tokens"]:
+            plan_cache[shape] = verdict
+            while len(plan_cache) > plan_cache_size:
+                plan_cache.popitem(last=False)
+        return verdict
+
+    async def _preflight(
+        query: str, params: Optional[dict[str, Any]], write: bool = False
+    ) -> Optional[str]:
+        """Return an error message if the query should not be executed.
+
+        Unknown labels are allowed for writes since they may create them.
+        """
+        verdict = await _explain_query(query, params, write=write)
+        if not verdict["valid"] and not (write and verdict["unknown_tokens"]):
+            return f"Query rejected by EXPLAIN: {verdict['error']}"
+        if max_estimated_rows and verdict["max_estimated_rows"] > max_estimated_rows:
+            return (
+                f"Query rejected: the planner estimates {verdict['max_estimated_rows']:.0f} rows "
+                f"(limit {max_estimated_rows:.0f}). Add a LIMIT or a more selective pattern."
+            )
+        return None
+
     async def get_neo4j_schema() -> list[types.TextContent]:
         """List all node, their attributes and their relationships to other nodes in the neo4j database.
         If this fails with a message that includes "Neo.ClientError.Procedure.ProcedureNotFound"
@@ -99,14 +319,11 @@ RETURN label, apoc.map.fromPairs(attributes) as attributes, apoc.map.fromPairs(r
 """
 
         try:
-            async with neo4j_driver.session(database=database) as session:
-                results_json_str = await session.execute_read(
-                    _read, get_schema_query, dict()
-                )
+            results_json_str = await _run_budgeted("read", _read, get_schema_query, dict())
 
-                logger.debug(f"Read query returned {len(results_json_str)} rows")
+            logger.debug(f"Read query returned {len(results_json_str)} rows")
 
-                return [types.TextContent(type="text", text=results_json_str)]
+            return [types.TextContent(type="text", text=results_json_str)]
 
         except Exception as e:
             logger.error(f"Database error retrieving schema: {e}")
@@ -124,12 +341,16 @@ RETURN label, apoc.map.fromPairs(attributes) as attributes, apoc.map.fromPairs(r
             raise ValueError("Only MATCH queries are allowed for read-query")
 
         try:
-            async with neo4j_driver.session(database=database) as session:
-                results_json_str = await session.execute_read(_read, query, params)
+            if rejection := await _preflight(query, params):
+                return [types.TextContent(type="text", text=f"Error: {rejection}")]
 
-                logger.debug(f"Read query returned {len(results_json_str)} rows")
+            results_json_str = await _run_budgeted(
+                "read", _read, query, params, max_rows or None, max_result_bytes or None
+            )
+
+            logger.debug(f"Read query returned {len(results_json_str)} rows")
 
-                return [types.TextContent(type="text", text=results_json_str)]
+            return [types.TextContent(type="text", text=results_json_str)]
 
         except Exception as e:
             logger.error(f"Database error executing query: {e}\n{query}\n{params}")
@@ -137,6 +358,27 @@ RETURN label, apoc.map.fromPairs(attributes) as attributes, apoc.map.fromPairs(r
                 types.TextContent(type="text", text=f"Error: {e}\n{query}\n{params}")
             ]
 
+    async def explain_neo4j_cypher(
+        query: Annotated[str, Field(description="The Cypher query to validate.")],
+        params: Annotated[
+            Optional[dict[str, Any]],
+            Field(description="The parameters to pass to the Cypher query."),
+        ] = None,
+    ) -> list[types.TextContent]:
+        """Validate a Cypher query with EXPLAIN without executing it.
+        Reports syntax errors, unknown labels or relationship types and the planner's estimated row count.
+        """
+
+        try:
+            verdict = await _explain_query(query, params)
+            return [types.TextContent(type="text", text=json.dumps(verdict))]
+
+        except Exception as e:
+            logger.error(f"Database error explaining query: {e}\n{query}\n{params}")
+            return [
+                types.TextContent(type="text", text=f"Error: {e}\n{query}\n{params}")
+            ]
+
     async def write_neo4j_cypher(
         query: str = Field(..., description="The Cypher query to execute."),
         params: Optional[dict[str, Any]] = Field(
@@ -149,11 +391,13 @@ RETURN label, apoc.map.fromPairs(attributes) as attributes, apoc.map.fromPairs(r
             raise ValueError("Only write queries are allowed for write-query")
 
         try:
-            async with neo4j_driver.session(database=database) as session:
-                raw_results = await session.execute_write(_write, query, params)
-                counters_json_str = json.dumps(
-                    raw_results._summary.counters.__dict__, default=str
-                )
+            if rejection := await _preflight(query, params, write=True):
+                return [types.TextContent(type="text", text=f"Error: {rejection}")]
+
+            raw_results = await _run_budgeted("write", _write, query, params)
+            counters_json_str = json.dumps(
+                raw_results._summary.counters.__dict__, default=str
+            )
 
             logger.debug(f"Write query affected {counters_json_str}")
 
@@ -167,6 +411,7 @@ RETURN label, apoc.map.fromPairs(attributes) as attributes, apoc.map.fromPairs(r
 
     mcp.add_tool(get_neo4j_schema)
     mcp.add_tool(read_neo4j_cypher)
+    mcp.add_tool(explain_neo4j_cypher)
     mcp.add_tool(write_neo4j_cypher)
 
     return mcp
@@ -177,6 +422,9 @@ def main(
     username: str,
     password: str,
     database: str,
+    query_timeout: Optional[float] = 30,
+    max_rows: Optional[int] = 10_000,
+    max_result_bytes: Optional[int] = 8 * 1024 * 1024,
 ) -> None:
     logger.info("Starting MCP neo4j Server")
 
@@ -188,7 +436,13 @@ def main(
         ),
     )
 
-    mcp = create_mcp_server(neo4j_driver, database)
+    mcp = create_mcp_server(
+        neo4j_driver,
+        database,
+        query_timeout=query_timeout,
+        max_rows=max_rows,
+        max_result_bytes=max_result_bytes,
+    )
 
     healthcheck(db_url, username, password, database)
 
@@ -0,0 +1,29 @@
+from mcp_neo4j_cypher.server import _query_shape
+
+
+def test_literals_share_a_shape():
+    assert _query_shape("MATCH (n {name: 'a'}) RETURN n LIMIT 5") == _query_shape(
+        'MATCH (n {name: "b"})  RETURN n LIMIT 10;'
+    )
+
+
+def test_variable_length_bounds_stay_in_the_shape():
+    assert _query_shape("MATCH (a)-[*5]->(b) RETURN b") != _query_shape(
+        "MATCH (a)-[*15]->(b) RETURN b"
+    )
+    assert _query_shape("MATCH (a)-[:LINKS*1..3]->(b) RETURN b") != _query_shape(
+        "MATCH (a)-[:LINKS*1..9]->(b) RETURN b"
+    )
+    assert _query_shape("MATCH (a)-[:LINKS*2]->(b) WHERE a.rank > 5 RETURN b") == (
+        "MATCH (a)-[:LINKS*2]->(b) WHERE a.rank > ? RETURN b"
+    )
+
+
+def test_quantifiers_stay_in_the_shape():
+    assert _query_shape("MATCH (a) ((x)-->(y)){1,3} (b) RETURN b") != _query_shape(
+        "MATCH (a) ((x)-->(y)){1,9} (b) RETURN b"
+    )
+
+
+def test_doubled_quote_is_one_string():
+    assert _query_shape("MATCH (n {name: 'it''s'}) RETURN n") == "MATCH (n {name: ?}) RETURN n"
@@ -4,7 +4,8 @@ import sys
 import json
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional
+import uuid
+from typing import Dict, List, Any, Optional, Set, Union
 
 # Try to import from mcp package with fallback options
 try:
@@ -49,10 +50,13 @@ except ImportError:
         logging.error("Neither 'mcp' nor 'fastmcp' packages are available. Please install one of them.")
         raise
 
-from neo4j import AsyncGraphDatabase, Driver, Result, Record
-from neo4j.exceptions import ServiceUnavailable, AuthError
+from neo4j import AsyncGraphDatabase, Driver, Query, Result, Record
 from dotenv import load_dotenv
 
+from langgraph_supervisor.neo4j_health import CircuitOpenError, Neo4jHealthMonitor
+from langgraph_supervisor.neo4j_transactions import QUERY_ID_METADATA_KEY, terminate_transactions
+from langgraph_supervisor.neo4j_serializer import dumps, record_to_dict
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -72,54 +76,92 @@ NEO4J_URI = os.environ.get("NEO4J_URI", "neo4j://34.203.212.188:7687")
 NEO4J_USERNAME = os.environ.get("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "ossca2727")
 
+# 쿼리 실행 예산 (0이면 제한 없음)
+NEO4J_QUERY_TIMEOUT = float(os.environ.get("NEO4J_QUERY_TIMEOUT", "30"))
+NEO4J_MAX_ROWS = int(os.environ.get("NEO4J_MAX_ROWS", "10000"))
+NEO4J_MAX_RESULT_BYTES = int(os.environ.get("NEO4J_MAX_RESULT_BYTES", str(8 * 1024 * 1024)))
+
+# 연결 상태 모니터 / 회로 차단기 설정
+NEO4J_HEALTH_INTERVAL = float(os.environ.get("NEO4J_HEALTH_INTERVAL", "30"))
+NEO4J_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("NEO4J_CIRCUIT_FAILURE_THRESHOLD", "3"))
+NEO4J_BACKOFF_BASE = float(os.environ.get("NEO4J_BACKOFF_BASE", "0.5"))
+NEO4J_BACKOFF_MAX = float(os.environ.get("NEO4J_BACKOFF_MAX", "30"))
+
+def truncated_result(records: List[Dict[str, Any]], reason: str) -> Dict[str, Any]:
+    """예산 초과로 읽기를 중단한 결과 (neo4j_mcp_server.py의 잘린 결과와 같은 형태)"""
+    return {"records": records, "truncated": True, "reason": reason}
+
 # Neo4j 연결 관리 클래스
 class Neo4jConnection:
-    """Neo4j 데이터베이스 연결 관리"""
+    """Neo4j 데이터베이스 연결 관리
+
+    쿼리 전에 연결 확인 쿼리를 보내지 않고, 실제 쿼리의 성공/실패를 연결 상태
+    모니터(`health`)에 보고합니다. 연결 오류가 이어지면 회로 차단기가 열려
+    데이터베이스가 복구될 때까지 요청을 즉시 거부합니다.
+    """
     
     def __init__(self, 
                  uri: str, 
                  username: str, 
                  password: str, 
                  max_retry: int = 3,
-                 connection_timeout: int = 10):
+                 connection_timeout: int = 10,
+                 query_timeout: float = NEO4J_QUERY_TIMEOUT,
+                 max_rows: int = NEO4J_MAX_ROWS,
+                 max_result_bytes: int = NEO4J_MAX_RESULT_BYTES):
         self._uri = uri
         self._username = username
         self._password = password
         self._max_retry = max_retry
         self._connection_timeout = connection_timeout
+        self._query_timeout = query_timeout or None
+        self._max_rows = max_rows or None
+        self._max_result_bytes = max_result_bytes or None
         self._driver: Optional[Driver] = None
-        self._is_connected = False
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.health = Neo4jHealthMonitor(
+            self._probe,
+            interval=NEO4J_HEALTH_INTERVAL,
+            failure_threshold=NEO4J_CIRCUIT_FAILURE_THRESHOLD,
+            backoff_base=NEO4J_BACKOFF_BASE,
+            backoff_max=NEO4J_BACKOFF_MAX,
+        )
         
-    async def connect(self) -> bool:
-        """데이터베이스에 연결"""
-        if self._is_connected and self._driver:
-            return True
-            
-        try:
-            # 드라이버 생성
+    def _get_driver(self) -> Driver:
+        """드라이버를 반환 (드라이버 생성은 네트워크 연결을 만들지 않음)"""
+        if self._driver is None:
             self._driver = AsyncGraphDatabase.driver(
                 self._uri,
                 auth=(self._username, self._password),
                 max_connection_lifetime=300,
                 connection_timeout=self._connection_timeout
             )
-            
-            # 연결 테스트
-            async with self._driver.session() as session:
-                result = await session.run("RETURN 1 as test")
-                record = await result.single()
-                if record and record.get("test") == 1:
-                    self._is_connected = True
-                    logger.info("Neo4j 연결 테스트 성공")
-                    return True
-                else:
-                    raise Exception("Neo4j 연결 테스트 실패: 예상된 결과를 받지 못했습니다.")
-                    
-        except Exception as e:
-            logger.error(f"Neo4j 연결 중 오류: {str(e)}")
-            if self._driver:
-                await self.disconnect()
-            return False
+        return self._driver
+    
+    async def _probe(self) -> None:
+        """연결 상태 모니터가 사용하는 연결 확인 (쿼리를 실행하지 않음)"""
+        await self._get_driver().verify_connectivity()
+    
+    async def connect(self) -> bool:
+        """데이터베이스 연결을 지금 확인하고 상태 모니터에 반영"""
+        connected = await self.health.check()
+        if connected:
+            logger.info("Neo4j 연결 확인 성공")
+        else:
+            logger.error(f"Neo4j 연결 중 오류: {self.health.last_error}")
+        return connected
+    
+    async def _execute(self, work):
+        """세션을 열어 `work(session)`을 실행하고 결과를 상태 모니터에 보고
+
+        연결 오류는 지수 백오프(지터 포함)로 최대 `max_retry`번까지 재시도하며,
+        회로 차단기가 열려 있으면 데이터베이스에 접근하지 않고 CircuitOpenError를 발생시킵니다.
+        """
+        async def attempt():
+            async with self._get_driver().session() as session:
+                return await work(session)
+
+        return await self.health.call(attempt, max_retry=self._max_retry)
     
     async def disconnect(self) -> None:
         """데이터베이스 연결 해제"""
@@ -130,55 +172,65 @@ class Neo4jConnection:
                 logger.error(f"Neo4j 연결 해제 중 오류: {str(e)}")
             finally:
                 self._driver = None
-                self._is_connected = False
     
-    async def run_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Cypher 쿼리 실행"""
-        if not self._is_connected or not self._driver:
-            success = await self.connect()
-            if not success:
-                return [{"error": "데이터베이스 연결 실패"}]
-        
+    async def terminate_query(self, query_id: str) -> None:
+        """메타데이터의 쿼리 식별자로 실행 중인 트랜잭션을 찾아 종료"""
         try:
-            async with self._driver.session() as session:
-                result = await session.run(query, params or {})
-                
-                # 결과를 JSON 직렬화 가능한 형태로 변환
-                records = []
-                async for record in result:
-                    record_dict = {}
-                    for key, value in record.items():
-                        try:
-                            # 날짜, 시간 등 특별한 타입 처리
-                            if hasattr(value, '__str__'):
-                                record_dict[key] = str(value)
-                            else:
-                                record_dict[key] = value
-                        except:
-                            record_dict[key] = f"{type(value).__name__}"
-                    
-                    records.append(record_dict)
-                
-                return records
-                
+            ids = await self._execute(lambda session: terminate_transactions(session, query_id))
+            if ids:
+                logger.info(f"취소된 요청의 트랜잭션 종료: {ids}")
         except Exception as e:
-            logger.error(f"쿼리 실행 중 오류: {str(e)}")
+            logger.error(f"트랜잭션 종료 실패: {str(e)}")
+
+    async def run_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Cypher 쿼리 실행
+
+        트랜잭션 타임아웃은 데이터베이스에서 강제되고, 최대 행 수/결과 크기를 넘으면
+        나머지 레코드를 읽지 않고 중단한 뒤 {"records", "truncated", "reason"} 객체를 반환합니다.
+        요청이 취소되면 서버에서 실행 중인 트랜잭션도 종료합니다.
+        """
+        query_id = uuid.uuid4().hex
+
+        async def work(session):
+            result = await session.run(
+                Query(query, timeout=self._query_timeout, metadata={QUERY_ID_METADATA_KEY: query_id}),
+                params or {},
+            )
             
-            # 네트워크 오류 등의 경우 재연결 시도
-            if isinstance(e, (ServiceUnavailable, AuthError)):
-                self._is_connected = False
-                await self.disconnect()
-                return await self.run_cypher(query, params)
+            # 결과를 JSON 직렬화 가능한 형태로 변환
+            records = []
+            result_bytes = 0
+            async for record in result:
+                if self._max_rows is not None and len(records) >= self._max_rows:
+                    return truncated_result(records, f"최대 행 수({self._max_rows})를 초과하여 결과가 잘렸습니다.")
+                # 노드/관계/날짜/공간 타입을 타입 정보를 유지한 JSON 값으로 변환
+                record_dict = record_to_dict(record)
                 
+                if self._max_result_bytes is not None:
+                    result_bytes += len(dumps(record_dict))
+                    if result_bytes > self._max_result_bytes:
+                        return truncated_result(records, f"최대 결과 크기({self._max_result_bytes} bytes)를 초과하여 결과가 잘렸습니다.")
+                records.append(record_dict)
+            
+            return records
+
+        try:
+            return await self._execute(work)
+        except CircuitOpenError as e:
+            return [{"error": f"데이터베이스 연결 불가로 요청을 즉시 거부했습니다: {e.last_error}"}]
+        except asyncio.CancelledError:
+            # 요청이 취소됨: 요청 태스크와 별개로 트랜잭션 종료를 진행
+            task = asyncio.get_running_loop().create_task(self.terminate_query(query_id))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+            raise
+        except Exception as e:
+            # 연결 오류는 _execute에서 제한된 횟수만 재시도한 뒤 여기로 전달됨
+            logger.error(f"쿼리 실행 중 오류: {str(e)}")
             return [{"error": f"쿼리 실행 중 오류: {str(e)}"}]
     
     async def get_schema(self) -> Dict[str, Any]:
         """데이터베이스 스키마 정보 조회"""
-        if not self._is_connected or not self._driver:
-            success = await self.connect()
-            if not success:
-                return {"error": "데이터베이스 연결 실패"}
-        
         try:
             schema = {}
             
@@ -200,7 +252,7 @@ class Neo4jConnection:
             RETURN collect(propertyKey) AS propertyKeys
             """
             
-            async with self._driver.session() as session:
+            async def work(session):
                 # 노드 레이블
                 result = await session.run(node_query)
                 record = await result.single()
@@ -216,8 +268,11 @@ class Neo4jConnection:
                 record = await result.single()
                 schema["propertyKeys"] = record["propertyKeys"] if record else []
             
+            await self._execute(work)
             return schema
             
+        except CircuitOpenError as e:
+            return {"error": f"데이터베이스 연결 불가로 요청을 즉시 거부했습니다: {e.last_error}"}
         except Exception as e:
             logger.error(f"스키마 조회 중 오류: {str(e)}")
             return {"error": f"스키마 조회 중 오류: {str(e)}"}
@@ -258,10 +313,21 @@ class RunCypherTool(MCPTool):
                 "required": ["query"]
             },
             "returns": {
-                "type": "array",
-                "items": {
-                    "type": "object"
-                }
+                "oneOf": [
+                    {
+                        "type": "array",
+                        "items": {"type": "object"}
+                    },
+                    {
+                        # 최대 행 수/결과 크기를 넘어 잘린 결과
+                        "type": "object",
+                        "properties": {
+                            "records": {"type": "array", "items": {"type": "object"}},
+                            "truncated": {"type": "boolean"},
+                            "reason": {"type": "string"}
+                        }
+                    }
+                ]
             },
             "tool_type": MCPToolType.FUNCTION
         }
@@ -317,7 +383,8 @@ class ConnectionStatusTool(MCPTool):
         connected = await self.neo4j.connect()
         return {
             "connected": connected,
-            "uri": self.neo4j._uri
+            "uri": self.neo4j._uri,
+            "health": self.neo4j.health.snapshot()
         }
     
     def schema(self) -> Dict[str, Any]:
@@ -334,7 +401,8 @@ class ConnectionStatusTool(MCPTool):
                 "type": "object",
                 "properties": {
                     "connected": {"type": "boolean"},
-                    "uri": {"type": "string"}
+                    "uri": {"type": "string"},
+                    "health": {"type": "object"}
                 }
             },
             "tool_type": MCPToolType.FUNCTION
@@ -345,6 +413,8 @@ async def run_server():
     """MCP 서버 실행"""
     # Neo4j 연결 생성
     neo4j_connection = Neo4jConnection(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
+    # 백그라운드 연결 상태 모니터 시작 (트래픽이 없을 때만 연결 확인)
+    neo4j_connection.health.start()
     
     # 도구 초기화
     run_cypher_tool = RunCypherTool(neo4j_connection)
@@ -370,6 +440,7 @@ async def run_server():
         logger.info("서버 종료 중...")
     finally:
         # 리소스 정리
+        await neo4j_connection.health.stop()
         await neo4j_connection.disconnect()
         await server.stop()
         logger.info("서버가 정상적으로 종료되었습니다.")
@@ -5,13 +5,22 @@ Neo4j MCP 서버 구현
 """
 
 import os
+import re
 import json
 import time
+import asyncio
+import secrets
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable, DriverError
+from neo4j import AsyncGraphDatabase, Query, unit_of_work
+from neo4j.exceptions import ClientError, ServiceUnavailable, SessionExpired, DriverError
 from mcp.server.fastmcp import FastMCP
 
+from langgraph_supervisor.neo4j_health import CircuitOpenError, Neo4jHealthMonitor
+from langgraph_supervisor.neo4j_transactions import QUERY_ID_METADATA_KEY, terminate_transactions
+from langgraph_supervisor.neo4j_serializer import dumps, record_to_dict
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -19,186 +28,1228 @@ load_dotenv()
 NEO4J_URI = os.environ.get("NEO4J_URI", "neo4j://localhost:7687")
 NEO4J_USERNAME = os.environ.get("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "password")
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE") or None
+
+# 커넥션 풀 설정
+NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.environ.get("NEO4J_ACQUISITION_TIMEOUT", "30"))
+
+# 연결 상태 모니터 / 회로 차단기 설정
+NEO4J_HEALTH_INTERVAL = float(os.environ.get("NEO4J_HEALTH_INTERVAL", "30"))
+NEO4J_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("NEO4J_CIRCUIT_FAILURE_THRESHOLD", "3"))
+NEO4J_BACKOFF_BASE = float(os.environ.get("NEO4J_BACKOFF_BASE", "0.5"))
+NEO4J_BACKOFF_MAX = float(os.environ.get("NEO4J_BACKOFF_MAX", "30"))
+
+# 읽기 결과 캐시 설정
+NEO4J_CACHE_MAX_ENTRIES = int(os.environ.get("NEO4J_CACHE_MAX_ENTRIES", "512"))
+NEO4J_CACHE_TTL = float(os.environ.get("NEO4J_CACHE_TTL", "300"))
+NEO4J_CACHE_MAX_BYTES = int(os.environ.get("NEO4J_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# 쿼리 실행 예산 (0이면 제한 없음)
+NEO4J_QUERY_TIMEOUT = float(os.environ.get("NEO4J_QUERY_TIMEOUT", "30"))
+NEO4J_MAX_ROWS = int(os.environ.get("NEO4J_MAX_ROWS", "10000"))
+NEO4J_MAX_RESULT_BYTES = int(os.environ.get("NEO4J_MAX_RESULT_BYTES", str(8 * 1024 * 1024)))
+NEO4J_STREAM_TIMEOUT = float(os.environ.get("NEO4J_STREAM_TIMEOUT", "600"))
+
+# 배치 실행 설정 (동시 실행 수는 커넥션 풀 크기보다 작게 유지)
+NEO4J_BATCH_MAX_QUERIES = int(os.environ.get("NEO4J_BATCH_MAX_QUERIES", "20"))
+NEO4J_BATCH_CONCURRENCY = int(os.environ.get("NEO4J_BATCH_CONCURRENCY", "8"))
+
+# 스트리밍(페이지) 결과 설정
+NEO4J_PAGE_SIZE = int(os.environ.get("NEO4J_PAGE_SIZE", "200"))
+NEO4J_PAGE_MAX_BYTES = int(os.environ.get("NEO4J_PAGE_MAX_BYTES", str(256 * 1024)))
+NEO4J_MAX_OPEN_CURSORS = int(os.environ.get("NEO4J_MAX_OPEN_CURSORS", "16"))
+NEO4J_CURSOR_IDLE_TIMEOUT = float(os.environ.get("NEO4J_CURSOR_IDLE_TIMEOUT", "120"))
+
+# EXPLAIN 사전 검증 설정 (NEO4J_MAX_ESTIMATED_ROWS=0이면 추정 행 수 제한 없음)
+NEO4J_EXPLAIN_PREFLIGHT = os.environ.get("NEO4J_EXPLAIN_PREFLIGHT", "true").lower() in ("1", "true", "yes")
+NEO4J_PARAMETERIZE_LITERALS = os.environ.get("NEO4J_PARAMETERIZE_LITERALS", "true").lower() in ("1", "true", "yes")
+NEO4J_PLAN_CACHE_SIZE = int(os.environ.get("NEO4J_PLAN_CACHE_SIZE", "1024"))
+NEO4J_MAX_ESTIMATED_ROWS = float(os.environ.get("NEO4J_MAX_ESTIMATED_ROWS", "10000000"))
+
+# 스키마 카탈로그 설정
+NEO4J_SCHEMA_TTL = float(os.environ.get("NEO4J_SCHEMA_TTL", "3600"))
+NEO4J_SCHEMA_SAMPLE_SIZE = int(os.environ.get("NEO4J_SCHEMA_SAMPLE_SIZE", "1000"))
+NEO4J_STATS_TTL = float(os.environ.get("NEO4J_STATS_TTL", "60"))
+NEO4J_SCHEMA_CACHE_PATH = os.environ.get(
+    "NEO4J_SCHEMA_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".neo4j_schema_cache.json"),
+)
 
 print(f"Neo4j 연결 정보: URI={NEO4J_URI}, 사용자={NEO4J_USERNAME}")
 
+
+# 쓰기 쿼리 판별 (쓰기 절 또는 db.* 이외의 프로시저 호출)
+# 절 키워드만 찾도록 속성 접근(`n.set`), 라벨(`:Create`), 파라미터, 맵 키(`{set: 1}`)는 제외
+# 문자열/주석/백틱 식별자 안의 단어는 `_mask_query`로 가린 뒤 검사함
+WRITE_QUERY_PATTERN = re.compile(
+    r"(?<![\w.$:])(CREATE|MERGE|SET|DELETE|REMOVE|DROP|LOAD\s+CSV|FOREACH)\b(?!\s*:)"
+    r"|(?<![\w.$:])CALL\s+(?!db\.)[A-Za-z_]",
+    re.IGNORECASE,
+)
+# 실행할 때마다 결과가 달라지는 함수가 포함된 쿼리는 캐시하지 않음
+NON_DETERMINISTIC_PATTERN = re.compile(
+    r"\b(rand|randomUUID|timestamp)\s*\(|\b(date|datetime|localdatetime|time|localtime)\s*\(\s*\)",
+    re.IGNORECASE,
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# 쿼리 형태(shape) 계산용: 백틱 식별자와 주석은 그대로 두고 문자열/숫자 리터럴만 치환
+# 가변 길이 관계(`-[:T*2]`), QPP 수량자(`{1,3}`), SHORTEST k, IN TRANSACTIONS OF n ROWS 안의
+# 숫자는 파라미터로 바꿀 수 없으므로 그대로 둠
+QUERY_TOKEN_PATTERN = re.compile(
+    r"(?P<ident>`[^`]*`)"
+    r"|(?P<comment>//[^\n]*|/\*.*?\*/)"
+    r"|(?P<keep>-\s*\[(?:[^\[\]'\"`]|`[^`]*`)*\*\s*\d*(?:\s*\.\.\s*\d*)?"
+    r"|\{\s*\d*\s*,\s*\d*\s*\}|\{\s*\d+\s*\}"
+    r"|\b(?:SHORTEST|ANY|OF)\s+\d+)"
+    r"|(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")"
+    r"|(?P<number>(?<![\w$.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.]))",
+    re.DOTALL,
+)
+# EXPLAIN으로 검증할 수 없는 쿼리 (이미 EXPLAIN/PROFILE이 붙었거나 관리 명령)
+NO_PREFLIGHT_PATTERN = re.compile(
+    r"^\s*(EXPLAIN|PROFILE|SHOW|USE|:|(CREATE|DROP)\s+(INDEX|CONSTRAINT|DATABASE|ALIAS|USER|ROLE)|DROP\b)",
+    re.IGNORECASE,
+)
+# 쿼리를 거부해야 하는 플래너 경고 (존재하지 않는 라벨/관계 유형)
+UNKNOWN_TOKEN_NOTIFICATIONS = (
+    "Neo.ClientNotification.Statement.UnknownLabelWarning",
+    "Neo.ClientNotification.Statement.UnknownRelationshipTypeWarning",
+)
+# 쿼리 안의 라벨/관계 유형 토큰 (`:Label`, `:`My Label``)
+LABEL_TOKEN_PATTERN = re.compile(r":\s*(?:`([^`]+)`|([A-Za-z_][A-Za-z0-9_]*))")
+
+
+def _mask_query(query):
+    """문자열 리터럴, 백틱 식별자, 주석을 같은 길이의 `_`로 가립니다 (위치는 그대로 유지)."""
+    return QUERY_TOKEN_PATTERN.sub(
+        lambda match: match.group(0)
+        if match.group("ident") is None
+        and match.group("string") is None
+        and match.group("comment") is None
+        else "_" * len(match.group(0)),
+        query,
+    )
+
+
+def is_write_query(query):
+    """쿼리가 데이터를 변경할 수 있는지 확인합니다.
+
+    `WHERE n.title CONTAINS 'create'`나 `RETURN n.offset, n.set` 같은 읽기 쿼리는 쓰기로 보지 않습니다.
+    """
+    return WRITE_QUERY_PATTERN.search(_mask_query(query)) is not None
+
+
+def normalize_query(query):
+    """캐시 키로 사용하기 위해 공백과 끝의 세미콜론을 정규화합니다.
+
+    문자열 리터럴과 백틱 식별자 안의 공백은 값의 일부이므로 그대로 둡니다.
+    (`'a  b'`와 `'a b'`는 서로 다른 쿼리)
+    """
+    parts = []
+    position = 0
+    for match in QUERY_TOKEN_PATTERN.finditer(query):
+        if match.group("string") is None and match.group("ident") is None:
+            continue
+        parts.append(WHITESPACE_PATTERN.sub(" ", query[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(WHITESPACE_PATTERN.sub(" ", query[position:]))
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def query_shape(query):
+    """리터럴 값만 다른 쿼리들이 같은 키를 갖도록 문자열/숫자 리터럴을 `?`로 치환합니다."""
+    def replace(match):
+        if match.group("string") is not None or match.group("number") is not None:
+            return "?"
+        return match.group(0)
+    return normalize_query(QUERY_TOKEN_PATTERN.sub(replace, query))
+
+
+STRING_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+STRING_ESCAPE_PATTERN = re.compile(r"\\(u[0-9A-Fa-f]{4}|.)|''|\"\"", re.DOTALL)
+
+
+def _unescape_string(literal):
+    """Cypher 문자열 리터럴을 Python 문자열로 변환합니다. 알 수 없는 이스케이프면 None을 반환합니다.
+
+    따옴표를 두 번 쓴 것(`'it''s'`)은 따옴표 하나로 해석합니다.
+    """
+    quote, body = literal[0], literal[1:-1]
+    if "\\" not in body and quote * 2 not in body:
+        return body
+    unknown = False
+
+    def replace(match):
+        nonlocal unknown
+        escape = match.group(1)
+        if escape is None:
+            text = match.group(0)
+            return quote if text[0] == quote else text
+        if escape[0] == "u" and len(escape) == 5:
+            return chr(int(escape[1:], 16))
+        if escape in STRING_ESCAPES:
+            return STRING_ESCAPES[escape]
+        unknown = True
+        return match.group(0)
+
+    value = STRING_ESCAPE_PATTERN.sub(replace, body)
+    return None if unknown else value
+
+
+def _parse_number(literal):
+    """숫자 리터럴을 int/float로 변환합니다. 8진수로 해석될 수 있거나 64비트를 넘으면 None."""
+    if "." in literal or "e" in literal or "E" in literal:
+        return float(literal)
+    if len(literal) > 1 and literal.startswith("0"):
+        return None
+    value = int(literal)
+    return value if value < 2 ** 63 else None
+
+
+# RETURN/WITH 프로젝션이 끝나는 절 키워드
+PROJECTION_CLAUSE_PATTERN = re.compile(r"\b(RETURN|WITH)\b(?:\s+DISTINCT\b)?", re.IGNORECASE)
+PROJECTION_END_PATTERN = re.compile(
+    r"(ORDER\s+BY|SKIP|LIMIT|OFFSET|WHERE|UNION|MATCH|OPTIONAL|WITH|RETURN|UNWIND|CALL|CREATE"
+    r"|MERGE|SET|DELETE|DETACH|REMOVE|FOREACH|FINISH|LOAD|USE)\b",
+    re.IGNORECASE,
+)
+PROJECTION_ALIAS_PATTERN = re.compile(r"\bAS\s+\w+\s*$", re.IGNORECASE)
+# `STARTS WITH`/`ENDS WITH`의 WITH는 절이 아니라 문자열 비교 연산자
+STRING_OPERATOR_PREFIX_PATTERN = re.compile(r"\b(?:STARTS|ENDS)\s+$", re.IGNORECASE)
+
+
+def _is_string_operator_with(masked, position):
+    """`position`의 WITH가 `STARTS WITH`/`ENDS WITH` 연산자의 일부인지 확인합니다."""
+    return (
+        masked[position:position + 4].upper() == "WITH"
+        and STRING_OPERATOR_PREFIX_PATTERN.search(masked, max(0, position - 64), position) is not None
+    )
+
+
+def _unaliased_projection_spans(query):
+    """별칭(`AS`)이 없는 RETURN/WITH 프로젝션 항목의 (시작, 끝) 위치 목록을 구합니다.
+
+    별칭이 없으면 식의 텍스트가 그대로 결과 컬럼 이름이 되므로, 그 안의 리터럴을 바꾸면
+    결과 키가 달라집니다 (`RETURN size(x) > 2` -> `size(x) > $p0`).
+    문자열, 백틱 식별자, 주석은 같은 길이의 `_`로 가린 뒤 괄호 깊이를 따라가며 항목을 나눕니다.
+    """
+    masked = _mask_query(query)
+    spans = []
+    for clause in PROJECTION_CLAUSE_PATTERN.finditer(masked):
+        if _is_string_operator_with(masked, clause.start()):
+            continue
+        start = position = clause.end()
+        depth = 0
+        while position < len(masked):
+            char = masked[position]
+            if char in "([{":
+                depth += 1
+            elif char in ")]}":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0:
+                word_start = not (masked[position - 1].isalnum() or masked[position - 1] in "_$")
+                if char == ";":
+                    break
+                if char == ",":
+                    spans.append((start, position))
+                    start = position + 1
+                elif (
+                    word_start
+                    and PROJECTION_END_PATTERN.match(masked, position)
+                    and not _is_string_operator_with(masked, position)
+                ):
+                    break
+            position += 1
+        spans.append((start, position))
+    return [
+        (start, end) for start, end in spans
+        if not PROJECTION_ALIAS_PATTERN.search(masked[start:end])
+    ]
+
+
+def parameterize_literals(query, params=None):
+    """문자열/숫자 리터럴을 `$p0..$pN` 파라미터로 바꿉니다.
+
+    프롬프트 규칙상 에이전트는 모든 값을 리터럴로 쿼리에 직접 넣기 때문에 Neo4j는 매번
+    다른 쿼리 문자열을 받아 새로 계획을 세웁니다. 리터럴을 파라미터로 옮기면 같은 템플릿의
+    쿼리가 같은 문자열이 되어 데이터베이스의 플랜 캐시를 재사용할 수 있습니다.
+    같은 값의 리터럴은 하나의 파라미터를 공유하고, 이미 있는 파라미터 이름은 피합니다.
+    별칭이 없는 RETURN/WITH 항목의 리터럴은 결과 컬럼 이름이 바뀌지 않도록 그대로 둡니다.
+
+    Returns:
+        (변환된 쿼리, 파라미터 딕셔너리)
+    """
+    params = dict(params or {})
+    if NO_PREFLIGHT_PATTERN.match(query):
+        return query, params
+    names = {}
+    index = 0
+    keep_spans = _unaliased_projection_spans(query)
+
+    def replace(match):
+        nonlocal index
+        literal = match.group(0)
+        if any(start <= match.start() < end for start, end in keep_spans):
+            return literal
+        if match.group("string") is not None:
+            value = _unescape_string(literal)
+        elif match.group("number") is not None:
+            value = _parse_number(literal)
+        else:
+            return literal
+        if value is None:
+            return literal
+        key = (type(value), value)
+        if key not in names:
+            while f"p{index}" in params:
+                index += 1
+            names[key] = f"p{index}"
+            params[f"p{index}"] = value
+            index += 1
+        return f"${names[key]}"
+
+    return QUERY_TOKEN_PATTERN.sub(replace, query), params
+
+
+def _plan_estimates(plan):
+    """EXPLAIN 플랜에서 (최종 추정 행 수, 연산자 중 최대 추정 행 수)를 구합니다."""
+    if not plan:
+        return 0.0, 0.0
+    root_rows = float(plan.get("args", {}).get("EstimatedRows", 0.0))
+    peak_rows = root_rows
+    stack = list(plan.get("children", []))
+    while stack:
+        operator = stack.pop()
+        peak_rows = max(peak_rows, float(operator.get("args", {}).get("EstimatedRows", 0.0)))
+        stack.extend(operator.get("children", []))
+    return root_rows, peak_rows
+
+
+class QueryBudget:
+    """도구별 실행 예산: 트랜잭션 타임아웃(초), 최대 행 수, 최대 결과 바이트 수.
+
+    타임아웃은 드라이버 트랜잭션 타임아웃으로 데이터베이스에서 강제되고,
+    행/바이트 제한은 레코드를 읽는 도중 초과하면 읽기를 중단하는 방식으로 강제됩니다.
+    """
+
+    def __init__(self, timeout=NEO4J_QUERY_TIMEOUT, max_rows=NEO4J_MAX_ROWS,
+                 max_bytes=NEO4J_MAX_RESULT_BYTES):
+        self.timeout = timeout or None
+        self.max_rows = max_rows or None
+        self.max_bytes = max_bytes or None
+
+    def cache_key(self):
+        return self.max_rows, self.max_bytes
+
+
+TOOL_BUDGETS = {
+    "run_cypher": QueryBudget(),
+    "run_cypher_with_params": QueryBudget(),
+    # 배치의 쿼리별 예산 (consistent 모드에서 타임아웃은 트랜잭션 전체에 적용)
+    "run_cypher_batch": QueryBudget(),
+    # 스트리밍은 페이지 단위로 메모리가 제한되므로 행/바이트 제한 없이 타임아웃만 적용
+    "run_cypher_stream": QueryBudget(timeout=NEO4J_STREAM_TIMEOUT, max_rows=0, max_bytes=0),
+}
+
+
+class TruncatedRecords(list):
+    """예산 초과로 읽기를 중단한 결과. `reason`에 중단 사유가 담깁니다."""
+
+    def __init__(self, records, reason):
+        super().__init__(records)
+        self.reason = reason
+
+
+def records_to_json(records, indent=None):
+    """레코드 목록을 JSON으로 직렬화합니다. 잘린 결과는 사유와 함께 객체로 감쌉니다."""
+    if isinstance(records, TruncatedRecords):
+        records = {"records": list(records), "truncated": True, "reason": records.reason}
+    return dumps(records, indent=indent)
+
+
+def circuit_open_message(error):
+    """회로 차단기로 거부된 요청의 오류 메시지"""
+    message = f"데이터베이스에 연결할 수 없어 요청을 즉시 거부했습니다 ({error.retry_in:.1f}초 후 재시도)"
+    if error.last_error:
+        message += f". 마지막 오류: {error.last_error}"
+    return message
+
+
+class QueryResultCache:
+    """읽기 쿼리 결과 캐시 (LRU + TTL + 메모리 상한).
+
+    키는 정규화된 쿼리 문자열과 파라미터이며, 서버를 통해 쓰기 쿼리가 실행되면
+    전체 캐시가 무효화됩니다. 항목 크기는 결과를 JSON으로 직렬화한 길이로 추정합니다.
+    """
+
+    def __init__(self, max_entries=NEO4J_CACHE_MAX_ENTRIES, ttl=NEO4J_CACHE_TTL,
+                 max_bytes=NEO4J_CACHE_MAX_BYTES):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, records)
+        self._bytes = 0
+        # 쓰기가 발생할 때마다 증가. 읽기 도중 쓰기가 끼어들면 그 결과는 저장하지 않음
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self._max_entries > 0 and self._ttl > 0 and self._max_bytes > 0
+
+    @staticmethod
+    def make_key(query, params=None, budget=None):
+        return (
+            normalize_query(query),
+            json.dumps(params or {}, sort_keys=True, default=str),
+            budget.cache_key() if budget is not None else None,
+        )
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, records = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return records
+
+    def put(self, key, records, generation):
+        if not self.enabled or generation != self.generation:
+            return
+        size = len(dumps(records))
+        if size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self._ttl, size, records)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self):
+        """쓰기 발생 시 캐시 전체를 비웁니다."""
+        self.generation += 1
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+            "ttl_seconds": self._ttl,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class QueryPlanCache:
+    """EXPLAIN 사전 검증 결과 캐시 (쿼리 형태 기준 LRU).
+
+    존재하지 않는 라벨/관계 유형 때문에 거부된 결과는 캐시하지 않습니다. 라벨은 이 서버를
+    거치지 않는 쓰기(수집 파이프라인, HTTP API, 다른 클라이언트)로도 생길 수 있어서
+    언제 무효화해야 할지 알 수 없기 때문입니다.
+    """
+
+    def __init__(self, max_entries=NEO4J_PLAN_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # shape -> verdict
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape):
+        verdict = self._entries.get(shape)
+        if verdict is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(shape)
+        self.hits += 1
+        return verdict
+
+    def put(self, shape, verdict):
+        if self._max_entries <= 0:
+            return
+        self._entries[shape] = verdict
+        self._entries.move_to_end(shape)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """연결 상태 모니터를 시작하고, 서버 종료 시 모니터와 드라이버(커넥션 풀)를 정리합니다."""
+    connector.health.start()
+    try:
+        yield {}
+    finally:
+        await connector.health.stop()
+        await connector.close()
+        print("Neo4j 연결 닫힘")
+
 # MCP 서버 초기화
-mcp = FastMCP("Neo4j")
+mcp = FastMCP("Neo4j", lifespan=lifespan)
+
+
+class ResultCursor:
+    """열린 세션과 결과 스트림을 보관하며, 요청 시 다음 페이지만 가져옵니다.
+
+    드라이버는 `fetch_size` 단위로 레코드를 받아오므로, 한 번에 메모리에 올라가는
+    레코드는 페이지 크기 정도로 제한됩니다.
+    """
+
+    def __init__(self, session, result, page_size, max_bytes, write_query=None):
+        self.token = secrets.token_urlsafe(16)
+        self.session = session
+        self.result = result
+        self.page_size = page_size
+        self.max_bytes = max_bytes
+        self.write_query = write_query
+        self.page_number = 0
+        self.rows_sent = 0
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self._pending = None  # 이전 페이지에 들어가지 못한 직렬화된 레코드
+        self.exhausted = False
+
+    async def _next_serialized(self):
+        if self._pending is not None:
+            serialized, self._pending = self._pending, None
+            return serialized
+        try:
+            record = await self.result.__anext__()
+        except StopAsyncIteration:
+            self.exhausted = True
+            return None
+        return dumps(record_to_dict(record))
+
+    async def next_page(self):
+        """다음 페이지를 JSON 문자열로 반환합니다. 페이지는 행 수와 바이트 수 모두로 제한됩니다."""
+        self.last_used = time.monotonic()
+        parts = []
+        size = 0
+        while len(parts) < self.page_size:
+            serialized = await self._next_serialized()
+            if serialized is None:
+                break
+            if parts and size + len(serialized) > self.max_bytes:
+                self._pending = serialized
+                break
+            parts.append(serialized)
+            size += len(serialized) + 1
+        # 다음 페이지 존재 여부 확인 (레코드 하나만 미리 읽음)
+        if not self.exhausted and self._pending is None:
+            self._pending = await self._next_serialized()
+        has_more = self._pending is not None
+        self.page_number += 1
+        self.rows_sent += len(parts)
+        header = json.dumps({
+            "cursor": self.token if has_more else None,
+            "page": self.page_number,
+            "rows": len(parts),
+            "rows_sent": self.rows_sent,
+            "has_more": has_more,
+        }, ensure_ascii=False)
+        return header[:-1] + ', "records": [' + ", ".join(parts) + "]}", has_more
+
+    async def close(self):
+        try:
+            await self.session.close()
+        except Exception:
+            pass
+
+
+def _quote_name(name):
+    """라벨/관계 유형 이름을 Cypher 식별자로 안전하게 감쌉니다."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+class SchemaCatalog:
+    """get_schema 결과를 메모리와 디스크에 보관하는 스키마 카탈로그.
+
+    최초 1회 전체 스키마를 계산한 뒤에는 저장된 결과를 반환하고,
+    쓰기 쿼리가 건드린 라벨만 샘플링으로 다시 계산합니다. TTL이 지나면 전체를 갱신합니다.
+    """
+
+    def __init__(self, connector, path=NEO4J_SCHEMA_CACHE_PATH, ttl=NEO4J_SCHEMA_TTL,
+                 sample_size=NEO4J_SCHEMA_SAMPLE_SIZE):
+        self._connector = connector
+        self._path = path
+        self._ttl = ttl
+        self._sample_size = sample_size
+        self._schema = None
+        self._refreshed_at = 0.0
+        self._dirty_labels = set()
+        self._lock = asyncio.Lock()
+        self._load()
+
+    def _cache_id(self):
+        return f"{self._connector._uri}|{self._connector._database or ''}"
+
+    def _load(self):
+        """디스크에 저장된 스키마를 읽어옵니다. 다른 데이터베이스의 스키마는 무시합니다."""
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("cache_id") == self._cache_id():
+                self._schema = data["schema"]
+                self._refreshed_at = float(data["refreshed_at"])
+        except Exception as e:
+            print(f"스키마 캐시 파일 읽기 실패: {str(e)}")
+
+    def _save(self):
+        if not self._path:
+            return
+        data = {"cache_id": self._cache_id(), "refreshed_at": self._refreshed_at, "schema": self._schema}
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
+        except Exception as e:
+            print(f"스키마 캐시 파일 저장 실패: {str(e)}")
+
+    def mark_dirty(self, query):
+        """쓰기 쿼리가 건드린 라벨을 다음 조회 때 다시 계산하도록 표시합니다.
+
+        라벨을 특정할 수 없는 쓰기(`MATCH (n) SET n.x = 1` 등)는 모든 라벨을 표시합니다.
+        """
+        if self._schema is None:
+            return
+        labels = {quoted or plain for quoted, plain in LABEL_TOKEN_PATTERN.findall(query)}
+        self._dirty_labels |= labels or {"*"}
+
+    def _expired(self):
+        # 디스크의 refreshed_at은 wall-clock 시간으로 저장
+        return self._schema is None or time.time() - self._refreshed_at > self._ttl
+
+    async def get(self, refresh=False):
+        async with self._lock:
+            if refresh or self._expired():
+                self._schema = await self._connector._execute(self._full_refresh)
+                self._refreshed_at = time.time()
+                self._dirty_labels.clear()
+                self._save()
+            elif self._dirty_labels:
+                dirty, self._dirty_labels = self._dirty_labels, set()
+                try:
+                    self._schema = await self._connector._execute(
+                        lambda session: self._incremental_refresh(session, dirty)
+                    )
+                except Exception:
+                    self._dirty_labels |= dirty
+                    raise
+                self._save()
+            return self._schema
+
+    async def _token_lists(self, session):
+        """라벨/관계 유형/속성 키 목록은 토큰 저장소에서 바로 읽으므로 비용이 작습니다."""
+        node_labels_result = await session.run("CALL db.labels()")
+        node_labels = [record["label"] async for record in node_labels_result]
+
+        rel_types_result = await session.run("CALL db.relationshipTypes()")
+        rel_types = [record["relationshipType"] async for record in rel_types_result]
+
+        properties_result = await session.run("CALL db.propertyKeys()")
+        properties = [record["propertyKey"] async for record in properties_result]
+        return node_labels, rel_types, properties
+
+    async def _sample_label(self, session, label):
+        """라벨당 최대 sample_size개 노드만 읽어 속성 키를 수집합니다."""
+        query = f"""
+        MATCH (n:{_quote_name(label)})
+        WITH n LIMIT $sample_size
+        UNWIND keys(n) AS prop
+        RETURN DISTINCT prop
+        """
+        result = await session.run(query, {"sample_size": self._sample_size})
+        return sorted([record["prop"] async for record in result])
+
+    async def _full_refresh(self, session):
+        node_labels, rel_types, properties = await self._token_lists(session)
+
+        node_schema = {label: set() for label in node_labels}
+        try:
+            result = await session.run(
+                "CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName "
+                "RETURN nodeLabels, propertyName"
+            )
+            async for record in result:
+                for label in record["nodeLabels"] or []:
+                    if record["propertyName"] is not None:
+                        node_schema.setdefault(label, set()).add(record["propertyName"])
+            node_schema = {label: sorted(props) for label, props in node_schema.items()}
+        except Exception as e:
+            # 프로시저를 사용할 수 없는 환경에서는 라벨별 샘플링으로 대체
+            print(f"db.schema.nodeTypeProperties 사용 불가, 샘플링으로 대체: {str(e)}")
+            node_schema = {label: await self._sample_label(session, label) for label in node_labels}
+
+        return {
+            "node_labels": node_labels,
+            "relationship_types": rel_types,
+            "properties": properties,
+            "node_schema": node_schema
+        }
+
+    async def _incremental_refresh(self, session, dirty):
+        node_labels, rel_types, properties = await self._token_lists(session)
+        node_schema = {
+            label: props for label, props in self._schema["node_schema"].items()
+            if label in node_labels
+        }
+        for label in node_labels:
+            if "*" in dirty or label in dirty or label not in node_schema:
+                node_schema[label] = await self._sample_label(session, label)
+        return {
+            "node_labels": node_labels,
+            "relationship_types": rel_types,
+            "properties": properties,
+            "node_schema": node_schema
+        }
+
+
+
+class CountStoreStatistics:
+    """Neo4j 카운트 스토어 기반의 노드/관계 통계.
+
+    `MATCH (n:Label) RETURN count(n)`과 `MATCH ()-[r:TYPE]->() RETURN count(r)` 형태만 사용하므로
+    플래너가 노드를 스캔하지 않고 카운트 스토어에서 O(1)로 응답합니다.
+    결과는 서버를 통한 쓰기가 발생하거나 TTL이 지날 때까지 재사용합니다.
+    """
+
+    def __init__(self, connector, ttl=NEO4J_STATS_TTL):
+        self._connector = connector
+        self._ttl = ttl
+        self._stats = None
+        self._computed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._stats = None
+
+    async def get(self, refresh=False):
+        async with self._lock:
+            if refresh or self._stats is None or time.monotonic() - self._computed_at > self._ttl:
+                self._stats = await self._connector._execute(self._compute)
+                self._computed_at = time.monotonic()
+            return self._stats
+
+    async def _compute(self, session):
+        labels_result = await session.run("CALL db.labels()")
+        labels = [record["label"] async for record in labels_result]
+        rel_types_result = await session.run("CALL db.relationshipTypes()")
+        rel_types = [record["relationshipType"] async for record in rel_types_result]
+
+        # 모든 카운트를 UNION ALL 쿼리 하나로 요청 (각 분기는 카운트 스토어 조회로 계획됨)
+        branches = [
+            "MATCH (n) RETURN 'total' AS kind, '' AS name, count(n) AS count",
+            "MATCH ()-[r]->() RETURN 'total_rel' AS kind, '' AS name, count(r) AS count",
+        ]
+        params = {}
+        for i, label in enumerate(labels):
+            params[f"l{i}"] = label
+            branches.append(
+                f"MATCH (n:{_quote_name(label)}) RETURN 'label' AS kind, $l{i} AS name, count(n) AS count"
+            )
+        for i, rel_type in enumerate(rel_types):
+            params[f"r{i}"] = rel_type
+            branches.append(
+                f"MATCH ()-[r:{_quote_name(rel_type)}]->() "
+                f"RETURN 'rel' AS kind, $r{i} AS name, count(r) AS count"
+            )
+        result = await session.run(" UNION ALL ".join(branches), params)
+
+        stats = {"total_nodes": 0, "total_relationships": 0, "labels": {}, "relationship_types": {}}
+        async for record in result:
+            kind, name, count = record["kind"], record["name"], record["count"]
+            if kind == "total":
+                stats["total_nodes"] = count
+            elif kind == "total_rel":
+                stats["total_relationships"] = count
+            elif kind == "label":
+                stats["labels"][name] = count
+            else:
+                stats["relationship_types"][name] = count
+        return stats
 
 # Neo4j 연결 클래스
 class Neo4jConnector:
-    def __init__(self, uri, username, password, max_retry=3):
+    """AsyncGraphDatabase 기반의 비동기 실행 엔진.
+
+    드라이버 하나가 커넥션 풀을 관리하며, 모든 도구 호출이 이 풀을 공유합니다.
+    쿼리마다 `RETURN 1` 확인 쿼리를 보내지 않고, 실제 쿼리의 성공/실패를 연결 상태
+    모니터(`health`)에 보고합니다. 모니터는 트래픽이 없을 때만 백그라운드에서 연결을
+    확인하며, 연결 오류가 이어지면 회로 차단기를 열어 데이터베이스가 복구될 때까지
+    요청을 즉시 거부합니다.
+    """
+
+    def __init__(self, uri, username, password, max_retry=3,
+                 max_pool_size=NEO4J_MAX_POOL_SIZE,
+                 acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+                 database=NEO4J_DATABASE,
+                 cache=None):
         self._uri = uri
         self._username = username
         self._password = password
         self._max_retry = max_retry
+        self._max_pool_size = max_pool_size
+        self._acquisition_timeout = acquisition_timeout
+        self._database = database
         self._driver = None
-        self._connect()
-        
-    def _connect(self):
-        """데이터베이스에 연결합니다."""
-        retry_count = 0
-        while retry_count < self._max_retry:
+        self.cache = cache if cache is not None else QueryResultCache()
+        self._cursors = {}
+        self.schema_catalog = SchemaCatalog(self)
+        self.statistics = CountStoreStatistics(self)
+        self.plan_cache = QueryPlanCache()
+        self._background_tasks = set()
+        self.health = Neo4jHealthMonitor(
+            self._probe,
+            interval=NEO4J_HEALTH_INTERVAL,
+            failure_threshold=NEO4J_CIRCUIT_FAILURE_THRESHOLD,
+            backoff_base=NEO4J_BACKOFF_BASE,
+            backoff_max=NEO4J_BACKOFF_MAX,
+        )
+
+    def _get_driver(self):
+        """드라이버를 반환합니다. 드라이버 생성은 네트워크 연결을 만들지 않습니다."""
+        if self._driver is None:
+            self._driver = AsyncGraphDatabase.driver(
+                self._uri,
+                auth=(self._username, self._password),
+                max_connection_lifetime=300,  # 연결 수명 설정 (5분)
+                max_connection_pool_size=self._max_pool_size,
+                connection_acquisition_timeout=self._acquisition_timeout,
+            )
+        return self._driver
+
+    def _session(self, **kwargs):
+        return self._get_driver().session(database=self._database, **kwargs)
+
+    async def _discard_driver(self):
+        driver, self._driver = self._driver, None
+        if driver is not None:
             try:
-                if self._driver:
+                await driver.close()
+            except Exception:
+                pass
+
+    async def close(self):
+        """연결을 종료합니다."""
+        for token in list(self._cursors):
+            await self.close_cursor(token)
+        await self._discard_driver()
+
+    async def _probe(self):
+        """연결 상태 모니터가 사용하는 연결 확인 (쿼리를 실행하지 않음)"""
+        await self._get_driver().verify_connectivity()
+
+    async def _call(self, attempt):
+        """`attempt()`를 실행하고 결과를 연결 상태 모니터에 보고합니다.
+
+        연결 오류가 발생하면 지수 백오프(지터 포함)로 최대 `max_retry`번까지 시도하며,
+        회로 차단기가 열려 있으면 데이터베이스에 접근하지 않고 CircuitOpenError를 발생시킵니다.
+        """
+        return await self.health.call(attempt, max_retry=self._max_retry)
+
+    async def _execute(self, work):
+        """풀에서 세션을 빌려 `work(session)`을 실행합니다."""
+        async def attempt():
+            async with self._session() as session:
+                return await work(session)
+
+        return await self._call(attempt)
+
+    async def explain(self, query, params=None):
+        """EXPLAIN으로 쿼리를 데이터에 접근하지 않고 검증합니다. 결과는 쿼리 형태별로 캐시됩니다.
+        (라벨/관계 유형이 없어서 거부된 결과는 매번 다시 검증)
+
+        Returns:
+            {"valid", "error", "unknown_tokens", "estimated_rows", "max_estimated_rows", "cached"}
+        """
+        shape = query_shape(query)
+        verdict = self.plan_cache.get(shape)
+        if verdict is not None:
+            return {**verdict, "cached": True}
+
+        async def work(session):
+            result = await session.run(f"EXPLAIN {query}", params or {})
+            return await result.consume()
+
+        try:
+            summary = await self._execute(work)
+        except ClientError as e:
+            # 문법 오류, 타입 오류 등: 데이터에 접근하기 전에 거부
+            verdict = {"valid": False, "error": e.message or str(e), "unknown_tokens": False,
+                       "estimated_rows": None, "max_estimated_rows": None}
+            self.plan_cache.put(shape, verdict)
+            return {**verdict, "cached": False}
+
+        estimated_rows, max_estimated_rows = _plan_estimates(summary.plan)
+        unknown = [
+            n.get("description") or n.get("title") for n in summary.notifications or []
+            if n.get("code") in UNKNOWN_TOKEN_NOTIFICATIONS
+        ]
+        verdict = {"valid": True, "error": None, "unknown_tokens": False,
+                   "estimated_rows": estimated_rows, "max_estimated_rows": max_estimated_rows}
+        # 쓰기 쿼리는 새 라벨을 만들 수 있으므로 라벨 경고로 거부하지 않음
+        if unknown and not is_write_query(query):
+            verdict.update(valid=False, unknown_tokens=True, error="; ".join(unknown))
+        else:
+            self.plan_cache.put(shape, verdict)
+        return {**verdict, "cached": False}
+
+    async def preflight(self, query, params=None):
+        """실행 전 검증. 거부해야 하면 오류 메시지를, 통과하면 None을 반환합니다."""
+        if not NEO4J_EXPLAIN_PREFLIGHT or NO_PREFLIGHT_PATTERN.match(query):
+            return None
+        verdict = await self.explain(query, params)
+        if not verdict["valid"]:
+            return f"쿼리 검증 실패 (실행되지 않음): {verdict['error']}"
+        if NEO4J_MAX_ESTIMATED_ROWS and verdict["max_estimated_rows"] > NEO4J_MAX_ESTIMATED_ROWS:
+            return (
+                f"예상 처리 행 수가 너무 많아 실행을 거부했습니다 "
+                f"(추정 {verdict['max_estimated_rows']:.0f}행, 최대 {NEO4J_MAX_ESTIMATED_ROWS:.0f}행). "
+                "LIMIT 또는 더 구체적인 조건을 추가하세요."
+            )
+        return None
+
+    @staticmethod
+    def _budgeted_query(query, budget, query_id):
+        """트랜잭션 타임아웃과 취소용 식별자를 메타데이터로 붙인 쿼리를 만듭니다."""
+        return Query(query, timeout=budget.timeout, metadata={QUERY_ID_METADATA_KEY: query_id})
+
+    async def _collect(self, result, budget):
+        """예산 안에서 레코드를 읽습니다. 초과하면 나머지를 읽지 않고 중단합니다."""
+        records = []
+        size = 0
+        async for record in result:
+            if budget.max_rows is not None and len(records) >= budget.max_rows:
+                return TruncatedRecords(records, f"최대 행 수({budget.max_rows})를 초과하여 결과가 잘렸습니다.")
+            # 노드/관계/시간/공간 타입을 타입 정보를 유지한 JSON 값으로 한 번에 변환
+            record_dict = record_to_dict(record)
+            if budget.max_bytes is not None:
+                size += len(dumps(record_dict))
+                if size > budget.max_bytes:
+                    return TruncatedRecords(records, f"최대 결과 크기({budget.max_bytes} bytes)를 초과하여 결과가 잘렸습니다.")
+            records.append(record_dict)
+        return records
+
+    def _cancel_in_background(self, query_id, session=None):
+        """취소된 요청의 트랜잭션을 서버에서 종료시킵니다. (요청 태스크와 독립적으로 실행)
+
+        `session`이 주어지면 트랜잭션을 종료한 뒤 세션도 닫아 커넥션을 풀에 돌려줍니다.
+        """
+        async def cancel():
+            try:
+                await self.terminate_query(query_id)
+            finally:
+                if session is not None:
                     try:
-                        self._driver.close()
+                        await session.close()
                     except Exception:
                         pass
-                    
-                self._driver = GraphDatabase.driver(
-                    self._uri, 
-                    auth=(self._username, self._password),
-                    max_connection_lifetime=300  # 연결 수명 설정 (5분)
-                )
-                # 연결 확인
-                with self._driver.session() as session:
-                    result = session.run("RETURN 1 as test")
-                    # 결과를 완전히 소비 (중요)
-                    result.consume()
-                print(f"Neo4j 데이터베이스에 성공적으로 연결됨: {self._uri}")
-                return
-            except Exception as e:
-                retry_count += 1
-                print(f"Neo4j 연결 시도 {retry_count}/{self._max_retry} 실패: {str(e)}")
-                if retry_count < self._max_retry:
-                    time.sleep(1)  # 재시도 전 1초 대기
-        
-        print(f"Neo4j 데이터베이스 연결 실패: {self._uri}")
-        
-    def close(self):
-        """연결을 종료합니다."""
-        if self._driver:
-            self._driver.close()
-            self._driver = None
-    
-    def ensure_connection(self):
-        """연결이 활성 상태인지 확인하고, 필요하면 재연결합니다."""
+
+        task = asyncio.get_running_loop().create_task(cancel())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def terminate_query(self, query_id):
+        """메타데이터의 쿼리 식별자로 실행 중인 트랜잭션을 찾아 종료합니다."""
         try:
-            if not self._driver:
-                self._connect()
-                return
-                
-            # 간단한 쿼리로 연결 확인
-            with self._driver.session() as session:
-                result = session.run("RETURN 1 as test")
-                # 결과를 완전히 소비 (중요)
-                result.consume()
+            ids = await self._execute(lambda session: terminate_transactions(session, query_id))
+            if ids:
+                print(f"취소된 요청의 트랜잭션 종료: {ids}")
         except Exception as e:
-            print(f"연결 재설정 중: {str(e)}")
-            self._connect()
-        
-    def run_cypher(self, query, params=None):
-        """Cypher 쿼리를 실행합니다."""
-        self.ensure_connection()
-        
+            print(f"트랜잭션 종료 실패: {str(e)}")
+
+    async def run_cypher(self, query, params=None, budget=None):
+        """Cypher 쿼리를 실행합니다.
+
+        리터럴은 파라미터로 바꾼 뒤 실행하며, 읽기 쿼리는 결과 캐시를 먼저 확인하고
+        쓰기 쿼리는 실행 후 캐시를 무효화합니다. 실행은 `budget`(기본: run_cypher 예산)의
+        타임아웃/행 수/바이트 제한을 따르며, 요청이 취소되면 서버의 트랜잭션도 종료합니다.
+        """
+        if NEO4J_PARAMETERIZE_LITERALS:
+            query, params = parameterize_literals(query, params)
+        budget = budget or TOOL_BUDGETS["run_cypher"]
+        query_id = secrets.token_hex(8)
+
+        async def work(session):
+            result = await session.run(self._budgeted_query(query, budget, query_id), params or {})
+            # 세션이 반납되기 전에 결과를 소비 (예산 초과 시 나머지는 세션 종료와 함께 폐기)
+            return await self._collect(result, budget)
+
+        write = is_write_query(query)
+        cacheable = (
+            not write
+            and self.cache.enabled
+            and NON_DETERMINISTIC_PATTERN.search(query) is None
+        )
+        if cacheable:
+            key = self.cache.make_key(query, params, budget)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+
         try:
-            with self._driver.session() as session:
-                result = session.run(query, params or {})
-                
-                # 중요: 세션이 닫히기 전에 모든 결과를 리스트로 변환
-                # 이렇게 하면 세션이 닫혀도 결과를 계속 사용할 수 있음
-                records = []
-                for record in result:
-                    # Neo4j 결과를 Python 딕셔너리로 변환
-                    record_dict = {}
-                    for key, value in record.items():
-                        # Neo4j 객체를 기본 Python 타입으로 변환
-                        if hasattr(value, '__str__') and not isinstance(value, (str, int, float, bool, list, dict)):
-                            record_dict[key] = str(value)
-                        else:
-                            record_dict[key] = value
-                    records.append(record_dict)
-                
-                # 결과 리스트 반환
-                return records
-        except ServiceUnavailable as e:
-            print(f"Neo4j 서비스 사용 불가: {str(e)}")
-            self._connect()  # 재연결 시도
+            rejection = await self.preflight(query, params)
+            if rejection is not None:
+                write = False  # 실행되지 않았으므로 캐시를 무효화할 필요 없음
+                return {"error": rejection}
+            records = await self._execute(work)
+            if cacheable:
+                self.cache.put(key, records, generation)
+            return records
+        except asyncio.CancelledError:
+            # MCP 요청이 취소됨: 데이터베이스에서 계속 실행되지 않도록 트랜잭션 종료
+            self._cancel_in_background(query_id)
+            raise
+        except CircuitOpenError as e:
+            return {"error": circuit_open_message(e)}
+        except (ServiceUnavailable, SessionExpired) as e:
             return {"error": f"데이터베이스 서비스 사용 불가: {str(e)}"}
         except DriverError as e:
             print(f"Neo4j 드라이버 오류: {str(e)}")
-            self._connect()  # 재연결 시도
             return {"error": f"데이터베이스 드라이버 오류: {str(e)}"}
         except Exception as e:
             print(f"쿼리 실행 중 오류: {str(e)}")
             return {"error": f"쿼리 실행 중 오류: {str(e)}"}
-    
-    def get_schema(self):
-        """데이터베이스 스키마 정보를 가져옵니다."""
-        self.ensure_connection()
-        
+        finally:
+            # 실패한 쓰기도 일부 반영되었을 수 있으므로 항상 무효화
+            if write:
+                self._notify_write(query)
+
+    async def run_cypher_batch(self, queries, consistent=False, budget=None):
+        """여러 쿼리를 한 번에 실행하고 입력 순서대로 결과를 반환합니다.
+
+        기본 모드에서는 각 쿼리를 풀의 세션에서 동시에 실행합니다 (캐시/사전 검증은
+        run_cypher와 동일). 쓰기 쿼리가 섞여 있으면 순서를 지키기 위해 차례로 실행합니다.
+        `consistent=True`이면 모든 쿼리를 하나의 읽기 트랜잭션에서 실행하여
+        같은 시점의 데이터를 보게 합니다 (쓰기 쿼리는 허용하지 않음).
+
+        Args:
+            queries: (query, params) 튜플 목록
+
+        Returns:
+            쿼리별 레코드 목록 또는 {"error": ...} 딕셔너리의 목록
+        """
+        budget = budget or TOOL_BUDGETS["run_cypher_batch"]
+        if consistent:
+            return await self._run_consistent_batch(queries, budget)
+
+        if any(is_write_query(query) for query, _ in queries):
+            return [await self.run_cypher(query, params, budget) for query, params in queries]
+
+        semaphore = asyncio.Semaphore(max(1, NEO4J_BATCH_CONCURRENCY))
+
+        async def run_one(query, params):
+            async with semaphore:
+                return await self.run_cypher(query, params, budget)
+
+        return list(await asyncio.gather(*(run_one(query, params) for query, params in queries)))
+
+    async def _run_consistent_batch(self, queries, budget):
+        """하나의 읽기 트랜잭션에서 쿼리들을 순서대로 실행합니다."""
+        if any(is_write_query(query) for query, _ in queries):
+            return [{"error": "consistent 모드에서는 쓰기 쿼리를 실행할 수 없습니다."}] * len(queries)
+        if NEO4J_PARAMETERIZE_LITERALS:
+            queries = [parameterize_literals(query, params) for query, params in queries]
+
+        # 사전 검증은 실행 전에 동시에 수행 (검증 결과는 쿼리 형태별로 캐시됨)
+        rejections = await asyncio.gather(*(self.preflight(query, params) for query, params in queries))
+        if any(rejections):
+            return [
+                {"error": rejection} if rejection else {"error": "배치의 다른 쿼리가 검증에 실패하여 실행되지 않았습니다."}
+                for rejection in rejections
+            ]
+
+        query_id = secrets.token_hex(8)
+
+        @unit_of_work(timeout=budget.timeout, metadata={QUERY_ID_METADATA_KEY: query_id})
+        async def read_all(tx):
+            results = []
+            for query, params in queries:
+                result = await tx.run(query, params or {})
+                # 예산 초과로 남은 레코드는 다음 쿼리를 실행할 때 드라이버가 폐기
+                results.append(await self._collect(result, budget))
+            return results
+
+        async def work(session):
+            return await session.execute_read(read_all)
+
         try:
-            node_labels_query = "CALL db.labels()"
-            rel_types_query = "CALL db.relationshipTypes()"
-            properties_query = "CALL db.propertyKeys()"
-            
-            with self._driver.session() as session:
-                # 각 쿼리 실행 시 결과를 즉시 리스트로 변환
-                node_labels_result = session.run(node_labels_query)
-                node_labels = [record["label"] for record in node_labels_result]
-                
-                rel_types_result = session.run(rel_types_query)
-                rel_types = [record["relationshipType"] for record in rel_types_result]
-                
-                properties_result = session.run(properties_query)
-                properties = [record["propertyKey"] for record in properties_result]
-                
-                # 노드별 속성 가져오기
-                node_schema = {}
-                for label in node_labels:
-                    properties_query = f"""
-                    MATCH (n:{label}) 
-                    UNWIND keys(n) AS prop 
-                    RETURN DISTINCT prop
-                    LIMIT 20
-                    """
-                    node_props_result = session.run(properties_query)
-                    node_props = [record["prop"] for record in node_props_result]
-                    node_schema[label] = node_props
-                    
-                return {
-                    "node_labels": node_labels,
-                    "relationship_types": rel_types,
-                    "properties": properties,
-                    "node_schema": node_schema
-                }
+            return await self._execute(work)
+        except asyncio.CancelledError:
+            self._cancel_in_background(query_id)
+            raise
+        except CircuitOpenError as e:
+            return [{"error": circuit_open_message(e)}] * len(queries)
+        except (ServiceUnavailable, SessionExpired) as e:
+            return [{"error": f"데이터베이스 서비스 사용 불가: {str(e)}"}] * len(queries)
+        except Exception as e:
+            print(f"배치 쿼리 실행 중 오류: {str(e)}")
+            return [{"error": f"배치 쿼리 실행 중 오류: {str(e)}"}] * len(queries)
+
+    async def _expire_cursors(self):
+        """유휴 시간이 지난 커서를 닫아 풀 연결을 반납합니다."""
+        deadline = time.monotonic() - NEO4J_CURSOR_IDLE_TIMEOUT
+        for token, cursor in list(self._cursors.items()):
+            if cursor.last_used < deadline and not cursor.lock.locked():
+                await self.close_cursor(token)
+
+    async def open_cursor(self, query, params=None, page_size=NEO4J_PAGE_SIZE,
+                          max_bytes=NEO4J_PAGE_MAX_BYTES):
+        """쿼리를 실행하고 첫 페이지와 함께 커서를 엽니다.
+
+        Returns:
+            (페이지 JSON 문자열, 커서 토큰 또는 None) 또는 오류 딕셔너리
+        """
+        await self._expire_cursors()
+        if len(self._cursors) >= NEO4J_MAX_OPEN_CURSORS:
+            return {"error": f"열린 커서가 너무 많습니다 (최대 {NEO4J_MAX_OPEN_CURSORS}개). 사용하지 않는 커서를 닫아주세요."}
+
+        page_size = max(1, min(int(page_size), 10000))
+        if NEO4J_PARAMETERIZE_LITERALS:
+            query, params = parameterize_literals(query, params)
+        budget = TOOL_BUDGETS["run_cypher_stream"]
+        query_id = secrets.token_hex(8)
+        write = is_write_query(query)
+        session = None
+        try:
+            rejection = await self.preflight(query, params)
+            if rejection is not None:
+                return {"error": rejection}
+
+            async def start():
+                nonlocal session
+                session = self._session(fetch_size=page_size)
+                try:
+                    return await session.run(self._budgeted_query(query, budget, query_id), params or {})
+                except (ServiceUnavailable, SessionExpired):
+                    await session.close()
+                    session = None
+                    raise
+
+            result = await self._call(start)
+
+            cursor = ResultCursor(session, result, page_size, max_bytes,
+                                  write_query=query if write else None)
+            async with cursor.lock:
+                page, has_more = await cursor.next_page()
+            if not has_more:
+                await self._finish_cursor(cursor)
+                return page, None
+            self._cursors[cursor.token] = cursor
+            return page, cursor.token
+        except asyncio.CancelledError:
+            if session is not None:
+                self._cancel_in_background(query_id, session)
+            raise
+        except Exception as e:
+            if session is not None:
+                await session.close()
+            if write and session is not None:
+                self._notify_write(query)
+            print(f"쿼리 실행 중 오류: {str(e)}")
+            return {"error": f"쿼리 실행 중 오류: {str(e)}"}
+
+    async def fetch_page(self, token):
+        """커서의 다음 페이지를 가져옵니다."""
+        await self._expire_cursors()
+        cursor = self._cursors.get(token)
+        if cursor is None:
+            return {"error": "존재하지 않거나 만료된 커서입니다."}
+        try:
+            async with cursor.lock:
+                page, has_more = await cursor.next_page()
+        except Exception as e:
+            await self.close_cursor(token)
+            return {"error": f"결과 스트리밍 중 오류: {str(e)}"}
+        if not has_more:
+            await self.close_cursor(token)
+        return page
+
+    async def close_cursor(self, token):
+        """커서를 닫고 세션을 풀에 반납합니다. 커서가 있었으면 True를 반환합니다."""
+        cursor = self._cursors.pop(token, None)
+        if cursor is None:
+            return False
+        await self._finish_cursor(cursor)
+        return True
+
+    async def _finish_cursor(self, cursor):
+        await cursor.close()
+        if cursor.write_query is not None:
+            self._notify_write(cursor.write_query)
+
+    def _notify_write(self, query):
+        """쓰기 쿼리 실행 후 결과 캐시와 통계를 무효화하고 스키마 카탈로그에 변경된 라벨을 알립니다."""
+        self.cache.invalidate()
+        self.schema_catalog.mark_dirty(query)
+        self.statistics.invalidate()
+
+    async def get_schema(self, refresh=False):
+        """데이터베이스 스키마 정보를 가져옵니다. (스키마 카탈로그 사용)"""
+        try:
+            return await self.schema_catalog.get(refresh=refresh)
         except Exception as e:
             print(f"스키마 정보 조회 중 오류: {str(e)}")
             return {"error": f"스키마 정보 조회 중 오류: {str(e)}"}
 
+    async def get_statistics(self, refresh=False):
+        """카운트 스토어 기반 노드/관계 통계를 가져옵니다."""
+        try:
+            return await self.statistics.get(refresh=refresh)
+        except Exception as e:
+            print(f"통계 조회 중 오류: {str(e)}")
+            return {"error": f"통계 조회 중 오류: {str(e)}"}
+
 # Neo4j 커넥터 초기화
 connector = Neo4jConnector(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
 
 @mcp.tool()
-def run_cypher(query: str) -> str:
+async def run_cypher(query: str) -> str:
     """Neo4j 쿼리 실행 도구"""
-    session = None
-    try:
-        # 1. 연결 확인
-        connector.ensure_connection()
-        
-        # 2. 새 세션 열기
-        session = connector._driver.session()
-        
-        # 3. 쿼리 실행
-        result = session.run(query)
-        
-        # 4. 결과 완전히 메모리로 변환
-        records = [{k: v for k, v in record.items()} for record in result]
-        
-        # 5. 결과 소비 확인
-        result.consume()
-        
-        # 6. 변환된 결과 반환
-        return json.dumps(records, default=str, ensure_ascii=False)
-    finally:
-        # 7. 항상 세션 닫기
-        if session:
-            session.close()
+    records = await connector.run_cypher(query, budget=TOOL_BUDGETS["run_cypher"])
+
+    if isinstance(records, dict) and 'error' in records:
+        return f"쿼리 실행 중 오류 발생: {records['error']}"
+
+    return records_to_json(records)
 
 @mcp.tool()
-def run_cypher_with_params(query: str, params: str) -> str:
+async def run_cypher_with_params(query: str, params: str) -> str:
     """파라미터를 사용하여 Neo4j 데이터베이스에 Cypher 쿼리를 실행합니다.
     
     Args:
@@ -215,30 +1266,163 @@ def run_cypher_with_params(query: str, params: str) -> str:
     파라미터: {"plant_id": 1918, "start_date": "2023-01-01", "end_date": "2023-04-30"}
     """
     try:
-        connector.ensure_connection()  # 연결 상태 확인
         # 문자열 파라미터를 딕셔너리로 변환
         param_dict = json.loads(params)
-        results = connector.run_cypher(query, param_dict)
+        results = await connector.run_cypher(query, param_dict, budget=TOOL_BUDGETS["run_cypher_with_params"])
         
         if isinstance(results, dict) and 'error' in results:
             return f"쿼리 실행 중 오류 발생: {results['error']}"
             
-        return json.dumps(results, default=str, ensure_ascii=False, indent=2)
+        return records_to_json(results, indent=2)
     except json.JSONDecodeError:
         return "파라미터 JSON 형식이 올바르지 않습니다."
     except Exception as e:
         return f"쿼리 실행 중 오류 발생: {str(e)}"
 
 @mcp.tool()
-def get_schema() -> str:
+async def run_cypher_batch(queries: str, consistent: bool = False) -> str:
+    """서로 독립적인 여러 Cypher 쿼리를 한 번의 호출로 실행합니다.
+    
+    여러 개의 작은 조회가 필요할 때 run_cypher를 여러 번 호출하는 대신 사용하세요.
+    쿼리들은 동시에 실행되며 결과는 입력 순서대로 반환됩니다.
+    
+    Args:
+        queries (str): JSON 배열. 각 항목은 쿼리 문자열 또는 {"query": ..., "params": {...}} 객체
+        consistent (bool): True이면 모든 쿼리를 하나의 읽기 트랜잭션에서 실행하여
+            같은 시점의 데이터를 조회 (읽기 쿼리만 가능)
+        
+    Returns:
+        str: [{"index", "records"} 또는 {"index", "error"}, ...] 형식의 JSON.
+            잘린 결과에는 "truncated", "reason"이 함께 포함됩니다.
+    
+    예제 사용:
+    [
+        "MATCH (p:Plant) RETURN count(p) AS plants",
+        {"query": "MATCH (p:Plant {plant:$id}) RETURN p", "params": {"id": 1918}}
+    ]
+    """
+    try:
+        items = json.loads(queries)
+    except json.JSONDecodeError:
+        return "쿼리 목록 JSON 형식이 올바르지 않습니다."
+    if not isinstance(items, list) or not items:
+        return "쿼리 목록은 비어 있지 않은 JSON 배열이어야 합니다."
+    if len(items) > NEO4J_BATCH_MAX_QUERIES:
+        return f"한 번에 실행할 수 있는 쿼리는 최대 {NEO4J_BATCH_MAX_QUERIES}개입니다."
+
+    batch = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            batch.append((item, {}))
+        elif isinstance(item, dict) and isinstance(item.get("query"), str) and isinstance(item.get("params", {}), dict):
+            batch.append((item["query"], item.get("params") or {}))
+        else:
+            return f"{index}번째 항목이 올바르지 않습니다. 쿼리 문자열 또는 {{\"query\", \"params\"}} 객체여야 합니다."
+
+    results = await connector.run_cypher_batch(batch, consistent=consistent, budget=TOOL_BUDGETS["run_cypher_batch"])
+
+    response = []
+    for index, records in enumerate(results):
+        if isinstance(records, dict) and 'error' in records:
+            response.append({"index": index, "error": records['error']})
+        elif isinstance(records, TruncatedRecords):
+            response.append({"index": index, "records": list(records), "truncated": True, "reason": records.reason})
+        else:
+            response.append({"index": index, "records": records})
+    return dumps(response)
+
+@mcp.tool()
+async def explain_cypher(query: str, params: str = "{}") -> str:
+    """쿼리를 실행하지 않고 EXPLAIN으로 검증합니다.
+    
+    문법 오류, 존재하지 않는 라벨/관계 유형을 데이터에 접근하지 않고 확인하고
+    플래너의 추정 행 수를 알려줍니다. 큰 결과가 예상되는 쿼리를 실행하기 전에 사용하세요.
+    
+    Args:
+        query (str): 검증할 Cypher 쿼리
+        params (str): JSON 형식의 파라미터 딕셔너리 (선택)
+        
+    Returns:
+        str: {"valid", "error", "estimated_rows", "max_estimated_rows", "cached"} 형식의 JSON
+    """
+    try:
+        param_dict = json.loads(params) if params else {}
+    except json.JSONDecodeError:
+        return "파라미터 JSON 형식이 올바르지 않습니다."
+    try:
+        verdict = await connector.explain(query, param_dict)
+    except Exception as e:
+        return f"쿼리 검증 중 오류 발생: {str(e)}"
+    verdict.pop("unknown_tokens", None)
+    return json.dumps(verdict, ensure_ascii=False, indent=2)
+
+@mcp.tool()
+async def run_cypher_stream(query: str, params: str = "{}", page_size: int = NEO4J_PAGE_SIZE) -> str:
+    """큰 결과를 페이지 단위로 나누어 반환하는 Cypher 쿼리 실행 도구입니다.
+    
+    결과 전체를 메모리에 올리지 않고 레코드를 순차적으로 읽어 한 페이지씩 반환합니다.
+    응답의 "cursor" 값이 null이 아니면 fetch_cypher_page(cursor)로 다음 페이지를 가져오세요.
+    더 이상 필요하지 않은 커서는 close_cypher_cursor(cursor)로 닫아주세요.
+    
+    Args:
+        query (str): Cypher 쿼리 문자열
+        params (str): JSON 형식의 파라미터 딕셔너리 (선택)
+        page_size (int): 페이지당 최대 행 수
+        
+    Returns:
+        str: {"cursor", "page", "rows", "rows_sent", "has_more", "records"} 형식의 JSON
+    """
+    try:
+        param_dict = json.loads(params) if params else {}
+    except json.JSONDecodeError:
+        return "파라미터 JSON 형식이 올바르지 않습니다."
+
+    opened = await connector.open_cursor(query, param_dict, page_size=page_size)
+    if isinstance(opened, dict) and 'error' in opened:
+        return f"쿼리 실행 중 오류 발생: {opened['error']}"
+    page, _ = opened
+    return page
+
+@mcp.tool()
+async def fetch_cypher_page(cursor: str) -> str:
+    """run_cypher_stream이 반환한 커서의 다음 페이지를 가져옵니다.
+    
+    Args:
+        cursor (str): 이전 페이지 응답의 "cursor" 값
+        
+    Returns:
+        str: 다음 페이지 JSON. 마지막 페이지이면 "cursor"가 null이고 커서는 자동으로 닫힙니다.
+    """
+    page = await connector.fetch_page(cursor)
+    if isinstance(page, dict) and 'error' in page:
+        return f"페이지 조회 중 오류 발생: {page['error']}"
+    return page
+
+@mcp.tool()
+async def close_cypher_cursor(cursor: str) -> str:
+    """더 이상 필요하지 않은 결과 커서를 닫고 연결을 반납합니다.
+    
+    Args:
+        cursor (str): 닫을 커서 값
+    """
+    if await connector.close_cursor(cursor):
+        return "커서가 닫혔습니다."
+    return "존재하지 않거나 이미 닫힌 커서입니다."
+
+@mcp.tool()
+async def get_schema(refresh: bool = False) -> str:
     """Neo4j 데이터베이스의 스키마 정보를 반환합니다.
     
+    스키마는 한 번 계산된 뒤 캐시되며, 쓰기로 변경된 라벨만 다시 계산됩니다.
+    
+    Args:
+        refresh (bool): True이면 캐시를 무시하고 전체 스키마를 다시 계산
+    
     Returns:
         str: 노드 라벨, 관계 유형, 속성 등의 스키마 정보를 JSON 형식으로 반환
     """
     try:
-        connector.ensure_connection()  # 연결 상태 확인
-        schema = connector.get_schema()
+        schema = await connector.get_schema(refresh=refresh)
         
         if isinstance(schema, dict) and 'error' in schema:
             return f"스키마 정보 조회 중 오류 발생: {schema['error']}"
@@ -248,51 +1432,82 @@ def get_schema() -> str:
         return f"스키마 정보 조회 중 오류 발생: {str(e)}"
 
 @mcp.tool()
-def get_node_counts() -> str:
-    """Neo4j 데이터베이스의 노드 유형별 개수를 반환합니다.
+async def get_node_counts() -> str:
+    """Neo4j 데이터베이스의 노드 라벨별 개수를 반환합니다.
+    
+    카운트 스토어에서 바로 읽으므로 노드를 스캔하지 않습니다.
+    여러 라벨을 가진 노드는 각 라벨에 모두 포함됩니다.
     
     Returns:
         str: 각 노드 라벨별 개수를 JSON 형식으로 반환
     """
-    try:
-        connector.ensure_connection()  # 연결 상태 확인
-        query = "MATCH (n) RETURN labels(n) AS labels, count(n) AS count"
-        results = connector.run_cypher(query)
-        
-        if isinstance(results, dict) and 'error' in results:
-            return f"노드 개수 조회 중 오류 발생: {results['error']}"
-        
-        # 결과 가공
-        counts = {}
-        for result in results:
-            label = ', '.join(result["labels"]) if result["labels"] else "unlabeled"
-            counts[label] = result["count"]
-        return json.dumps(counts, ensure_ascii=False, indent=2)
-    except Exception as e:
-        return f"노드 개수 조회 중 오류 발생: {str(e)}"
+    stats = await connector.get_statistics()
+
+    if isinstance(stats, dict) and 'error' in stats:
+        return f"노드 개수 조회 중 오류 발생: {stats['error']}"
+
+    return json.dumps(stats["labels"], ensure_ascii=False, indent=2)
 
 @mcp.tool()
-def check_connection() -> str:
-    """Neo4j 데이터베이스 연결을 확인합니다.
+async def get_graph_statistics(refresh: bool = False) -> str:
+    """노드/관계 전체 개수와 라벨별, 관계 유형별 개수를 반환합니다.
+    
+    카운트 스토어 기반이라 그래프 크기와 관계없이 빠르며, 결과는 쓰기가 발생할 때까지 캐시됩니다.
+    
+    Args:
+        refresh (bool): True이면 캐시를 무시하고 다시 조회
+    
+    Returns:
+        str: {"total_nodes", "total_relationships", "labels", "relationship_types"} 형식의 JSON
+    """
+    stats = await connector.get_statistics(refresh=refresh)
+
+    if isinstance(stats, dict) and 'error' in stats:
+        return f"통계 조회 중 오류 발생: {stats['error']}"
+
+    return json.dumps(stats, ensure_ascii=False, indent=2)
+
+@mcp.tool()
+async def get_cache_stats() -> str:
+    """읽기 쿼리 결과 캐시의 적중/실패 통계를 반환합니다.
+    
+    Returns:
+        str: 적중 수, 실패 수, 적중률, 항목 수, 사용 메모리 등을 JSON 형식으로 반환
+    """
+    stats = connector.cache.stats()
+    stats["plan_cache"] = connector.plan_cache.stats()
+    return json.dumps(stats, ensure_ascii=False, indent=2)
+
+@mcp.tool()
+async def check_connection() -> str:
+    """Neo4j 데이터베이스 연결을 지금 확인합니다.
     
     Returns:
         str: 연결 상태 정보
     """
-    try:
-        connector.ensure_connection()
+    if await connector.health.check():
         return "Neo4j 데이터베이스에 성공적으로 연결됨"
-    except Exception as e:
-        return f"Neo4j 데이터베이스 연결 오류: {str(e)}"
+    return f"Neo4j 데이터베이스 연결 오류: {connector.health.last_error}"
+
+@mcp.tool()
+async def get_connection_health() -> str:
+    """연결 상태 모니터가 추적 중인 Neo4j 연결 상태를 반환합니다.
+    
+    데이터베이스에 쿼리를 보내지 않으므로 언제든 호출해도 비용이 없습니다.
+    "state"가 "open"이면 데이터베이스가 복구될 때까지 쿼리가 즉시 거부됩니다.
+    
+    Returns:
+        str: {"state", "healthy", "consecutive_failures", "last_error",
+              "seconds_since_success", "retry_in", ...} 형식의 JSON
+    """
+    return json.dumps(connector.health.snapshot(), ensure_ascii=False, indent=2)
 
 if __name__ == "__main__":
     print("Neo4j MCP 서버 시작 중...")
     print(f"Neo4j URI: {NEO4J_URI}")
     print("다른 터미널에서 LangGraph를 사용하여 이 서버에 연결하세요.")
     try:
+        # 드라이버 정리는 lifespan에서 처리
         mcp.run(transport="stdio")
     except KeyboardInterrupt:
         print("서버 종료 중...")
-    finally:
-        connector.close()
-        print("Neo4j 연결 닫힘") 
-
@@ -0,0 +1,124 @@
+"""Local stand-in for the Neo4j API server (`/api/read`, `/api/write` and the batch endpoints).
+
+Answers requests in the same JSON format as the real API server without a
+database, so the HTTP client can be exercised and benchmarked offline:
+
+    with StubNeo4jApiServer(latency=0.005) as server:
+        tools = Neo4jHttpTools(server.url)
+        tools.read_many(["RETURN 1", {"query": "RETURN $x", "params": {"x": 1}}])
+
+Single-query endpoints take `{"query", "params"}` and return
+`{"success", "results" | "error"}`. Batch endpoints (`/api/read_many`,
+`/api/write_many`) take `{"queries": [...]}` and return
+`{"success": true, "results": [<single-query response>, ...]}` in input order.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+
+def echo_handler(kind: str, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Default handler: echo the query back as a single record."""
+    return [{"kind": kind, "query": query, "params": params}]
+
+
+class StubNeo4jApiServer:
+    """Threaded HTTP/1.1 (keep-alive) stand-in server.
+
+    Args:
+        handler: `handler(kind, query, params) -> records`. Exceptions become per-query errors.
+        latency: Seconds slept once per HTTP request, simulating the network and server overhead.
+        batch: Serve the batch endpoints. When False they answer 404, like an older server.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, Dict[str, Any]], List[Dict[str, Any]]] = echo_handler,
+        latency: float = 0.0,
+        batch: bool = True,
+    ):
+        self.handler = handler
+        self.latency = latency
+        self.batch = batch
+        self.requests = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _run_query(self, kind: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.queries += 1
+        try:
+            return {
+                "success": True,
+                "results": self.handler(kind, item["query"], item.get("params") or {}),
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _respond(self, path: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        kind, _, many = path.removeprefix("/api/").partition("_")
+        if kind not in ("read", "write") or many not in ("", "many"):
+            return None
+        if not many:
+            return self._run_query(kind, body)
+        if not self.batch:
+            return None
+        return {
+            "success": True,
+            "results": [self._run_query(kind, item) for item in body["queries"]],
+        }
+
+    def start(self) -> "StubNeo4jApiServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = (
+                True  # like uvicorn; avoids delayed-ACK stalls on reused connections
+            )
+
+            def do_POST(self) -> None:
+                body = json.loads(
+                    self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}"
+                )
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                result = stub._respond(self.path, body)
+                payload = json.dumps(
+                    result if result is not None else {"detail": "Not Found"}
+                ).encode()
+                self.send_response(200 if result is not None else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubNeo4jApiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
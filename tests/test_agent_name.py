@@ -0,0 +1,145 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import START, MessagesState, StateGraph
+from pydantic import Field
+
+from langgraph_supervisor import create_supervisor
+from langgraph_supervisor.agent_name import (
+    InlineAgentNameStripper,
+    add_inline_agent_name,
+    remove_inline_agent_name,
+    with_agent_name,
+)
+
+
+def _strip(pieces: list[str]) -> str:
+    stripper = InlineAgentNameStripper()
+    return "".join(stripper.feed(piece) for piece in pieces) + stripper.flush()
+
+
+def test_stripper_removes_tags_split_across_pieces():
+    pieces = ["<name>sup", "ervisor</name><con", "tent>Hel", "lo</cont", "ent>"]
+
+    assert _strip(pieces) == "Hello"
+
+
+def test_stripper_emits_content_before_the_closing_tag_arrives():
+    stripper = InlineAgentNameStripper()
+
+    assert stripper.feed("<name>a</name><content>") == ""
+    assert stripper.feed("Hi") == "Hi"
+    assert stripper.feed(" there</") == " there"
+    assert stripper.feed("content>") == ""
+    assert stripper.flush() == ""
+
+
+def test_stripper_passes_untagged_text_through():
+    assert _strip(["Hel", "lo <b>world</b>"]) == "Hello <b>world</b>"
+    assert _strip(["<na", "me is Bob"]) == "<name is Bob"
+
+
+def test_stripper_keeps_a_partial_closing_tag_that_is_not_one():
+    assert _strip(["<name>a</name><content>x </c", "ontent is here"]) == "x </content is here"
+
+
+def test_inline_name_round_trip():
+    message = AIMessage(content="Hello", name="assistant")
+
+    tagged = add_inline_agent_name(message)
+
+    assert tagged.content == "<name>assistant</name><content>Hello</content>"
+    assert remove_inline_agent_name(tagged).content == "Hello"
+    assert message.content == "Hello"
+
+
+class _RecordingChatModel(GenericFakeChatModel):
+    received: list = Field(default_factory=list)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.received.append(messages)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def test_inline_mode_reuses_formatted_input_messages():
+    history = [HumanMessage(content="hi", id="h1"), AIMessage(content="yo", name="a", id="a1")]
+    model = _RecordingChatModel(
+        messages=iter(
+            [
+                AIMessage(content="<name>a</name><content>one</content>"),
+                AIMessage(content="<name>a</name><content>two</content>"),
+            ]
+        )
+    )
+    named = with_agent_name(model, "inline")
+
+    assert named.invoke(history).content == "one"
+    assert named.invoke(history).content == "two"
+    first, second = model.received
+    assert first[1].content == "<name>a</name><content>yo</content>"
+    assert first[1] is second[1]
+    assert history[1].content == "yo"
+
+
+def test_inline_streaming_mode_never_streams_tags():
+    model = GenericFakeChatModel(
+        messages=iter([AIMessage(content="<name>a</name><content>Hello there</content>")])
+    )
+
+    chunks = list(with_agent_name(model, "inline_streaming").stream("hi"))
+
+    assert "".join(chunk.content for chunk in chunks) == "Hello there"
+    assert all("<" not in chunk.content for chunk in chunks)
+
+
+class _ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+
+def _inline_streaming_supervisor():
+    def respond(state: MessagesState) -> dict:
+        return {"messages": [AIMessage(content="done", name="alpha")]}
+
+    agent = StateGraph(MessagesState).add_node("respond", respond)
+    agent.add_edge(START, "respond")
+    model = _ToolCallingFakeModel(
+        messages=iter([AIMessage(content="<name>supervisor</name><content>Hello there</content>")])
+    )
+    return create_supervisor(
+        [agent.compile(name="alpha")], model=model, include_agent_name="inline_streaming"
+    ).compile()
+
+
+def test_supervisor_graph_streams_messages_without_tags():
+    app = _inline_streaming_supervisor()
+
+    chunks = [
+        chunk
+        for chunk, _ in app.stream(
+            {"messages": [HumanMessage(content="hi")]}, stream_mode="messages"
+        )
+        if isinstance(chunk, AIMessageChunk)
+    ]
+
+    assert "".join(chunk.content for chunk in chunks) == "Hello there"
+    assert all("<name>" not in c.content and "<content>" not in c.content for c in chunks)
+
+
+def test_supervisor_graph_stream_events_have_no_tags():
+    async def collect():
+        app = _inline_streaming_supervisor()
+        return [
+            event["data"]["chunk"].content
+            async for event in app.astream_events(
+                {"messages": [HumanMessage(content="hi")]}, version="v2"
+            )
+            if event["event"] == "on_chat_model_stream"
+        ]
+
+    pieces = asyncio.run(collect())
+
+    assert "".join(pieces) == "Hello there"
+    assert all("<name>" not in piece and "<content>" not in piece for piece in pieces)
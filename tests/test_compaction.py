@@ -0,0 +1,150 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from langgraph_supervisor.compaction import (
+    HistoryCompactor,
+    OutputBudget,
+    estimate_message_tokens,
+    select_output_messages,
+    truncate_text,
+)
+from langgraph_supervisor.handoff import create_handoff_back_messages
+
+
+def _tool_call(call_id: str, name: str = "read_neo4j") -> dict:
+    return {"name": name, "args": {}, "id": call_id, "type": "tool_call"}
+
+
+def _handoff_history() -> list:
+    back_ai, back_tool = create_handoff_back_messages("linkbrain", "supervisor")
+    return [
+        HumanMessage(content="find links", id="h1"),
+        AIMessage(
+            content="",
+            name="supervisor",
+            id="a1",
+            tool_calls=[_tool_call("t1", "transfer_to_linkbrain")],
+        ),
+        ToolMessage(
+            content="Successfully transferred to linkbrain",
+            tool_call_id="t1",
+            id="m1",
+            response_metadata={"__handoff_destination": "linkbrain"},
+        ),
+        AIMessage(content="here are the links", name="linkbrain", id="a2"),
+        back_ai,
+        back_tool,
+    ]
+
+
+def test_truncate_text_keeps_whole_leading_lines():
+    text = "\n".join(f"row {i}" for i in range(100))
+
+    truncated = truncate_text(text, max_tokens=10)
+
+    assert truncated.startswith("row 0\nrow 1\n")
+    assert "[truncated ~" in truncated
+    assert truncate_text("short", max_tokens=10) == "short"
+
+
+def test_compactor_drops_handoff_messages():
+    compacted, stats = HistoryCompactor().compact(_handoff_history())
+
+    assert [m.id for m in compacted] == ["h1", "a2"]
+    assert stats.handoff_messages_dropped == 4
+    assert stats.tokens_saved > 0
+
+
+def test_compactor_truncates_large_tool_outputs():
+    messages = [
+        HumanMessage(content="q", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[_tool_call("t1")]),
+        ToolMessage(content="x" * 4000, tool_call_id="t1", id="m1"),
+    ]
+
+    compacted, stats = HistoryCompactor(max_tool_output_tokens=50).compact(messages)
+
+    assert stats.tool_outputs_truncated == 1
+    assert estimate_message_tokens(compacted[-1]) < 70
+    assert messages[-1].content == "x" * 4000  # the input history is left untouched
+
+
+def test_window_keeps_first_request_and_tool_call_pairs():
+    messages = [HumanMessage(content="original request", id="h1")]
+    for i in range(5):
+        messages += [
+            AIMessage(content="", id=f"a{i}", tool_calls=[_tool_call(f"t{i}")]),
+            ToolMessage(content="result", tool_call_id=f"t{i}", id=f"m{i}"),
+        ]
+
+    compacted, stats = HistoryCompactor(max_messages=4).compact(messages)
+
+    # m3 fits but its tool call a3 does not, so the window starts at a4
+    assert [m.id for m in compacted] == ["h1", "a4", "m4"]
+    assert stats.messages_outside_window == len(messages) - len(compacted)
+
+
+def test_window_with_first_request_over_budget_keeps_only_the_request():
+    messages = [
+        HumanMessage(content="x" * 400, id="h1"),
+        AIMessage(content="answer", id="a1"),
+    ]
+
+    compacted, _ = HistoryCompactor(max_tokens=10).compact(messages)
+
+    assert [m.id for m in compacted] == ["h1"]
+
+
+def test_window_keeps_tool_caller_when_only_results_fit():
+    messages = [
+        HumanMessage(content="q", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[_tool_call("t1")]),
+        ToolMessage(content="result", tool_call_id="t1", id="m1"),
+    ]
+
+    compacted, _ = HistoryCompactor(max_messages=2).compact(messages)
+
+    assert [m.id for m in compacted] == ["h1", "a1", "m1"]
+
+
+def test_pre_model_hook_records_stats():
+    compactor = HistoryCompactor()
+    seen = []
+    compactor.on_compact = seen.append
+
+    update = compactor({"messages": _handoff_history()})
+
+    assert [m.id for m in update["llm_input_messages"]] == ["h1", "a2"]
+    assert compactor.turns == 1
+    assert seen == [compactor.last_stats]
+    assert compactor.total_tokens_saved == compactor.last_stats.tokens_saved
+
+
+def test_select_output_messages_keeps_recent_tool_results_with_their_callers():
+    messages = [
+        AIMessage(content="", id="a1", tool_calls=[_tool_call("t1"), _tool_call("t2")]),
+        ToolMessage(content="first", tool_call_id="t1", id="m1"),
+        ToolMessage(content="second", tool_call_id="t2", id="m2"),
+        AIMessage(content="", id="a2", tool_calls=[_tool_call("t3")]),
+        ToolMessage(content="third", tool_call_id="t3", id="m3"),
+        AIMessage(content="final answer", id="a3"),
+    ]
+
+    selected = select_output_messages(messages, OutputBudget(max_tool_results=2))
+
+    assert [m.id for m in selected] == ["a1", "m2", "a2", "m3", "a3"]
+    assert [tc["id"] for tc in selected[0].tool_calls] == ["t2"]
+    assert [tc["id"] for tc in messages[0].tool_calls] == ["t1", "t2"]
+
+
+def test_select_output_messages_truncates_an_oversized_final_answer():
+    messages = [
+        AIMessage(content="", id="a1", tool_calls=[_tool_call("t1")]),
+        ToolMessage(content="result", tool_call_id="t1", id="m1"),
+        AIMessage(content="word " * 1000, id="a2"),
+    ]
+
+    selected = select_output_messages(messages, OutputBudget(max_tokens=50))
+
+    assert [m.id for m in selected] == ["a2"]
+    assert "[truncated ~" in selected[0].content
+    assert select_output_messages([], OutputBudget()) == []
@@ -0,0 +1,167 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from langgraph_supervisor import create_supervisor
+from langgraph_supervisor.handoff import (
+    STATE_KEY_HANDOFF_PREFIX_ID,
+    _get_turn_messages,
+    create_handoff_tool,
+    resolve_handoff_state,
+)
+
+
+def _tool_call(call_id: str, name: str = "read_neo4j") -> dict:
+    return {"name": name, "args": {}, "id": call_id, "type": "tool_call"}
+
+
+def test_turn_messages_are_the_callers_trailing_messages():
+    messages = [
+        HumanMessage(content="q", id="h1"),
+        AIMessage(content="", name="supervisor", id="s1", tool_calls=[_tool_call("t0")]),
+        ToolMessage(content="handed off", tool_call_id="t0", id="m0"),
+        AIMessage(content="", name="linkbrain", id="a1", tool_calls=[_tool_call("t1")]),
+        ToolMessage(content="rows", tool_call_id="t1", id="m1"),
+        AIMessage(content="", name="linkbrain", id="a2", tool_calls=[_tool_call("t2")]),
+    ]
+
+    turn = _get_turn_messages(messages)
+
+    # the tool message answering the supervisor is not part of linkbrain's turn
+    assert [m.id for m in turn] == ["a1", "m1", "a2"]
+
+
+def test_turn_messages_of_an_unnamed_caller_are_unknown():
+    messages = [HumanMessage(content="q", id="h1"), AIMessage(content="", id="a1")]
+
+    assert _get_turn_messages(messages) is None
+
+
+def test_state_without_a_history_reference_is_unchanged():
+    state = {"messages": [HumanMessage(content="q", id="h1")]}
+
+    assert resolve_handoff_state(state, {}) is state
+
+
+def test_history_reference_without_a_prefix_is_dropped():
+    branch = [AIMessage(content="", name="supervisor", id="s1")]
+    state = {"messages": branch, "remaining_steps": 5, STATE_KEY_HANDOFF_PREFIX_ID: None}
+
+    resolved = resolve_handoff_state(state, {})
+
+    assert resolved == {"messages": branch, "remaining_steps": 5}
+
+
+class _ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _recording_agent(name: str, seen: dict):
+    def respond(state: MessagesState) -> dict:
+        seen[name] = state
+        return {"messages": [AIMessage(content=f"{name} done", name=name)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    return builder.compile(name=name)
+
+
+def _fan_out_supervisor(seen: dict, **kwargs):
+    model = _ToolCallingFakeModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call("c1", "transfer_to_alpha"),
+                        _tool_call("c2", "transfer_to_beta"),
+                    ],
+                ),
+                AIMessage(content="all done"),
+            ]
+        )
+    )
+    agents = [_recording_agent("alpha", seen), _recording_agent("beta", seen)]
+    return create_supervisor(agents, model=model, fan_out=True, **kwargs).compile()
+
+
+@pytest.mark.parametrize("share_parent_history", [False, True])
+def test_parallel_handoff_gives_each_agent_the_full_history(share_parent_history):
+    seen = {}
+    app = _fan_out_supervisor(seen, share_parent_history=share_parent_history)
+
+    result = app.invoke({"messages": [HumanMessage(content="question", id="h1")]})
+
+    assert result["messages"][-1].content == "all done"
+    for name, call_id in (("alpha", "c1"), ("beta", "c2")):
+        messages = seen[name]["messages"]
+        # with a shared history the payload only carries the supervisor's turn
+        assert [m.id for m in messages[:1]] == ["h1"]
+        assert messages[-1].tool_call_id == call_id
+
+
+def test_shared_history_requires_a_dict_state_schema():
+    class PydanticState(BaseModel):
+        messages: list
+        remaining_steps: int = 10
+
+    with pytest.raises(ValueError, match="dict-based state schema"):
+        _fan_out_supervisor({}, share_parent_history=True, state_schema=PydanticState)
+
+
+def test_single_handoff_sends_only_the_current_turn():
+    supervisor_turn = AIMessage(
+        content="", name="supervisor", id="s2", tool_calls=[_tool_call("c2", "transfer_to_alpha")]
+    )
+    history = [
+        HumanMessage(content="first question", id="h1"),
+        AIMessage(content="first answer", name="supervisor", id="s1"),
+        HumanMessage(content="second question", id="h2"),
+        supervisor_turn,
+    ]
+
+    command = create_handoff_tool(agent_name="alpha").func(
+        state={"messages": history}, tool_call_id="c2"
+    )
+
+    assert command.graph == Command.PARENT
+    assert command.goto == "alpha"
+    update = command.update["messages"]
+    assert update[0] is supervisor_turn
+    assert [type(m) for m in update] == [AIMessage, ToolMessage]
+    assert update[1].tool_call_id == "c2"
+
+
+def test_agent_sees_the_full_history_on_the_next_turn():
+    seen = {}
+    model = _ToolCallingFakeModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[_tool_call("c1", "transfer_to_alpha")]),
+                AIMessage(content="first answer"),
+                AIMessage(content="", tool_calls=[_tool_call("c2", "transfer_to_alpha")]),
+                AIMessage(content="second answer"),
+            ]
+        )
+    )
+    app = create_supervisor([_recording_agent("alpha", seen)], model=model).compile(
+        checkpointer=MemorySaver()
+    )
+    config = {"configurable": {"thread_id": "1"}}
+
+    app.invoke({"messages": [HumanMessage(content="first question", id="h1")]}, config)
+    app.invoke({"messages": [HumanMessage(content="second question", id="h2")]}, config)
+
+    contents = [m.content for m in seen["alpha"]["messages"]]
+    assert contents[0] == "first question"
+    assert "alpha done" in contents and "first answer" in contents
+    assert contents.index("second question") > contents.index("first answer")
+    assert seen["alpha"]["messages"][-1].tool_call_id == "c2"
+    ids = [m.id for m in seen["alpha"]["messages"]]
+    assert len(ids) == len(set(ids))  # the delta update did not duplicate any message
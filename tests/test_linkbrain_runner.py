@@ -0,0 +1,60 @@
+import asyncio
+
+from linkbrain_runner import run_questions
+
+
+class _FakeApp:
+    """Answers after `delays[question]` seconds; `hangs[question]` first attempts time out."""
+
+    def __init__(self, delays, hangs=None):
+        self.delays = delays
+        self.hangs = dict(hangs or {})
+        self.calls = []
+
+    async def ainvoke(self, state):
+        question = state["messages"][0]["content"]
+        self.calls.append(question)
+        if self.hangs.get(question, 0) > 0:
+            self.hangs[question] -= 1
+            await asyncio.sleep(10)
+        await asyncio.sleep(self.delays.get(question, 0))
+        return {"messages": [question]}
+
+
+def test_timed_out_question_succeeds_on_retry():
+    app = _FakeApp({}, hangs={"slow": 1})
+
+    outcomes = asyncio.run(run_questions(app, ["slow"], timeout=0.05, retries=1, retry_delay=0))
+
+    assert outcomes[0]["result"] == {"messages": ["slow"]}
+    assert outcomes[0]["error"] is None
+    assert outcomes[0]["attempts"] == 2
+    assert app.calls == ["slow", "slow"]
+
+
+def test_question_failing_every_attempt_reports_the_timeout():
+    app = _FakeApp({}, hangs={"stuck": 2})
+
+    outcomes = asyncio.run(run_questions(app, ["stuck"], timeout=0.05, retries=1, retry_delay=0))
+
+    assert outcomes[0]["result"] is None
+    assert isinstance(outcomes[0]["error"], asyncio.TimeoutError)
+    assert outcomes[0]["attempts"] == 2
+
+
+def test_results_and_callbacks_follow_question_order():
+    app = _FakeApp({"q1": 0.15, "q2": 0.0, "q3": 0.05})
+    reported = []
+
+    outcomes = asyncio.run(
+        run_questions(
+            app,
+            ["q1", "q2", "q3"],
+            max_concurrency=3,
+            on_result=lambda outcome: reported.append(outcome["question_num"]),
+        )
+    )
+
+    assert [o["question"] for o in outcomes] == ["q1", "q2", "q3"]
+    assert [o["question_num"] for o in outcomes] == [1, 2, 3]
+    assert reported == [1, 2, 3]
@@ -0,0 +1,122 @@
+import asyncio
+import gc
+
+import pytest
+from neo4j.exceptions import ClientError, ServiceUnavailable
+
+from langgraph_supervisor.neo4j_health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitOpenError,
+    Neo4jHealthMonitor,
+    backoff_delay,
+)
+
+
+async def _probe():
+    return None
+
+
+def _open_monitor(**kwargs) -> Neo4jHealthMonitor:
+    monitor = Neo4jHealthMonitor(
+        _probe, failure_threshold=2, backoff_base=0.0, backoff_max=0.0, **kwargs
+    )
+    monitor.record_failure(ConnectionError("down"))
+    monitor.record_failure(ConnectionError("down"))
+    assert monitor.state == OPEN
+    return monitor
+
+
+def test_backoff_delay_is_bounded():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 0.5, 4.0) <= min(4.0, 0.5 * 2**attempt)
+
+
+def test_circuit_opens_after_threshold_and_lets_one_trial_through():
+    monitor = _open_monitor()
+    trial = monitor.before_request()
+    assert trial is not None and monitor.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        monitor.before_request()
+    monitor.record_success()
+    assert monitor.state == CLOSED
+    assert monitor.before_request() is None
+
+
+def test_unreported_trial_is_released():
+    monitor = _open_monitor()
+    trial = monitor.before_request()
+    # e.g. the trial request was cancelled or failed with a DriverError
+    monitor.release_trial(trial)
+    assert monitor.before_request() is not None
+
+
+def test_release_only_clears_the_owning_trial():
+    monitor = _open_monitor()
+    trial = monitor.before_request()
+    monitor.release_trial(None)
+    monitor.release_trial(object())
+    with pytest.raises(CircuitOpenError):
+        monitor.before_request()
+    monitor.release_trial(trial)
+    assert monitor.before_request() is not None
+
+
+def test_on_open_callback_task_is_kept_until_done():
+    finished = []
+
+    async def on_open():
+        await asyncio.sleep(0.01)
+        finished.append(True)
+
+    async def main():
+        monitor = _open_monitor(on_open=on_open)
+        assert len(monitor._background_tasks) == 1
+        gc.collect()
+        await asyncio.sleep(0.05)
+        assert finished == [True]
+        assert not monitor._background_tasks
+
+    asyncio.run(main())
+
+
+def _flaky_attempt(errors: list, value="rows"):
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        if errors:
+            raise errors.pop(0)
+        return value
+
+    return attempt, attempts
+
+
+def test_call_retries_connection_errors_with_backoff():
+    monitor = Neo4jHealthMonitor(_probe, backoff_base=0.0, backoff_max=0.0)
+    attempt, attempts = _flaky_attempt([ServiceUnavailable("down")])
+
+    assert asyncio.run(monitor.call(attempt, max_retry=3)) == "rows"
+    assert len(attempts) == 2
+    assert monitor.consecutive_failures == 0 and monitor.state == CLOSED
+
+
+def test_call_gives_up_after_max_retry():
+    monitor = Neo4jHealthMonitor(_probe, backoff_base=0.0, backoff_max=0.0, failure_threshold=5)
+    attempt, attempts = _flaky_attempt([ServiceUnavailable("down")] * 5)
+
+    with pytest.raises(ServiceUnavailable):
+        asyncio.run(monitor.call(attempt, max_retry=2))
+    assert len(attempts) == 2
+    assert monitor.consecutive_failures == 2
+
+
+def test_call_counts_query_errors_as_reachable():
+    monitor = _open_monitor()
+    attempt, attempts = _flaky_attempt([ClientError("syntax error")])
+
+    with pytest.raises(ClientError):
+        asyncio.run(monitor.call(attempt))
+    assert len(attempts) == 1
+    assert monitor.state == CLOSED
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from langgraph_supervisor.neo4j_http_tools import (
+    Neo4jHttpTools,
+    RetryBudget,
+    _split_batch_response,
+    create_neo4j_http_tools,
+)
+from tests.neo4j_api_stub import StubNeo4jApiServer
+
+# The stub server listens on 127.0.0.1, which `make test` (--disable-socket) blocks otherwise.
+pytestmark = pytest.mark.enable_socket
+
+
+def _failing_handler(kind, query, params):
+    if "boom" in query:
+        raise ValueError(f"bad query: {query}")
+    return [{"kind": kind, "query": query, "params": params}]
+
+
+def test_read_many_batches_queries_in_input_order():
+    with StubNeo4jApiServer() as server:
+        with Neo4jHttpTools(server.url, max_batch_size=2) as tools:
+            results = tools.read_many(
+                ["RETURN 1", {"query": "RETURN $x", "params": {"x": 2}}, "RETURN 3"]
+            )
+
+    assert server.requests == 2  # 3 queries split into batches of 2 and 1
+    assert server.queries == 3
+    assert [r["success"] for r in results] == [True, True, True]
+    assert [r["results"][0]["query"] for r in results] == ["RETURN 1", "RETURN $x", "RETURN 3"]
+    assert results[1]["results"][0]["params"] == {"x": 2}
+    assert results[0]["results"][0]["kind"] == "read"
+
+
+def test_batch_errors_are_reported_per_query():
+    with StubNeo4jApiServer(handler=_failing_handler) as server:
+        with Neo4jHttpTools(server.url) as tools:
+            results = tools.write_many(["CREATE (n)", "boom", "CREATE (m)"])
+
+    assert server.requests == 1
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[1]["error"] == "bad query: boom"
+    assert results[1]["results"] == []
+    assert results[0]["results"][0]["kind"] == "write"
+
+
+def test_falls_back_to_single_requests_without_batch_endpoint():
+    with StubNeo4jApiServer(handler=_failing_handler, batch=False) as server:
+        with Neo4jHttpTools(server.url) as tools:
+            first = tools.read_many(["RETURN 1", "boom"])
+            second = tools.read_many(["RETURN 2"])
+
+    # One 404 from the batch endpoint, then one request per query; the fallback is remembered.
+    assert server.requests == 1 + 2 + 1
+    assert [r["success"] for r in first] == [True, False]
+    assert first[1]["error"] == "bad query: boom"
+    assert second[0]["results"][0]["query"] == "RETURN 2"
+
+
+def test_async_read_many_matches_sync_results():
+    async def run():
+        async with Neo4jHttpTools(server.url, max_batch_size=1) as tools:
+            return await tools.aread_many(["RETURN 1", "boom"])
+
+    with StubNeo4jApiServer(handler=_failing_handler) as server:
+        results = asyncio.run(run())
+
+    assert server.requests == 2
+    assert [r["success"] for r in results] == [True, False]
+    assert results[0]["results"][0]["query"] == "RETURN 1"
+
+
+def test_async_tools_close_each_event_loops_client():
+    async def run(query):
+        rows = await read_tool.ainvoke({"query": query, "params": {"x": 1}})
+        written = await write_tool.ainvoke({"query": "CREATE (n)"})
+        return rows, written, await tools._get_async_client()
+
+    with StubNeo4jApiServer() as server:
+        (read_tool, write_tool), tools = create_neo4j_http_tools(server.url, async_tools=True)
+        first_rows, written, first_client = asyncio.run(run("RETURN $x"))
+        second_rows, _, second_client = asyncio.run(run("RETURN 2"))
+        tools.close()
+
+    assert server.requests == 4
+    assert first_rows == [{"kind": "read", "query": "RETURN $x", "params": {"x": 1}}]
+    assert second_rows[0]["query"] == "RETURN 2"
+    assert written[0]["kind"] == "write"
+    # every asyncio.run got its own client, closed before its loop was
+    assert first_client is not second_client
+    assert first_client.is_closed and second_client.is_closed
+    assert tools._async_clients == {}
+
+
+def test_aclose_closes_the_current_loops_client():
+    async def run():
+        tools = Neo4jHttpTools(server.url)
+        await tools.aread_neo4j("RETURN 1")
+        client = await tools._get_async_client()
+        await tools.aclose()
+        return client, tools
+
+    with StubNeo4jApiServer() as server:
+        client, tools = asyncio.run(run())
+
+    assert client.is_closed
+    assert tools._async_clients == {}
+
+
+def test_failed_batch_marks_every_query_with_its_own_result():
+    results = _split_batch_response({"success": False, "error": "down"}, 3)
+
+    assert [r["error"] for r in results] == ["down", "down", "down"]
+    results[0]["results"].append({"n": 1})
+    results[0]["error"] = "changed"
+    assert results[1] == {"success": False, "results": [], "error": "down"}
+    assert results[0] is not results[2]
+
+
+def test_batch_with_wrong_result_count_fails_every_query():
+    results = _split_batch_response({"success": True, "results": [{"success": True}]}, 2)
+
+    assert [r["success"] for r in results] == [False, False]
+    assert results[0]["error"] == "HTTP batch request failed"
+
+
+def test_retry_budget_limits_retries_to_a_share_of_requests():
+    budget = RetryBudget(ratio=0.5, min_tokens=1.0, max_tokens=2.0)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    for _ in range(10):
+        budget.deposit()
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()  # capped at max_tokens
@@ -0,0 +1,249 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from neo4j.exceptions import AuthError, DriverError
+
+from neo4j_mcp_server import (
+    Neo4jConnector,
+    QueryResultCache,
+    is_write_query,
+    normalize_query,
+    parameterize_literals,
+)
+
+
+def test_normalize_query_collapses_whitespace_outside_literals():
+    assert normalize_query("MATCH (n)\n   RETURN  n ;  ") == "MATCH (n) RETURN n"
+
+
+def test_normalize_query_keeps_whitespace_inside_literals():
+    assert normalize_query("MATCH (n {name:'a  b'})  RETURN n.`my  key`") == (
+        "MATCH (n {name:'a  b'}) RETURN n.`my  key`"
+    )
+
+
+def test_result_cache_key_distinguishes_literal_whitespace():
+    first = QueryResultCache.make_key("MATCH (n {name:'a  b'}) RETURN n")
+    second = QueryResultCache.make_key("MATCH (n {name:'a b'}) RETURN n")
+    assert first != second
+    assert QueryResultCache.make_key("MATCH (n {name:'a b'})\n RETURN n") == second
+
+
+def test_result_cache_serves_only_matching_key():
+    cache = QueryResultCache(max_entries=8, ttl=60, max_bytes=1024 * 1024)
+    key = QueryResultCache.make_key("MATCH (n {name:'a  b'}) RETURN n")
+    cache.put(key, [{"n": 1}], cache.generation)
+    assert cache.get(key) == [{"n": 1}]
+    assert cache.get(QueryResultCache.make_key("MATCH (n {name:'a b'}) RETURN n")) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "MATCH (n) WHERE n.title CONTAINS 'create' RETURN n",
+        "MATCH (n) RETURN n.offset, n.set",
+        "MATCH (n) // delete later\nRETURN n",
+        "MATCH (n:`Create`) RETURN n.`merge`",
+        "MATCH (n:Create) RETURN n {set: 1, .delete}",
+        "CALL db.labels()",
+    ],
+)
+def test_is_write_query_ignores_words_outside_clauses(query):
+    assert not is_write_query(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "CREATE (n:Link {url: 'x'})",
+        "MATCH (n) SET n.seen = true",
+        "MATCH (n) DETACH DELETE n",
+        "MATCH (n) WITH n CALL apoc.refactor.rename.label('A', 'B')",
+        "LOAD CSV FROM 'file:///x.csv' AS row RETURN row",
+    ],
+)
+def test_is_write_query_detects_write_clauses(query):
+    assert is_write_query(query)
+
+
+def test_parameterize_literals_lifts_literals_into_parameters():
+    query, params = parameterize_literals(
+        "MATCH (l:Link) WHERE l.url = 'https://a.b' AND l.created_at > 1700 RETURN l.title AS title"
+    )
+    assert (
+        query == "MATCH (l:Link) WHERE l.url = $p0 AND l.created_at > $p1 RETURN l.title AS title"
+    )
+    assert params == {"p0": "https://a.b", "p1": 1700}
+
+
+def test_parameterize_literals_shares_parameters_and_avoids_existing_names():
+    query, params = parameterize_literals(
+        "MATCH (n) WHERE n.a = 'x' OR n.b = 'x' OR n.c = $p0 RETURN n", {"p0": 1}
+    )
+    assert query == "MATCH (n) WHERE n.a = $p1 OR n.b = $p1 OR n.c = $p0 RETURN n"
+    assert params == {"p0": 1, "p1": "x"}
+
+
+def test_parameterize_literals_keeps_unaliased_projection_columns():
+    query = "MATCH (x) RETURN size(x.tags) > 2"
+    assert parameterize_literals(query) == (query, {})
+
+    query, params = parameterize_literals(
+        "MATCH (n) WHERE n.x > 1 RETURN n.x * 3 AS y, n.z + 1 ORDER BY y"
+    )
+    assert query == "MATCH (n) WHERE n.x > $p0 RETURN n.x * $p1 AS y, n.z + 1 ORDER BY y"
+    assert params == {"p0": 1, "p1": 3}
+
+
+def test_parameterize_literals_treats_starts_and_ends_with_as_operators():
+    query, params = parameterize_literals(
+        "MATCH (l:Link) WHERE l.url STARTS WITH 'https://x' RETURN l"
+    )
+    assert query == "MATCH (l:Link) WHERE l.url STARTS WITH $p0 RETURN l"
+    assert params == {"p0": "https://x"}
+
+    query, params = parameterize_literals("MATCH (l:Link) WHERE l.url ENDS\n  WITH '.pdf' RETURN l")
+    assert params == {"p0": ".pdf"}
+
+    # the operator does not end an unaliased projection column either
+    query = "MATCH (l:Link) RETURN l.url STARTS WITH 'https' LIMIT 5"
+    assert parameterize_literals(query) == (
+        "MATCH (l:Link) RETURN l.url STARTS WITH 'https' LIMIT $p0",
+        {"p0": 5},
+    )
+
+
+def test_parameterize_literals_reads_doubled_quote_as_one_string():
+    query, params = parameterize_literals("MATCH (n) WHERE n.name = 'it''s' RETURN n")
+    assert query == "MATCH (n) WHERE n.name = $p0 RETURN n"
+    assert params == {"p0": "it's"}
+
+    query, params = parameterize_literals('MATCH (n) WHERE n.name = "say ""hi""" RETURN n')
+    assert params == {"p0": 'say "hi"'}
+
+
+def test_parameterize_literals_does_not_treat_multiplication_as_variable_length():
+    assert parameterize_literals("RETURN 1 * 2") == ("RETURN 1 * 2", {})
+
+    query, params = parameterize_literals("MATCH (n) WHERE n.x * 2 > 10 RETURN n")
+    assert query == "MATCH (n) WHERE n.x * $p0 > $p1 RETURN n"
+    assert params == {"p0": 2, "p1": 10}
+
+
+def test_parameterize_literals_keeps_pattern_bounds():
+    for query in [
+        "MATCH (a)-[:KNOWS*1..3]->(b) RETURN b",
+        "MATCH (a)-[:`MY TYPE`*2]->(b) RETURN b",
+        "MATCH p = SHORTEST 2 (a)-->+(b) RETURN p",
+    ]:
+        assert parameterize_literals(query) == (query, {})
+
+
+def test_parameterize_literals_skips_unknown_escapes_and_admin_commands():
+    query = r"MATCH (n) WHERE n.path = 'C:\q' RETURN n"
+    assert parameterize_literals(query) == (query, {})
+    query = "SHOW INDEXES YIELD name WHERE name = 'x'"
+    assert parameterize_literals(query) == (query, {})
+
+
+def _explaining_connector(notifications):
+    connector = Neo4jConnector("neo4j://localhost:7687", "neo4j", "password")
+    calls = []
+
+    async def execute(work):
+        calls.append(work)
+        return SimpleNamespace(plan={"args": {"EstimatedRows": 1.0}}, notifications=notifications())
+
+    connector._execute = execute
+    return connector, calls
+
+
+def test_explain_does_not_cache_unknown_label_rejections():
+    unknown = [{"code": "Neo.ClientNotification.Statement.UnknownLabelWarning", "title": "Tag"}]
+    label_exists = False
+    connector, calls = _explaining_connector(lambda: [] if label_exists else unknown)
+
+    verdict = asyncio.run(connector.explain("MATCH (t:Tag) RETURN t"))
+    assert not verdict["valid"] and verdict["unknown_tokens"]
+
+    # the label is created by another client, the query is accepted on the next call
+    label_exists = True
+    verdict = asyncio.run(connector.explain("MATCH (t:Tag) RETURN t"))
+    assert verdict["valid"] and not verdict["cached"]
+    verdict = asyncio.run(connector.explain("MATCH (t:Tag) RETURN t"))
+    assert verdict["valid"] and verdict["cached"]
+    assert len(calls) == 2
+
+
+class _HangingSession:
+    def __init__(self):
+        self.closed = False
+
+    async def run(self, query, params):
+        await asyncio.sleep(60)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_cancelled_open_cursor_closes_its_session():
+    connector = Neo4jConnector("neo4j://localhost:7687", "neo4j", "password")
+    session = _HangingSession()
+    terminated = []
+
+    async def preflight(query, params=None):
+        return None
+
+    async def terminate_query(query_id):
+        terminated.append(query_id)
+
+    connector.preflight = preflight
+    connector.terminate_query = terminate_query
+    connector._session = lambda **kwargs: session
+
+    async def main():
+        task = asyncio.create_task(connector.open_cursor("MATCH (n) RETURN n"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.gather(*connector._background_tasks)
+
+    asyncio.run(main())
+    assert terminated and session.closed
+
+
+def _open_circuit(connector):
+    connector.health.backoff_base = connector.health.backoff_max = 0.0
+    for _ in range(connector.health.failure_threshold):
+        connector.health.record_failure(ConnectionError("down"))
+    assert connector.health.state == "open"
+
+
+def test_trial_failing_with_unclassified_error_releases_the_trial():
+    connector = Neo4jConnector("neo4j://localhost:7687", "neo4j", "password")
+    _open_circuit(connector)
+
+    async def attempt():
+        raise DriverError("driver closed")
+
+    with pytest.raises(DriverError):
+        asyncio.run(connector._call(attempt))
+    assert connector.health.before_request() is not None
+
+
+def test_auth_error_is_recorded_as_failure():
+    connector = Neo4jConnector("neo4j://localhost:7687", "neo4j", "password")
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        raise AuthError("bad credentials")
+
+    with pytest.raises(AuthError):
+        asyncio.run(connector._call(attempt))
+    assert attempts == [1]
+    assert connector.health.consecutive_failures == 1
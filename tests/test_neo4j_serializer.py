@@ -0,0 +1,93 @@
+import datetime
+import json
+
+import pytest
+from neo4j import Record
+from neo4j.graph import Graph, Node
+from neo4j.spatial import CartesianPoint, WGS84Point
+from neo4j.time import Date, DateTime, Duration
+
+from langgraph_supervisor.neo4j_serializer import (
+    dumps,
+    dumps_records,
+    get_backend,
+    record_to_dict,
+    to_jsonable,
+)
+
+
+def _graph_values():
+    graph = Graph()
+    link = Node(graph, "4:db:1", 1, ["Link", "Bookmark"], {"url": "https://a.b"})
+    entity = Node(graph, "4:db:2", 2, ["Entity"], {"name": "AI"})
+    relationship = graph.relationship_type("HAS_ENTITY")(graph, "5:db:1", 1, {"weight": 0.5})
+    relationship._start_node = link
+    relationship._end_node = entity
+    return link, relationship, entity
+
+
+def test_graph_values_keep_ids_labels_and_properties():
+    link, relationship, _ = _graph_values()
+    assert to_jsonable(link) == {
+        "_id": "4:db:1",
+        "_labels": ["Bookmark", "Link"],
+        "url": "https://a.b",
+    }
+    assert to_jsonable(relationship) == {
+        "_id": "5:db:1",
+        "_type": "HAS_ENTITY",
+        "_start": "4:db:1",
+        "_end": "4:db:2",
+        "weight": 0.5,
+    }
+
+
+def test_temporal_and_spatial_values():
+    assert to_jsonable(Date(2024, 4, 1)) == "2024-04-01"
+    assert to_jsonable(DateTime(2024, 4, 1, 9, 30)) == "2024-04-01T09:30:00.000000000"
+    assert to_jsonable(Duration(days=1, hours=2)) == "P1DT2H"
+    assert to_jsonable(datetime.date(2024, 4, 1)) == "2024-04-01"
+    assert to_jsonable(WGS84Point((127.0, 37.5))) == {"srid": 4326, "x": 127.0, "y": 37.5}
+    assert to_jsonable(CartesianPoint((1.0, 2.0, 3.0))) == {
+        "srid": 9157,
+        "x": 1.0,
+        "y": 2.0,
+        "z": 3.0,
+    }
+    assert to_jsonable(b"\x00\x01") == "AAE="
+
+
+def test_nested_collections_and_unknown_types():
+    link, _, _ = _graph_values()
+    assert to_jsonable({"links": [link], "tags": ("a", "b"), 1: None}) == {
+        "links": [{"_id": "4:db:1", "_labels": ["Bookmark", "Link"], "url": "https://a.b"}],
+        "tags": ["a", "b"],
+        "1": None,
+    }
+    assert to_jsonable(object) == str(object)
+
+
+def test_record_to_dict_matches_mapping_input():
+    link, relationship, entity = _graph_values()
+    values = {"l": link, "r": relationship, "e": entity, "n": 3}
+    record = Record(values)
+    assert record_to_dict(record) == record_to_dict(values)
+    assert list(record_to_dict(record)) == ["l", "r", "e", "n"]
+
+
+def test_dumps_records_round_trips_through_json():
+    link, _, _ = _graph_values()
+    records = [Record({"l": link, "title": "제목"})]
+    assert json.loads(dumps_records(records)) == [
+        {
+            "l": {"_id": "4:db:1", "_labels": ["Bookmark", "Link"], "url": "https://a.b"},
+            "title": "제목",
+        }
+    ]
+    assert "제목" in dumps({"title": "제목"})
+
+
+def test_get_backend_rejects_unknown_names():
+    assert get_backend("json").dumps({"a": 1}) == '{"a": 1}'
+    with pytest.raises(ValueError):
+        get_backend("yaml")
@@ -0,0 +1,57 @@
+import asyncio
+
+from neo4j.exceptions import ClientError
+
+from langgraph_supervisor.neo4j_transactions import terminate_transactions
+
+
+class _Result:
+    def __init__(self, record=None):
+        self._record = record
+
+    async def single(self):
+        return self._record
+
+    async def consume(self):
+        return None
+
+
+class _Session:
+    def __init__(self, ids, show_supported=True):
+        self.ids = ids
+        self.show_supported = show_supported
+        self.queries = []
+
+    async def run(self, query, params=None):
+        self.queries.append((query, params))
+        if query.startswith("SHOW") and not self.show_supported:
+            raise ClientError("Invalid input 'SHOW'")
+        if query.startswith("TERMINATE"):
+            return _Result()
+        return _Result({"ids": self.ids})
+
+
+def test_terminates_the_tagged_transactions():
+    session = _Session(["neo4j-transaction-7"])
+
+    ids = asyncio.run(terminate_transactions(session, "abc"))
+
+    assert ids == ["neo4j-transaction-7"]
+    (show, show_params), (terminate, terminate_params) = session.queries
+    assert "metaData.mcp_query_id = $query_id" in show and show_params == {"query_id": "abc"}
+    assert terminate.startswith("TERMINATE TRANSACTIONS")
+    assert terminate_params == {"ids": ["neo4j-transaction-7"]}
+
+
+def test_nothing_to_terminate_runs_no_terminate():
+    session = _Session([])
+
+    assert asyncio.run(terminate_transactions(session, "abc")) == []
+    assert len(session.queries) == 1
+
+
+def test_falls_back_to_procedures_on_neo4j_4():
+    session = _Session(["transaction-3"], show_supported=False)
+
+    assert asyncio.run(terminate_transactions(session, "abc")) == ["transaction-3"]
+    assert "dbms.killTransaction" in session.queries[-1][0]
@@ -0,0 +1,162 @@
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from langgraph.func import entrypoint
+from langgraph.graph import START, MessagesState, StateGraph
+
+from langgraph_supervisor import create_supervisor
+from langgraph_supervisor.compaction import OutputBudget
+from langgraph_supervisor.supervisor import _make_call_agent
+
+
+@entrypoint()
+def linkbrain(state: dict) -> dict:
+    # no add_messages reducer here, so none of the messages ever get an id
+    tool_call = {"name": "read_neo4j", "args": {}, "id": "t1", "type": "tool_call"}
+    added = [
+        AIMessage(content="", name="linkbrain", tool_calls=[tool_call]),
+        ToolMessage(content="rows", tool_call_id="t1"),
+        AIMessage(content="answer", name="linkbrain"),
+    ]
+    return {"messages": state["messages"] + added}
+
+
+def test_token_budget_output_is_the_slice_the_agent_added():
+    call_agent = _make_call_agent(
+        linkbrain,
+        "token_budget",
+        add_handoff_back_messages=False,
+        supervisor_name="supervisor",
+        output_budget=OutputBudget(),
+    )
+    state = {"messages": [HumanMessage(content="question"), AIMessage(content="earlier")]}
+
+    output = call_agent.invoke(state)
+
+    assert [m.content for m in output["messages"]] == ["", "rows", "answer"]
+
+
+def _trimming_agent():
+    def respond(state: MessagesState) -> dict:
+        # drop the earlier history and answer, leaving fewer messages than were received
+        removed = [RemoveMessage(id=message.id) for message in state["messages"][:-1]]
+        return {"messages": [*removed, AIMessage(content="answer", name="linkbrain")]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    return builder.compile(name="linkbrain")
+
+
+def test_token_budget_output_keeps_the_answer_of_an_agent_that_trims_its_history():
+    call_agent = _make_call_agent(
+        _trimming_agent(),
+        "token_budget",
+        add_handoff_back_messages=False,
+        supervisor_name="supervisor",
+        output_budget=OutputBudget(),
+    )
+    state = {
+        "messages": [
+            HumanMessage(content="question", id="h1"),
+            AIMessage(content="earlier", id="a1"),
+            HumanMessage(content="follow-up", id="h2"),
+        ]
+    }
+
+    output = call_agent.invoke(state)
+
+    assert [m.content for m in output["messages"]] == ["answer"]
+
+
+class _ToolCallingFakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class _RunningCount:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.running -= 1
+
+
+_BRANCHES = ("slow", "fast", "medium")
+
+
+def _sleeping_agent(name: str, delay: float, count: _RunningCount):
+    def respond(state: MessagesState) -> dict:
+        with count:
+            time.sleep(delay)
+        return {"messages": [AIMessage(content=f"{name} done", name=name)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    return builder.compile(name=name)
+
+
+def _run_fan_out(count: _RunningCount, **kwargs) -> list:
+    model = _ToolCallingFakeModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": f"transfer_to_{name}",
+                            "args": {},
+                            "id": f"c{i}",
+                            "type": "tool_call",
+                        }
+                        for i, name in enumerate(_BRANCHES)
+                    ],
+                ),
+                AIMessage(content="all done"),
+            ]
+        )
+    )
+    agents = [
+        _sleeping_agent("slow", 0.3, count),
+        _sleeping_agent("fast", 0.0, count),
+        _sleeping_agent("medium", 0.1, count),
+    ]
+    app = create_supervisor(
+        agents, model=model, fan_out=True, add_handoff_back_messages=False, **kwargs
+    ).compile()
+    return app.invoke({"messages": [HumanMessage(content="question")]})["messages"]
+
+
+def test_fan_out_merges_branch_results_in_tool_call_order():
+    count = _RunningCount()
+
+    messages = _run_fan_out(count)
+
+    answers = [m.content for m in messages if m.name in _BRANCHES]
+    assert answers == ["slow done", "fast done", "medium done"]
+    assert count.peak > 1  # the branches did overlap, so the order is not the finishing order
+    assert messages[-1].content == "all done"
+
+
+def test_max_concurrency_runs_one_branch_at_a_time():
+    count = _RunningCount()
+
+    messages = _run_fan_out(count, max_concurrency=1)
+
+    assert count.peak == 1
+    assert [m.content for m in messages if m.name in _BRANCHES] == [
+        "slow done",
+        "fast done",
+        "medium done",
+    ]